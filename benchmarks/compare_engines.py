@@ -0,0 +1,90 @@
+"""Compare the browser-free fast engine against Crawl4AI on saved HTML snapshots."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import difflib
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = REPO_ROOT / "benchmarks" / "fixtures"
+FIXTURE_BASE_URL = "https://fixtures.tab2md.invalid/"
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from tab2md.engines import get_engine  # noqa: E402
+from tab2md.strategies.basic import BasicStrategy  # noqa: E402
+
+
+def normalize_tokens(markdown: str) -> list[str]:
+    """Split Markdown into comparable word tokens, ignoring formatting markers."""
+    text = re.sub(r"[#*`>|\-_\[\]()!]+", " ", markdown)
+    return text.split()
+
+
+def similarity(left: str, right: str) -> float:
+    """Return a 0..1 token-level similarity ratio between two Markdown outputs."""
+    return difflib.SequenceMatcher(
+        None, normalize_tokens(left), normalize_tokens(right), autojunk=False
+    ).ratio()
+
+
+async def time_engine(engine_name: str, url: str, html: str, run_cfg, repeat: int):
+    """Run ``engine_name`` ``repeat`` times and return (best seconds, markdown)."""
+    engine = get_engine(engine_name)
+    best = float("inf")
+    markdown = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        markdown = await engine.convert(url, html, run_cfg)
+        best = min(best, time.perf_counter() - start)
+    return best, str(markdown)
+
+
+async def run(fixtures: list[Path], repeat: int) -> None:
+    strategy = BasicStrategy()
+    run_cfg = strategy.get_run_config()
+    print(f"{'fixture':<28} {'fast ms':>9} {'crawl4ai ms':>12} {'speedup':>8} {'similarity':>11}")
+    try:
+        for fixture in fixtures:
+            url = FIXTURE_BASE_URL + fixture.name
+            html = strategy.inject_base_tag(fixture.read_text(encoding="utf-8"), url)
+            fast_s, fast_md = await time_engine("fast", url, html, run_cfg, repeat)
+            slow_s, slow_md = await time_engine("crawl4ai", url, html, run_cfg, repeat)
+            print(
+                f"{fixture.name:<28} {fast_s * 1000:>9.1f} {slow_s * 1000:>12.1f} "
+                f"{slow_s / max(fast_s, 1e-9):>7.1f}x {similarity(fast_md, slow_md):>11.2f}"
+            )
+    finally:
+        from tab2md.crawler_pool import close_crawler_pool
+
+        await close_crawler_pool()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare latency and output similarity of the fast and Crawl4AI engines."
+    )
+    parser.add_argument(
+        "fixtures",
+        nargs="*",
+        help="HTML snapshots to convert (default: every benchmarks/fixtures/*.html)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per engine; the best is reported"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    fixtures = [Path(f) for f in args.fixtures] or sorted(FIXTURES_DIR.glob("*.html"))
+    asyncio.run(run(fixtures, max(1, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
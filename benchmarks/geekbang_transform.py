@@ -0,0 +1,144 @@
+"""Check the Python Geekbang DOM transform against the JS path and time the two.
+
+Golden files hold the Markdown of the fixture after GEEKBANG_FIX_JS has run in
+headless Chromium (the fast engine then extracts it exactly as it does for the
+Python path), so a match means the two transforms produce the same document.
+``--update`` regenerates them and needs ``playwright install chromium``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import difflib
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = REPO_ROOT / "benchmarks" / "fixtures"
+FIXTURE_URL = "https://time.geekbang.org/column/article/000000"
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from tab2md.strategies.geekbang import (  # noqa: E402
+    GEEKBANG_FIX_JS,
+    GeekbangColumnStrategy,
+    transform_geekbang_html,
+)
+
+
+def golden_path(fixture: Path) -> Path:
+    return fixture.with_name(fixture.name.replace(".html", ".golden.md"))
+
+
+async def convert(strategy: GeekbangColumnStrategy, html: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    markdown = await strategy.execute(FIXTURE_URL, html)
+    return time.perf_counter() - start, str(markdown)
+
+
+async def run_fix_js(html: str) -> str:
+    """Run GEEKBANG_FIX_JS on ``html`` in headless Chromium and return the resulting DOM."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        try:
+            page = await browser.new_page()
+            await page.set_content(html)
+            await page.add_script_tag(content=GEEKBANG_FIX_JS)
+            return await page.content()
+        finally:
+            await browser.close()
+
+
+async def js_reference(html: str) -> str:
+    """Markdown of the JS-transformed DOM, extracted with the same fast-engine settings."""
+    strategy = GeekbangColumnStrategy()
+    strategy.transform_html = lambda html, url: html  # the DOM is already fixed up
+    return strategy.convert_fast(FIXTURE_URL, await run_fix_js(html))
+
+
+async def check_golden(fixture: Path, html: str, markdown: str, update: bool) -> bool:
+    """Compare ``markdown`` with the golden file (or regenerate it from the JS path)."""
+    golden = golden_path(fixture)
+    if update or not golden.exists():
+        golden.write_text(await js_reference(html), encoding="utf-8")
+        print(f"Golden written from the JS path: {golden.relative_to(REPO_ROOT).as_posix()}")
+    expected = golden.read_text(encoding="utf-8")
+    if markdown == expected:
+        print(f"{fixture.name}: matches golden output")
+        return True
+    print(f"{fixture.name}: differs from golden output", file=sys.stderr)
+    sys.stderr.writelines(
+        difflib.unified_diff(
+            expected.splitlines(keepends=True),
+            markdown.splitlines(keepends=True),
+            "golden",
+            "actual",
+        )
+    )
+    return False
+
+
+async def run(fixtures: list[Path], update: bool, compare_js: bool) -> bool:
+    ok = True
+    python_strategy = GeekbangColumnStrategy()
+    js_strategy = GeekbangColumnStrategy()
+    js_strategy.dom_transform = "js"
+    try:
+        for fixture in fixtures:
+            html = fixture.read_text(encoding="utf-8")
+
+            start = time.perf_counter()
+            transform_geekbang_html(html)
+            transform_s = time.perf_counter() - start
+
+            python_s, markdown = await convert(python_strategy, html)
+            ok = await check_golden(fixture, html, markdown, update) and ok
+            print(
+                f"  transform {transform_s * 1000:.1f} ms, "
+                f"python path end-to-end {python_s * 1000:.1f} ms"
+            )
+            if compare_js:
+                # Run twice so the browser launch is excluded from the reported time.
+                await convert(js_strategy, html)
+                js_s, _ = await convert(js_strategy, html)
+                print(f"  js path end-to-end {js_s * 1000:.1f} ms (warm Crawl4AI)")
+    finally:
+        from tab2md.crawler_pool import close_crawler_pool
+
+        await close_crawler_pool()
+    return ok
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "fixtures",
+        nargs="*",
+        help="Geekbang snapshots (default: benchmarks/fixtures/geekbang_*.html)",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Regenerate the golden files by running GEEKBANG_FIX_JS in headless Chromium",
+    )
+    parser.add_argument(
+        "--no-js", action="store_true", help="Skip the Crawl4AI js_code timing comparison"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    fixtures = [Path(f).resolve() for f in args.fixtures] or sorted(
+        FIXTURES_DIR.glob("geekbang_*.html")
+    )
+    ok = asyncio.run(run(fixtures, args.update, not args.no_js))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
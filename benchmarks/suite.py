@@ -0,0 +1,332 @@
+"""Offline benchmark suite: snapshot->Markdown and CDP capture, checked against JSON baselines."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = REPO_ROOT / "benchmarks" / "fixtures"
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "baselines" / f"{sys.platform}.json"
+FIXTURE_BASE_URL = "https://fixtures.tab2md.invalid/"
+# Fixtures that must be routed to a site strategy get a matching URL.
+FIXTURE_URLS = {
+    "geekbang_article.html": "https://time.geekbang.org/column/article/000000",
+}
+HUGE_DOCS_NAME = "docs_huge.html"
+CDP_PORT = 9333
+
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from tab2md import timings  # noqa: E402
+from tab2md.strategies.registry import get_registry  # noqa: E402
+
+# Metrics where a larger value is a regression. Output size is compared in both
+# directions because a sudden change usually means extraction broke.
+LOWER_IS_BETTER = ("_ms", "_kb")
+SIZE_METRICS = ("output_bytes",)
+
+
+def generate_docs_page(sections: int, seed: int = 0) -> str:
+    """Build a deterministic, very large documentation page (nav, code, tables, lists)."""
+    rng = random.Random(seed)
+    words = (
+        "async event loop task coroutine buffer stream parser selector render "
+        "snapshot browser target session capture markdown extract config"
+    ).split()
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    toc = "".join(f'<li><a href="#s{i}">Section {i}</a></li>' for i in range(sections))
+    parts = [
+        "<!DOCTYPE html><html><head><title>Huge docs</title>",
+        "<script>window.__DATA__ = {};</script></head><body>",
+        f"<nav><ul>{toc}</ul></nav><main>",
+    ]
+    for i in range(sections):
+        parts.append(f'<h2 id="s{i}">Section {i}</h2>')
+        parts.append(f"<p>{sentence(40)} <a href=\"/ref/{i}\">ref {i}</a></p>")
+        parts.append(f"<ul>{''.join(f'<li>{sentence(8)}</li>' for _ in range(4))}</ul>")
+        parts.append(
+            f'<pre><code class="language-python">def f{i}(x):\n    return x * {i}\n</code></pre>'
+        )
+        rows = "".join(
+            f"<tr><td>{sentence(2)}</td><td>{rng.randint(0, 999)}</td></tr>" for _ in range(3)
+        )
+        parts.append(f"<table><tr><th>Name</th><th>Value</th></tr>{rows}</table>")
+        parts.append(f'<img src="data:image/png;base64,{"A" * 512}" alt="inline {i}">')
+    parts.append("</main><footer>footer</footer></body></html>")
+    return "".join(parts)
+
+
+def load_corpus(huge_sections: int) -> list[tuple[str, str, str]]:
+    """Return [(name, url, html)] for the saved fixtures plus the generated huge page."""
+    corpus = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.html")):
+        url = FIXTURE_URLS.get(fixture.name, FIXTURE_BASE_URL + fixture.name)
+        corpus.append((fixture.name, url, fixture.read_text(encoding="utf-8")))
+    if huge_sections:
+        corpus.append(
+            (HUGE_DOCS_NAME, FIXTURE_BASE_URL + HUGE_DOCS_NAME, generate_docs_page(huge_sections))
+        )
+    return corpus
+
+
+def stage_durations() -> dict[str, float]:
+    """Sum the recorded spans by name (ms) and reset the trace buffer."""
+    stages: dict[str, float] = {}
+    for event in timings.TRACE_EVENTS:
+        stages[event["name"]] = stages.get(event["name"], 0.0) + event["dur"] / 1000
+    timings.TRACE_EVENTS.clear()
+    return stages
+
+
+async def measure_conversion(strategy, url: str, html: str, repeat: int) -> dict:
+    """Median latency and per-stage timings, tracemalloc peak and output size of execute()."""
+    totals, per_stage = [], {}
+    markdown = ""
+    for _ in range(repeat):
+        timings.TRACE_EVENTS.clear()
+        start = time.perf_counter()
+        markdown = await strategy.execute(url, html)
+        totals.append((time.perf_counter() - start) * 1000)
+        for name, ms in stage_durations().items():
+            per_stage.setdefault(name, []).append(ms)
+
+    tracemalloc.start()
+    await strategy.execute(url, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.TRACE_EVENTS.clear()
+
+    metrics = {"convert_ms": statistics.median(totals), "peak_kb": peak / 1024}
+    for name, values in per_stage.items():
+        metrics[f"stage:{name}_ms"] = statistics.median(values)
+    metrics["output_bytes"] = len(str(markdown).encode("utf-8"))
+    return metrics
+
+
+async def measure_streaming(strategy, url: str, html: str) -> dict | None:
+    """Latency and peak memory of the streaming path, when the strategy supports it."""
+    if not strategy.supports_streaming(strategy.get_run_config()):
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "snapshot.html"
+        output = Path(tmp) / "out.md"
+        snapshot.write_text(html, encoding="utf-8")
+        # Time and trace separately, as measure_conversion does: tracemalloc slows
+        # allocation-heavy parsing several-fold and would skew the comparison.
+        start = time.perf_counter()
+        await strategy.execute_streaming(url, snapshot, output, chunk_chars=256 * 1024)
+        elapsed = (time.perf_counter() - start) * 1000
+        tracemalloc.start()
+        await strategy.execute_streaming(url, snapshot, output, chunk_chars=256 * 1024)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        timings.TRACE_EVENTS.clear()
+        return {
+            "convert_ms": elapsed,
+            "peak_kb": peak / 1024,
+            "output_bytes": output.stat().st_size,
+        }
+
+
+async def measure_capture(corpus, repeat: int) -> dict[str, dict]:
+    """
+    Drive the real CDP capture path against a locally launched headless Chromium
+    that stands in for the user's browser (connect_over_cdp on a debugging port).
+    """
+    from tab2md.browser_ops import (
+        async_playwright,
+        capture_page_bounded,
+        capture_page_html,
+        connect_browser,
+        resolve_active_page,
+    )
+
+    results = {}
+    async with async_playwright() as p:
+        host = await p.chromium.launch(
+            headless=True, args=[f"--remote-debugging-port={CDP_PORT}"]
+        )
+        try:
+            browser = await connect_browser(p, f"http://127.0.0.1:{CDP_PORT}")
+            if browser is None:
+                return results
+            context = browser.contexts[0] if browser.contexts else await browser.new_context()
+            with tempfile.TemporaryDirectory() as tmp:
+                for name, url, html in corpus:
+                    path = Path(tmp) / name
+                    path.write_text(html, encoding="utf-8")
+                    page = await context.new_page()
+                    await page.goto(path.as_uri(), wait_until="load")
+                    selector = get_registry().lookup(url).capture_selector
+
+                    resolve, capture, bounded = [], [], []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        await resolve_active_page(browser, use_os_titles=False)
+                        resolve.append((time.perf_counter() - start) * 1000)
+
+                        start = time.perf_counter()
+                        content = await capture_page_html(page, selector)
+                        capture.append((time.perf_counter() - start) * 1000)
+
+                        start = time.perf_counter()
+                        snapshot = await capture_page_bounded(page, selector)
+                        bounded.append((time.perf_counter() - start) * 1000)
+                        if isinstance(snapshot, Path):
+                            snapshot.unlink(missing_ok=True)
+
+                    results[f"capture/{name}"] = {
+                        "resolve_ms": statistics.median(resolve),
+                        "capture_ms": statistics.median(capture),
+                        "bounded_capture_ms": statistics.median(bounded),
+                        "snapshot_bytes": len(content.encode("utf-8")),
+                    }
+                    await page.close()
+            await browser.close()
+        finally:
+            await host.close()
+    return results
+
+
+async def run_suite(corpus, repeat: int, capture: bool) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    try:
+        for name, url, html in corpus:
+            strategy = get_registry().lookup(url)
+            label = type(strategy).__name__
+            results[f"convert/{name}/{label}"] = await measure_conversion(
+                strategy, url, html, repeat
+            )
+            streamed = await measure_streaming(strategy, url, html)
+            if streamed is not None:
+                results[f"stream/{name}/{label}"] = streamed
+    finally:
+        from tab2md.crawler_pool import close_crawler_pool
+
+        await close_crawler_pool()
+    if capture:
+        results.update(await measure_capture(corpus, repeat))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Return a description of every metric that regressed beyond ``threshold``."""
+    regressions = []
+    for case, metrics in results.items():
+        expected = baseline.get(case)
+        if expected is None:
+            continue
+        for metric, value in metrics.items():
+            old = expected.get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            if metric.endswith(SIZE_METRICS):
+                regressed = abs(change) > threshold
+            elif metric.endswith(LOWER_IS_BETTER):
+                absolute = value - old
+                floor = min_delta_ms if metric.endswith("_ms") else 0
+                regressed = change > threshold and absolute > floor
+            else:
+                regressed = False
+            if regressed:
+                regressions.append(f"{case} {metric}: {old:.1f} -> {value:.1f} ({change:+.0%})")
+    return regressions
+
+
+def print_results(results: dict, baseline: dict) -> None:
+    for case, metrics in results.items():
+        print(case)
+        expected = baseline.get(case, {})
+        for metric, value in metrics.items():
+            old = expected.get(metric)
+            delta = f"  ({(value - old) / old:+.0%} vs baseline)" if old else ""
+            print(f"  {metric:<32} {value:>12.1f}{delta}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON file (default: benchmarks/baselines/<platform>.json)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Fail when a metric is worse than the baseline by more than this fraction",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Ignore latency regressions smaller than this many milliseconds (noise floor)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is used")
+    parser.add_argument(
+        "--huge-sections",
+        type=int,
+        default=2000,
+        help="Sections in the generated huge docs page (0 to skip it)",
+    )
+    parser.add_argument(
+        "--no-capture",
+        action="store_true",
+        help="Skip the CDP capture benchmarks (no local Chromium needed)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    timings.enable_profiling()
+    corpus = load_corpus(args.huge_sections)
+    results = asyncio.run(run_suite(corpus, max(1, args.repeat), not args.no_capture))
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")).get("results", {})
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "meta": {"python": platform.python_version(), "machine": platform.machine()},
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"Baseline written: {args.baseline}")
+        return
+
+    if not baseline:
+        print("No baseline found; run with --save-baseline to create one.")
+        return
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
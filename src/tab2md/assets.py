@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import time
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
+
+from .browser_ops import async_playwright, connect_browser
+
+ASSET_DIR = Path("exports") / "assets"
+DEFAULT_CONNECTIONS = 6
+DEFAULT_BYTE_BUDGET = 200 * 1024 * 1024  # 每次运行最多下载的字节数
+DEFAULT_TIME_BUDGET = 120.0  # 每次运行用于下载资源的秒数
+REQUEST_TIMEOUT = 30.0
+
+# ![alt](url "title")，url 可以用尖括号包裹
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\((<[^>]+>|[^)\s]+)((?:\s+"[^"]*")?)\)')
+
+
+def _image_target(match: re.Match) -> str:
+    return match.group(2).strip("<>")
+
+
+def collect_image_urls(markdown: str) -> list[str]:
+    """按出现顺序返回 Markdown 中去重后的远程图片地址。"""
+    urls = {}
+    for match in _IMAGE_RE.finditer(markdown):
+        url = _image_target(match)
+        if urlparse(url).scheme in ("http", "https"):
+            urls.setdefault(url, None)
+    return list(urls)
+
+
+def _extension(url: str, content_type: str) -> str:
+    ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) if content_type else None
+    if not ext:
+        ext = PurePosixPath(urlparse(url).path).suffix.lower()
+    if not ext or len(ext) > 6:
+        ext = ".bin"
+    return ".jpg" if ext in (".jpe", ".jpeg") else ext
+
+
+class AssetDownloader:
+    """
+    资源本地化：把 Markdown 中的远程图片下载到 exports/assets/ 并改写链接。
+    - 通过已连接浏览器上下文的 request API 下载，自动携带登录态 Cookie (签名、防盗链图片)
+    - 以信号量限制同时进行的连接数
+    - 文件按内容哈希命名，多个页面共用的图片只保存一份；同一运行内相同 URL 只下载一次
+    - 每次运行有字节与时间预算，超出后剩余图片保留远程链接
+    """
+
+    def __init__(
+        self,
+        asset_dir: Path = ASSET_DIR,
+        connections: int = DEFAULT_CONNECTIONS,
+        byte_budget: int = DEFAULT_BYTE_BUDGET,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+    ):
+        self.asset_dir = Path(asset_dir)
+        self.byte_budget = byte_budget
+        self.time_budget = time_budget
+        self._semaphore = asyncio.Semaphore(max(1, connections))
+        self._tasks: dict[str, asyncio.Task] = {}  # url -> 下载任务 (结果为本地路径或 None)
+        self._deadline: float | None = None
+        self._connect_lock = asyncio.Lock()
+        self._playwright = None
+        self._browsers: dict = {}  # CDP 端点 -> 浏览器 (连接失败时为 None)
+
+        self.bytes_downloaded = 0
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+        self.skipped = 0
+
+    # --- 连接 ---
+    async def _request_context(self, source: str | None = None):
+        """
+        首次使用某个端点时通过 CDP 连接该浏览器，复用其默认上下文的 request API；
+        source 为页面所在的端点，保证使用导出该页面的那个浏览器配置文件的登录态。
+        """
+        async with self._connect_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if source not in self._browsers:
+                self._browsers[source] = await connect_browser(self._playwright, source)
+        browser = self._browsers[source]
+        if browser is None or not browser.contexts:
+            return None
+        return browser.contexts[0].request
+
+    async def close(self):
+        for browser in self._browsers.values():
+            if browser is not None:
+                await browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browsers = {}
+        self._playwright = None
+
+    # --- 预算 ---
+    def _remaining_time(self) -> float:
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.time_budget
+        return self._deadline - time.monotonic()
+
+    def _over_budget(self, incoming: int = 0) -> bool:
+        return (
+            self._remaining_time() <= 0
+            or self.bytes_downloaded + incoming > self.byte_budget
+        )
+
+    # --- 下载 ---
+    def _store(self, url: str, body: bytes, content_type: str) -> Path:
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        path = self.asset_dir / f"{digest}{_extension(url, content_type)}"
+        if path.exists():
+            self.reused += 1
+            return path
+        self.asset_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        return path
+
+    async def _download(self, url: str, source: str | None) -> Path | None:
+        async with self._semaphore:
+            if self._over_budget():
+                self.skipped += 1
+                return None
+            request = await self._request_context(source)
+            if request is None:
+                self.skipped += 1
+                return None
+            timeout = min(REQUEST_TIMEOUT, self._remaining_time())
+            try:
+                response = await request.get(url, timeout=timeout * 1000)
+                if not response.ok:
+                    raise RuntimeError(f"HTTP {response.status}")
+                headers = response.headers
+                declared = int(headers.get("content-length") or 0)
+                if self._over_budget(declared):
+                    await response.dispose()
+                    self.skipped += 1
+                    return None
+                body = await response.body()
+                await response.dispose()
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️  图片下载失败: {url} ({e})")
+                return None
+
+            if self._over_budget(len(body)):
+                self.skipped += 1
+                return None
+            self.bytes_downloaded += len(body)
+            self.downloaded += 1
+            return self._store(url, body, headers.get("content-type", ""))
+
+    def fetch(self, url: str, source: str | None = None) -> asyncio.Task:
+        """
+        返回该 URL 的下载任务；同一运行内重复的 URL 共享同一个任务。
+        已被取消或以异常结束的任务不再复用，重新下载。
+        """
+        task = self._tasks.get(url)
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = self._tasks[url] = asyncio.create_task(self._download(url, source))
+        return task
+
+    async def localize(self, markdown: str, md_dir: Path, source: str | None = None) -> str:
+        """
+        并发下载 Markdown 中的图片，返回链接改写为相对本地路径后的 Markdown。
+        source: 页面所在的 CDP 端点 (默认第一个端点)。
+        """
+        urls = collect_image_urls(markdown)
+        if not urls:
+            return markdown
+        # 下载任务由多个页面共享：本页因超时被取消时只取消等待 (shield)，不取消下载本身
+        paths = await asyncio.gather(*(asyncio.shield(self.fetch(url, source)) for url in urls))
+        local = {
+            url: Path(os.path.relpath(path, md_dir)).as_posix()
+            for url, path in zip(urls, paths)
+            if path is not None
+        }
+        print(f"🖼️  图片本地化: {len(local)}/{len(urls)}")
+
+        def replace(match: re.Match) -> str:
+            target = local.get(_image_target(match))
+            if target is None:
+                return match.group(0)
+            return f"![{match.group(1)}]({target}{match.group(3)})"
+
+        return _IMAGE_RE.sub(replace, markdown)
+
+    def summary(self) -> str:
+        return (
+            f"🖼️  资源: 下载 {self.downloaded} (其中已存在 {self.reused}) / "
+            f"失败 {self.failed} / 超出预算跳过 {self.skipped}, "
+            f"共 {self.bytes_downloaded / 1024 / 1024:.1f} MB"
+        )
@@ -1,15 +1,81 @@
 import subprocess
 import asyncio
+import json
+import os
 import platform
+import re
 import sys
-from playwright.async_api import async_playwright
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .deadlines import RUN_SUMMARY, StageTimeout, with_deadline
+from .timings import span, timed
 
 # 强制使用 IPv4 127.0.0.1 避免 Windows 下的 IPv6 问题
 DEBUG_PORT_URL = "http://127.0.0.1:9222"
+# 要连接的全部 CDP 端点 (多个浏览器配置文件、SSH 隧道等)，可由 --cdp 或环境变量覆盖
+CDP_ENDPOINTS = [
+    e.strip() for e in os.environ.get("TAB2MD_CDP_ENDPOINTS", "").split(",") if e.strip()
+] or [DEBUG_PORT_URL]
+CONNECT_TIMEOUT = 5.0  # 每个端点的连接超时 (秒)
+
+INSTALL_STAMP_FILE = Path(
+    os.environ.get("TAB2MD_CACHE_DIR") or Path.home() / ".cache" / "tab2md"
+) / "chromium.stamp"
+
+
+def _playwright_browsers_path() -> Path:
+    """Playwright 浏览器的安装目录 (与 Playwright 自身的查找规则一致)。"""
+    custom = os.environ.get("PLAYWRIGHT_BROWSERS_PATH")
+    if custom and custom != "0":
+        return Path(custom)
+    system = platform.system()
+    if system == "Windows":
+        return Path(os.environ.get("LOCALAPPDATA", Path.home())) / "ms-playwright"
+    if system == "Darwin":
+        return Path.home() / "Library" / "Caches" / "ms-playwright"
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "ms-playwright"
+
+
+def _installed_chromium_dirs(browsers_path: Path) -> list[str]:
+    if not browsers_path.is_dir():
+        return []
+    return sorted(
+        entry.name for entry in browsers_path.iterdir() if entry.name.startswith("chromium")
+    )
+
+
+def _install_fingerprint() -> dict | None:
+    """当前 Playwright 版本与已安装的 Chromium 目录；未安装时返回 None。"""
+    from importlib import metadata
+
+    try:
+        version = metadata.version("playwright")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    browsers_path = _playwright_browsers_path()
+    dirs = _installed_chromium_dirs(browsers_path)
+    if not dirs:
+        return None
+    return {"playwright": version, "path": str(browsers_path), "browsers": dirs}
 
 
 def ensure_chromium_installed():
-    """检查并自动安装 Chromium（如果需要）。"""
+    """
+    检查并自动安装 Chromium（如果需要）。
+    快速路径：戳记文件记录了 Playwright 版本与浏览器目录，且目录仍存在时直接返回；
+    只有在浏览器缺失或 Playwright 升级后才调用 `playwright install chromium`。
+    """
+    fingerprint = _install_fingerprint()
+    if fingerprint is not None:
+        try:
+            if json.loads(INSTALL_STAMP_FILE.read_text(encoding="utf-8")) == fingerprint:
+                return
+        except (OSError, ValueError):
+            pass
+
     try:
         subprocess.run(
             ["playwright", "install", "chromium"],
@@ -18,7 +84,97 @@ def ensure_chromium_installed():
             stderr=subprocess.PIPE,
         )
     except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
+        return
+
+    fingerprint = _install_fingerprint()
+    if fingerprint is not None:
+        try:
+            INSTALL_STAMP_FILE.parent.mkdir(parents=True, exist_ok=True)
+            INSTALL_STAMP_FILE.write_text(json.dumps(fingerprint), encoding="utf-8")
+        except OSError:
+            pass
+
+
+def async_playwright():
+    """按需导入 Playwright (导入本身耗时明显，记录到启动耗时中)。"""
+    with timed("import playwright"):
+        from playwright.async_api import async_playwright as _async_playwright
+    return _async_playwright()
+
+
+def _connect_hint(endpoints) -> str:
+    """连接失败时的提示，按实际端点给出需要开启的调试端口。"""
+    ports = set()
+    for endpoint in endpoints:
+        try:
+            ports.add(urlparse(endpoint).port)
+        except ValueError:
+            pass
+    ports.discard(None)
+    port = ports.pop() if len(ports) == 1 else "<端口>"
+    return f"❌ 无法连接到浏览器 {', '.join(endpoints)}。请确认已运行: chrome/msedge --remote-debugging-port={port}"
+
+
+async def connect_browser(p, endpoint: str | None = None, timeout: float | None = None):
+    """
+    通过 CDP 连接用户浏览器 (默认第一个端点)，与 connect_browsers 一样受连接超时约束；
+    失败时打印提示并返回 None。
+    """
+    endpoint = endpoint or CDP_ENDPOINTS[0]
+    with timed("cdp connect"):
+        browser = await _connect_endpoint(p, endpoint, timeout or CONNECT_TIMEOUT)
+    if browser is None:
+        print(_connect_hint([endpoint]))
+    return browser
+
+
+async def _connect_endpoint(p, endpoint: str, timeout: float):
+    try:
+        # timeout 为 None 时不限制 (Playwright 以 0 表示不限制)
+        return await asyncio.wait_for(
+            p.chromium.connect_over_cdp(endpoint, timeout=(timeout or 0) * 1000), timeout
+        )
+    except Exception as e:
+        reason = "连接超时" if isinstance(e, asyncio.TimeoutError) else e
+        if isinstance(e, asyncio.TimeoutError):
+            RUN_SUMMARY.record("connect", endpoint, f"超过时限 {timeout:g} 秒，未能连接")
+        print(f"⚠️  无法连接端点 {endpoint} ({reason})")
+        return None
+
+
+async def connect_browsers(p, endpoints=None, timeout: float | None = None):
+    """
+    并发连接多个 CDP 端点，每个端点有独立的超时，某个端点失效不会拖慢其它端点。
+    返回 [(endpoint, browser), ...]，只包含连接成功的端点；全部失败时打印提示。
+    """
+    endpoints = list(endpoints or CDP_ENDPOINTS)
+    timeout = timeout or CONNECT_TIMEOUT
+    with timed("cdp connect"):
+        browsers = await asyncio.gather(*(_connect_endpoint(p, e, timeout) for e in endpoints))
+    connections = [(e, b) for e, b in zip(endpoints, browsers) if b is not None]
+    if not connections:
+        print(_connect_hint(endpoints))
+    elif len(endpoints) > 1:
+        print(f"🔌 已连接 {len(connections)}/{len(endpoints)} 个 CDP 端点。")
+    return connections
+
+
+async def close_browsers(connections):
+    """断开全部 CDP 连接 (不会关闭用户的浏览器)。"""
+    await asyncio.gather(
+        *(browser.close() for _, browser in connections), return_exceptions=True
+    )
+
+
+def _capturable_pages(connections, matcher=None):
+    """汇总所有端点的标签页清单，返回 [(page, endpoint), ...]。"""
+    return [
+        (page, endpoint)
+        for endpoint, browser in connections
+        for context in browser.contexts
+        for page in context.pages
+        if is_capturable_page(page) and (matcher is None or matcher.search(page.url))
+    ]
 
 
 def get_process_titles():
@@ -76,91 +232,391 @@ def get_process_titles():
     return titles
 
 
-async def get_active_tab_snapshot():
+# 在页面内按选择器截取正文：仅传输匹配的子树，以及去掉脚本后的 <head> (保留 meta/title/样式)
+_SCOPED_CAPTURE_JS = """
+(selector) => {
+    const nodes = Array.from(document.querySelectorAll(selector));
+    if (!nodes.length) return null;
+    let head = '';
+    if (document.head) {
+        const clone = document.head.cloneNode(true);
+        clone.querySelectorAll('script, noscript, template').forEach(n => n.remove());
+        head = clone.innerHTML;
+    }
+
+    // 外链样式表不会进入快照：按层叠顺序读出 document.styleSheets 中声明 font-weight 的
+    // 简单类规则，以 <style data-tab2md-weights> 附在 <head> 中，供 Python 侧的 DOM 改写判断加粗
+    const simple = /^(?:[a-zA-Z][\\w-]*)?\\.[\\w-]+$/;
+    const weights = [];
+    let unreadable = false;
+    const collect = (rules) => {
+        for (const rule of Array.from(rules)) {
+            if (rule.styleSheet) {  // @import
+                try { collect(rule.styleSheet.cssRules); } catch (e) { unreadable = true; }
+            }
+            if (rule.cssRules) collect(rule.cssRules);  // @media、@supports 等分组规则
+            const weight = rule.style && rule.style.fontWeight;
+            if (!weight || !rule.selectorText) continue;
+            const selectors = rule.selectorText.split(',').map(s => s.trim()).filter(s => simple.test(s));
+            if (selectors.length) weights.push(`${selectors.join(',')}{font-weight:${weight}}`);
+        }
+    };
+    for (const sheet of Array.from(document.styleSheets)) {
+        try { collect(sheet.cssRules); } catch (e) { unreadable = true; }
+    }
+    if (unreadable) {
+        // 跨域样式表 (CDN) 读不到规则：对只带一个类名的元素，按它与父元素计算样式的差异推断
+        const isBold = (el) => {
+            const w = getComputedStyle(el).fontWeight;
+            return w === 'bold' || w === 'bolder' || parseInt(w) >= 600;
+        };
+        const attempts = new Map();
+        for (const node of nodes) {
+            for (const el of node.querySelectorAll('[class]')) {
+                if (el.classList.length !== 1 || el.style.fontWeight || !el.parentElement) continue;
+                const cls = el.classList[0];
+                const tried = attempts.get(cls) || 0;
+                if (tried < 0 || tried >= 5 || !/^[\\w-]+$/.test(cls)) continue;
+                const bold = isBold(el);
+                if (bold === isBold(el.parentElement)) {  // 与父元素相同：无法判断，换一个元素再试
+                    attempts.set(cls, tried + 1);
+                    continue;
+                }
+                attempts.set(cls, -1);
+                weights.push(`.${cls}{font-weight:${bold ? 700 : 400}}`);
+            }
+        }
+    }
+    if (weights.length) head += `<style data-tab2md-weights>${weights.join('\\n')}</style>`;
+
+    const body = nodes.map(n => n.outerHTML).join('\\n');
+    return `<!DOCTYPE html><html><head>${head}</head><body>${body}</body></html>`;
+}
+"""
+
+
+async def capture_page_html(page, selector: str | None = None) -> str:
+    """
+    获取页面 HTML。
+    指定 selector 时只在页面内序列化匹配的子树 (大幅减少 CDP 传输量)；
+    未匹配到任何元素时回退到整页 content()。
+    """
+    if selector:
+        with span("capture", selector=selector) as s:
+            scoped = await page.evaluate(_SCOPED_CAPTURE_JS, selector)
+            s.set(bytes=len(scoped or ""))
+        if scoped:
+            print(f"✂️  按捕获范围 {selector} 截取: {len(scoped) / 1024:.1f} KB")
+            return scoped
+        print(f"⚠️  捕获范围 {selector} 未匹配到元素，改为抓取整页。")
+    with span("capture") as s:
+        content = await page.content()
+        s.set(bytes=len(content))
+    return content
+
+
+# 有界捕获：在页面内序列化一次并暂存，Python 侧按长度决定一次取回还是分块拉取。
+# 页面级变量只在捕获期间存在，结束后立即删除。
+_STASH_KEY = "__tab2md_snapshot__"
+_STASH_JS = (
+    "(selector) => {\n"
+    "    let html = selector ? (" + _SCOPED_CAPTURE_JS.strip() + ")(selector) : null;\n"
+    "    const scoped = html !== null;\n"
+    "    if (!scoped) {\n"
+    "        const doctype = document.doctype\n"
+    "            ? new XMLSerializer().serializeToString(document.doctype) : '';\n"
+    "        html = doctype + document.documentElement.outerHTML;\n"
+    "    }\n"
+    f"    window.{_STASH_KEY} = html;\n"
+    "    return [html.length, scoped];\n"
+    "}"
+)
+_SLICE_JS = f"([start, end]) => window.{_STASH_KEY}.slice(start, end)"
+_CLEAR_JS = f"() => {{ delete window.{_STASH_KEY}; }}"
+
+DEFAULT_MEMORY_CEILING = 64 * 1024 * 1024  # 字符数，超过后改为分块捕获
+CLEAR_TIMEOUT = 1.0  # 清理页面内暂存快照的上限 (秒)
+CAPTURE_CHUNK_CHARS = 1024 * 1024
+
+
+async def capture_page_bounded(
+    page,
+    selector: str | None = None,
+    memory_ceiling: int = DEFAULT_MEMORY_CEILING,
+    chunk_chars: int = CAPTURE_CHUNK_CHARS,
+):
+    """
+    内存有界的页面捕获。
+    快照不超过 memory_ceiling 个字符时一次取回并返回 str；
+    否则按 chunk_chars 分块拉取，直接写入临时文件并返回其 Path，
+    Python 进程中任意时刻最多只持有一个分块。
+    """
+    from .engines.crawl4ai_engine import SNAPSHOT_DIR
+
+    with span("serialize in page", selector=selector) as s:
+        length, scoped = await page.evaluate(_STASH_JS, selector)
+        s.set(bytes=length)
+    try:
+        if selector:
+            if scoped:
+                print(f"✂️  按捕获范围 {selector} 截取: {length / 1024:.1f} KB")
+            else:
+                print(f"⚠️  捕获范围 {selector} 未匹配到元素，改为抓取整页。")
+        if length <= memory_ceiling:
+            with span("capture", bytes=length):
+                return await page.evaluate(_SLICE_JS, [0, length])
+
+        print(
+            f"🌊 页面快照 {length / 1024 / 1024:.1f} M 字符超过内存上限，"
+            f"按 {chunk_chars // 1024} K 分块捕获..."
+        )
+        fd, name = tempfile.mkstemp(prefix="tab2md_", suffix=".html", dir=SNAPSHOT_DIR)
+        try:
+            with span("capture chunks", bytes=length), os.fdopen(
+                fd, "w", encoding="utf-8"
+            ) as out:
+                for start in range(0, length, chunk_chars):
+                    out.write(await page.evaluate(_SLICE_JS, [start, start + chunk_chars]))
+        except BaseException:
+            # 超时取消或页面断开时不留下不完整的快照文件
+            Path(name).unlink(missing_ok=True)
+            raise
+        return Path(name)
+    finally:
+        # 清理必须有上限：捕获因超时被取消时页面可能已无响应
+        try:
+            await asyncio.wait_for(page.evaluate(_CLEAR_JS), CLEAR_TIMEOUT)
+        except Exception:
+            pass
+
+
+# 每个标签页的可见性、焦点状态与标题，在所有页面上并发求值：
+# 标题随页面状态一起取回，不需要额外的 CDP 会话或 Target.getTargets 调用
+_PAGE_STATE_JS = "() => [document.visibilityState, document.hasFocus(), document.title]"
+PAGE_STATE_TIMEOUT = 1.0
+
+
+async def _page_state(page):
+    """返回 (visible, focused, title)；页面无响应时视为不可见、标题为空。"""
+    try:
+        visibility, focused, title = await asyncio.wait_for(
+            page.evaluate(_PAGE_STATE_JS), timeout=PAGE_STATE_TIMEOUT
+        )
+        return visibility == "visible", bool(focused), title or ""
+    except Exception:
+        return False, False, ""
+
+
+def _break_tie_with_os_titles(candidates):
+    """用操作系统窗口标题在多个候选标签页之间做决断。"""
+    os_process_titles = get_process_titles()
+    if not os_process_titles:
+        print("⚠️  未能获取到任何系统窗口标题 (可能权限不足或无窗口)。")
+        return None
+    # 仅打印前3个避免刷屏
+    print(f"🪟 系统检测到的激活窗口标题: {os_process_titles[:3]}...")
+
+    # 匹配逻辑：检查 Tab 标题是否包含在某个 OS 窗口标题中
+    # 例如：Tab="02 | 强化学习"  vs  OS="02 | 强化学习 - Microsoft Edge"
+    for page, title in candidates:
+        if not title:
+            continue
+        for os_title in os_process_titles:
+            # 使用宽松的包含匹配，并忽略大小写
+            if title.lower() in os_title.lower():
+                print(f"✅ 命中匹配!\n   Tab标题: {title}\n   OS 标题: {os_title}")
+                return page, title
+    return None
+
+
+async def resolve_active_page(browsers, use_os_titles: bool = True):
+    """
+    基于页面状态定位当前激活的标签页，返回 (page, title) 或 (None, None)。
+    browsers 可以是单个浏览器，也可以是多个端点的浏览器列表 (合并全部标签页后判断)。
+    1. 并发求值每个页面的 visibilityState / hasFocus() / title (每页一次往返)
+    2. 优先级: 有焦点且可见 > 可见 > 最新的有效标签页
+    多个窗口各有一个可见标签页时，可选用 OS 窗口标题作为决断依据。
+    """
+    if not isinstance(browsers, (list, tuple)):
+        browsers = [browsers]
+    pages = [
+        page
+        for browser in browsers
+        for context in browser.contexts
+        for page in context.pages
+        if is_capturable_page(page)
+    ]
+    if not pages:
+        return None, None
+
+    print(f"🔍 正在扫描 {len(pages)} 个标签页进行匹配...")
+    states = await asyncio.gather(*(_page_state(page) for page in pages))
+    # 标题直接来自各自的页面：重复打开的同一 URL、不同端点的页面互不混淆
+    entries = [
+        (page, title, visible, focused)
+        for page, (visible, focused, title) in zip(pages, states)
+    ]
+
+    focused = [(page, title) for page, title, vis, foc in entries if vis and foc]
+    visible = [(page, title) for page, title, vis, _ in entries if vis]
+
+    # 倒序，优先考虑最新的标签页
+    for tier_name, tier in (("焦点", focused), ("可见", visible)):
+        if not tier:
+            continue
+        candidates = list(reversed(tier))
+        if len(candidates) > 1 and use_os_titles:
+            chosen = _break_tie_with_os_titles(candidates)
+            if chosen:
+                return chosen
+        page, title = candidates[0]
+        print(f"✅ 命中{tier_name}标签页: {title}")
+        return page, title
+
+    # 兜底逻辑
+    print("⚠️  未找到可见的标签页，尝试使用最新的有效标签页作为兜底。")
+    page, title = entries[-1][:2]
+    print(f"👉 兜底选择: {title}")
+    return page, title
+
+
+async def get_active_tab_snapshot(
+    scope_for_url=None,
+    use_os_titles: bool = True,
+    memory_ceiling: int | None = None,
+    on_resolved=None,
+    prefetch=None,
+):
+    """
+    抓取当前激活的标签页，返回 (url, html, endpoint)，endpoint 为标签页所在的 CDP 端点。
+    所有端点的标签页合并后统一判断哪个是激活的标签页。
+    scope_for_url: 可选回调，url -> CSS 选择器 (或 None)，用于只截取正文区域。
+    use_os_titles: 多个候选标签页无法区分时，是否查询操作系统窗口标题辅助判断。
+    memory_ceiling: 设置后使用有界捕获 (见 capture_page_bounded)，
+        超大页面返回的 html 是临时快照文件的 Path，由调用方负责删除。
+    on_resolved: 可选回调，url -> None；锁定标签页后、捕获之前调用，
+        调用方可借此让策略准备、引擎启动与捕获并行进行。
+    prefetch: 可选的异步回调，(url, context) -> Markdown 或 None，在捕获之前调用；
+        返回 Markdown (通过站点接口得到) 时跳过 DOM 捕获，html 位置返回该 Markdown。
+    """
     try:
         async with async_playwright() as p:
-            # 1. 连接浏览器 CDP
+            # 1. 并发连接所有 CDP 端点
+            connections = await connect_browsers(p)
+            if not connections:
+                return None, None, None
+
             try:
-                browser = await p.chromium.connect_over_cdp(DEBUG_PORT_URL)
-            except Exception:
-                print(
-                    f"❌ 无法连接到浏览器。请确认已运行: chrome/msedge --remote-debugging-port=9222"
+                # 2. 基于 CDP 元数据定位激活的标签页
+                started = time.perf_counter()
+                with timed("resolve tab"):
+                    target_page, final_title = await with_deadline(
+                        "resolve",
+                        resolve_active_page(
+                            [browser for _, browser in connections], use_os_titles
+                        ),
+                    )
+                print(f"⏱️  标签页定位耗时: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+                if not target_page:
+                    print("❌ 无法锁定任何有效页面。")
+                    return None, None, None
+
+                # 3. 输出结果
+                endpoint = next(
+                    e for page, e in _capturable_pages(connections) if page is target_page
                 )
-                return None, None
+                final_url = target_page.url
+                if not final_title:
+                    final_title = await with_deadline("resolve", target_page.title(), final_url)
+                print(f"🚀 最终锁定: {final_title}")
+                print(f"🔗 URL: {final_url}")
+                if len(connections) > 1:
+                    print(f"🔌 来源端点: {endpoint}")
+
+                if on_resolved is not None:
+                    on_resolved(final_url)
+                if prefetch is not None:
+                    markdown = await prefetch(final_url, target_page.context)
+                    if markdown is not None:
+                        return final_url, markdown, endpoint
+                selector = scope_for_url(final_url) if scope_for_url else None
+                if memory_ceiling:
+                    capture = capture_page_bounded(target_page, selector, memory_ceiling)
+                else:
+                    capture = capture_page_html(target_page, selector)
+                content = await with_deadline("capture", capture, final_url)
+                return final_url, content, endpoint
+            finally:
+                await close_browsers(connections)
 
-            if not browser.contexts:
-                return None, None
-            pages = browser.contexts[0].pages
-            if not pages:
-                return None, None
+    except StageTimeout as e:
+        print(f"⏰ {e}")
+        return None, None, None
+    except Exception as e:
+        print(f"🔥 运行错误: {e}")
+        return None, None, None
 
-            # 2. 获取操作系统层面的进程标题
-            os_process_titles = get_process_titles()
 
-            # 调试信息：打印系统识别到的标题，方便排查
-            if not os_process_titles:
-                print("⚠️  未能获取到任何系统窗口标题 (可能权限不足或无窗口)。")
-            else:
-                # 仅打印前3个避免刷屏
-                print(f"🪟 系统检测到的激活窗口标题: {os_process_titles[:3]}...")
-
-            print(f"🔍 正在扫描 {len(pages)} 个标签页进行匹配...")
-
-            target_page = None
-
-            # 3. 核心逻辑：比对 Playwright 的 Tab 标题 和 OS 的进程标题
-            # 倒序遍历 (reversed)，优先检查最新的标签页
-            for page in reversed(pages):
-                try:
-                    p_title = await page.title()
-                    p_url = page.url
-
-                    if not p_title or "devtools://" in p_url:
-                        continue
-
-                    # 匹配逻辑：检查 Tab 标题是否包含在某个 OS 窗口标题中
-                    # 例如：Tab="02 | 强化学习"  vs  OS="02 | 强化学习 - Microsoft Edge"
-                    for os_title in os_process_titles:
-                        # 使用宽松的包含匹配，并忽略大小写
-                        if p_title.lower() in os_title.lower():
-                            print(
-                                f"✅ 命中匹配!\n   Tab标题: {p_title}\n   OS 标题: {os_title}"
-                            )
-                            target_page = page
-                            break
-
-                    if target_page:
-                        break
-                except:
-                    continue
-
-            # 4. 兜底逻辑
-            if not target_page:
-                print("⚠️  未找到标题完全匹配的页面，尝试使用最新的有效标签页作为兜底。")
-                valid_pages = [
-                    p
-                    for p in pages
-                    if "devtools://" not in p.url and p.url != "about:blank"
-                ]
-                if valid_pages:
-                    target_page = valid_pages[-1]
-                    t = await target_page.title()
-                    print(f"👉 兜底选择: {t}")
+def is_capturable_page(page) -> bool:
+    """过滤掉 DevTools、空白页以及浏览器内部页面。"""
+    url = page.url
+    if not url or url == "about:blank":
+        return False
+    return not url.startswith(("devtools://", "chrome://", "edge://", "chrome-extension://"))
 
-            if not target_page:
-                print("❌ 无法锁定任何有效页面。")
-                return None, None
 
-            # 5. 输出结果
-            final_title = await target_page.title()
-            final_url = target_page.url
-            print(f"🚀 最终锁定: {final_title}")
-            print(f"🔗 URL: {final_url}")
+async def _snapshot_page(page, scope_for_url=None, prefetch=None):
+    """抓取单个标签页，返回 (url, title, html)；prefetch 含义同 get_active_tab_snapshot。"""
+    title = await with_deadline("resolve", page.title(), page.url)
+    if prefetch is not None:
+        markdown = await prefetch(page.url, page.context)
+        if markdown is not None:
+            return page.url, title, markdown
+    selector = scope_for_url(page.url) if scope_for_url else None
+    content = await with_deadline("capture", capture_page_html(page, selector), page.url)
+    return page.url, title, content
 
-            content = await target_page.content()
-            await browser.close()
-            return final_url, content
+
+async def get_all_tab_snapshots(
+    url_pattern: re.Pattern | str | None = None, scope_for_url=None, prefetch=None
+):
+    """
+    并发连接所有 CDP 端点，合并标签页清单后并发抓取所有符合条件的标签页。
+    url_pattern 为正则表达式 (已编译的 Pattern 或字符串)，仅保留 URL 匹配的页面；
+    为 None 时抓取全部有效页面。
+    scope_for_url、prefetch 含义同 get_active_tab_snapshot。
+    返回 [(url, title, html, endpoint), ...]，单个页面或端点失败不会影响其他页面；
+    抓取失败 (含超时) 的页面同样保留，html 位置为其异常，由调用方计入失败汇总。
+    """
+    matcher = re.compile(url_pattern) if url_pattern else None
+
+    try:
+        async with async_playwright() as p:
+            connections = await connect_browsers(p)
+            if not connections:
+                return []
+
+            try:
+                pages = _capturable_pages(connections, matcher)
+                print(f"🔍 共找到 {len(pages)} 个待导出的标签页。")
+
+                results = await asyncio.gather(
+                    *(_snapshot_page(page, scope_for_url, prefetch) for page, _ in pages),
+                    return_exceptions=True,
+                )
+            finally:
+                await close_browsers(connections)
+
+            snapshots = []
+            for (page, endpoint), result in zip(pages, results):
+                if isinstance(result, BaseException):
+                    print(f"⚠️  抓取失败: {page.url} ({str(result) or type(result).__name__})")
+                    snapshots.append((page.url, "", result, endpoint))
+                else:
+                    snapshots.append((*result, endpoint))
+            return snapshots
 
     except Exception as e:
         print(f"🔥 运行错误: {e}")
-        return None, None
+        return []
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from . import __version__
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("TAB2MD_CACHE_DIR") or Path.home() / ".cache" / "tab2md"
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_cache_key(html: str, strategy_name: str, config_fingerprint: str) -> str:
+    """
+    缓存键 = sha256(tab2md 版本, 策略类, 配置指纹, 快照原文)。
+    快照不做空白归一化：<pre>、代码行等处的缩进本身就是内容；
+    版本参与计算，升级引擎或策略的 DOM 改写后旧结果自动失效。
+    """
+    digest = hashlib.sha256()
+    for part in (__version__, strategy_name, config_fingerprint, html):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def fingerprint_config(run_cfg, **extra) -> str:
+    """
+    将运行配置中的简单字段 (含 js_code、css_selector 等) 序列化为稳定的指纹。
+    无法序列化的对象 (如提取策略实例) 仅记录其类型名。
+    """
+    simple = (str, int, float, bool, list, tuple, type(None))
+    fields = {}
+    for name, value in sorted(vars(run_cfg).items()):
+        if name.startswith("_"):
+            continue
+        fields[name] = value if isinstance(value, simple) else type(value).__name__
+    fields.update(extra)
+    return json.dumps(fields, sort_keys=True, default=str, ensure_ascii=False)
+
+
+class ConversionCache:
+    """
+    基于 SQLite 的本地转换结果缓存。
+    超过 max_bytes 时按最近最少使用 (LRU) 顺序淘汰。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_dir / "conversions.sqlite3")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                markdown TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT markdown FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, markdown: str):
+        markdown = str(markdown)
+        size = len(markdown.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries (key, markdown, size, created, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, markdown, size, now, now),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def close(self):
+        self._conn.close()
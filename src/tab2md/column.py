@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from .browser_ops import async_playwright, capture_page_html, connect_browser
+from .deadlines import StageTimeout, with_deadline
+
+GEEKBANG_ARTICLES_API = "https://time.geekbang.org/serv/v1/column/articles"
+GEEKBANG_ARTICLE_URL = "https://time.geekbang.org/column/article/{}"
+CHECKPOINT_DIR = Path("exports") / ".checkpoints"
+DEFAULT_WORKERS = 3
+DEFAULT_RATE = 1.0  # 每个主机每秒最多打开的文章数
+PAGE_TIMEOUT_MS = 30000
+
+# 在专栏页面中收集文章链接；目录是懒加载的，需要滚动到底部直到数量稳定
+_COLLECT_LINKS_JS = """
+() => Array.from(document.querySelectorAll('a[href*="/column/article/"]'))
+    .map(a => [a.href, (a.textContent || '').trim()])
+"""
+
+
+class HostRateLimiter:
+    """按主机限速：同一主机两次请求之间至少间隔 1/rate 秒。"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlparse(url).hostname or ""
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            delay = self._next.get(host, now) - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next[host] = max(now, self._next.get(host, now)) + self.interval
+
+
+class ColumnCheckpoint:
+    """专栏导出进度：记录已完成/失败的文章，中断后重新运行可跳过已完成部分。"""
+
+    def __init__(self, column_url: str, directory: Path = CHECKPOINT_DIR):
+        key = _column_id(column_url) or hashlib.sha1(column_url.encode()).hexdigest()[:12]
+        self.path = Path(directory) / f"column_{key}.json"
+        self.data = {"column": column_url, "done": {}, "failed": {}}
+        if self.path.exists():
+            try:
+                self.data.update(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                print(f"⚠️  进度文件损坏，将重新开始: {self.path}")
+
+    def is_done(self, url: str) -> bool:
+        return url in self.data["done"]
+
+    def mark_done(self, url: str, output: str):
+        self.data["done"][url] = output
+        self.data["failed"].pop(url, None)
+        self._save()
+
+    def mark_failed(self, url: str, error: str):
+        self.data["failed"][url] = error
+        self._save()
+
+    def _save(self):
+        # 先写临时文件再替换，避免中断时留下半个 JSON
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def _column_id(url: str) -> str | None:
+    m = re.search(r"/column/intro/(\d+)", url)
+    return m.group(1) if m else None
+
+
+async def _articles_from_api(context, column_url: str) -> list[tuple[str, str]]:
+    """通过专栏目录接口 (携带浏览器会话 Cookie) 获取文章列表。"""
+    cid = _column_id(column_url)
+    if not cid:
+        return []
+    response = await context.request.post(
+        GEEKBANG_ARTICLES_API,
+        data={"cid": cid, "size": 500, "prev": 0, "order": "earliest", "sample": False},
+        headers={"Origin": "https://time.geekbang.org", "Referer": column_url},
+    )
+    if not response.ok:
+        return []
+    payload = await response.json()
+    articles = (payload.get("data") or {}).get("list") or []
+    return [
+        (GEEKBANG_ARTICLE_URL.format(a["id"]), a.get("article_title", ""))
+        for a in articles
+        if a.get("id")
+    ]
+
+
+async def _articles_from_page(context, column_url: str) -> list[tuple[str, str]]:
+    """兜底：打开专栏页面，滚动加载目录后收集文章链接。"""
+    page = await context.new_page()
+    try:
+        await page.goto(column_url, wait_until="load", timeout=PAGE_TIMEOUT_MS)
+        seen: dict[str, str] = {}
+        for _ in range(20):
+            before = len(seen)
+            for href, title in await page.evaluate(_COLLECT_LINKS_JS):
+                href = urljoin(column_url, href).split("?")[0].split("#")[0]
+                seen.setdefault(href, title)
+            if len(seen) == before and before:
+                break
+            await page.mouse.wheel(0, 20000)
+            await page.wait_for_timeout(500)
+        return list(seen.items())
+    finally:
+        await page.close()
+
+
+class ColumnExporter:
+    """
+    整个专栏导出：复用用户浏览器的登录态枚举文章，
+    以有限的并发在后台标签页中打开文章并按主机限速，
+    每完成一篇就写入进度文件。
+
+    convert: async (url, html) -> Path，负责转换与保存
+    scope_for_url: url -> CSS 选择器 (或 None)，捕获范围
+    prefetch: 可选，async (url, context) -> Markdown 或 None；
+        返回 Markdown 时直接交给 convert，不再打开文章页面
+    """
+
+    def __init__(
+        self,
+        convert,
+        scope_for_url=None,
+        workers: int = DEFAULT_WORKERS,
+        rate: float = DEFAULT_RATE,
+        prefetch=None,
+    ):
+        self.convert = convert
+        self.scope_for_url = scope_for_url
+        self.prefetch = prefetch
+        self.workers = max(1, workers)
+        self.limiter = HostRateLimiter(rate)
+        self._page_lock = asyncio.Lock()
+
+    async def _open_background_page(self, browser, context):
+        """通过 CDP 在后台创建标签页，避免抢占用户当前的焦点。"""
+        async with self._page_lock:
+            session = await browser.new_browser_cdp_session()
+            try:
+                async with context.expect_page() as page_info:
+                    await session.send(
+                        "Target.createTarget", {"url": "about:blank", "background": True}
+                    )
+                return await page_info.value
+            finally:
+                await session.detach()
+
+    async def _export_article(self, browser, context, url: str) -> Path:
+        await self.limiter.wait(url)
+        if self.prefetch is not None:
+            markdown = await self.prefetch(url, context)
+            if markdown is not None:
+                return await self.convert(url, markdown)
+        page = await self._open_background_page(browser, context)
+        selector = self.scope_for_url(url) if self.scope_for_url else None
+
+        async def navigate():
+            await page.goto(url, wait_until="load", timeout=PAGE_TIMEOUT_MS)
+            if selector:
+                # SPA 正文在 load 之后才渲染，等待捕获范围出现
+                await page.wait_for_selector(selector, timeout=PAGE_TIMEOUT_MS)
+
+        try:
+            await with_deadline("fetch", navigate(), url)
+            html = await with_deadline("capture", capture_page_html(page, selector), url)
+        finally:
+            await page.close()
+        return await self.convert(url, html)
+
+    async def run(self, column_url: str):
+        checkpoint = ColumnCheckpoint(column_url)
+        async with async_playwright() as p:
+            browser = await connect_browser(p)
+            if browser is None or not browser.contexts:
+                return
+            context = browser.contexts[0]
+
+            articles = []
+            for source in (_articles_from_api, _articles_from_page):
+                try:
+                    articles = await with_deadline("fetch", source(context, column_url), column_url)
+                except StageTimeout as e:
+                    print(f"⏰ 获取文章列表: {e}")
+                if articles:
+                    break
+            if not articles:
+                print("❌ 未能获取专栏文章列表。")
+                return
+
+            pending = [(url, title) for url, title in articles if not checkpoint.is_done(url)]
+            print(
+                f"📚 专栏共 {len(articles)} 篇，已完成 {len(articles) - len(pending)} 篇，"
+                f"本次导出 {len(pending)} 篇 (并发 {self.workers})。"
+            )
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in pending:
+                queue.put_nowait(item)
+            finished = 0
+
+            async def worker():
+                nonlocal finished
+                while True:
+                    try:
+                        url, title = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        md_file = await self._export_article(browser, context, url)
+                    except Exception as e:
+                        checkpoint.mark_failed(url, str(e))
+                        print(f"❌ {title or url}\n   错误: {e}")
+                    else:
+                        checkpoint.mark_done(url, str(md_file))
+                        finished += 1
+                        print(f"✅ [{finished}/{len(pending)}] {title or url}\n   📂 {md_file}")
+
+            await asyncio.gather(*(worker() for _ in range(min(self.workers, len(pending)))))
+            await browser.close()
+
+        failed = len(checkpoint.data["failed"])
+        print(f"\n🏁 专栏导出完成: 成功 {len(checkpoint.data['done'])} / 失败 {failed}")
+        if failed:
+            print(f"   重新运行同一命令即可重试失败的文章 (进度: {checkpoint.path})")
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .engines import EngineUnsupportedError
+from .timings import span
+
+DEFAULT_CPU_WORKERS = 0  # 0 表示不使用进程池，在事件循环所在的进程中直接转换
+MIN_OFFLOAD_BYTES = 64 * 1024  # 更小的快照在本进程中转换更快 (省去进程间传输)
+
+
+def _warm_worker():
+    """工作进程启动后预先导入策略注册表与 crawl4ai 配置类 (策略配置依赖它)。"""
+    from .strategies.registry import get_registry
+
+    get_registry()
+    try:
+        import crawl4ai.async_configs  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _convert_in_worker(url: str, snapshot: str) -> str | None:
+    """工作进程：快照 → Markdown；策略不使用快速引擎时返回 None。"""
+    from .strategies.registry import get_registry
+
+    strategy = get_registry().lookup(url)
+    try:
+        return strategy.convert_fast(url, snapshot)
+    except EngineUnsupportedError:
+        return None
+
+
+class CPUPool:
+    """
+    CPU 密集转换的进程池。
+    transform_html、预裁剪与快速引擎的 Markdown 生成在工作进程中完成，
+    事件循环只负责 CDP 通信与 I/O，批量/专栏导出的吞吐随核数增长。
+    - 快照与结果直接以 str 经 pickle 传递，不额外编码/解码出副本
+    - 需要浏览器引擎 (js_code) 的策略与过小的快照不进入进程池
+    - 工作进程以 spawn 方式启动，不继承父进程的事件循环、线程与浏览器连接
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.offloaded = 0
+
+    def warm_up(self) -> asyncio.Future:
+        """后台启动全部工作进程，可与快照捕获并行进行。"""
+        loop = asyncio.get_running_loop()
+        return asyncio.gather(
+            *(loop.run_in_executor(self._executor, _warm_worker) for _ in range(self.workers)),
+            return_exceptions=True,
+        )
+
+    def accepts(self, strategy, raw_html: str) -> bool:
+        """快照是否值得交给进程池：足够大，且策略使用快速引擎。"""
+        if len(raw_html) < MIN_OFFLOAD_BYTES:
+            return False
+        return strategy.resolve_engine(strategy.get_run_config()) == "fast"
+
+    async def convert(self, url: str, raw_html: str) -> str | None:
+        """在工作进程中转换；策略不使用快速引擎时返回 None，由调用方走常规 execute()。"""
+        loop = asyncio.get_running_loop()
+        with span("cpu pool", bytes=len(raw_html)) as s:
+            result = await loop.run_in_executor(self._executor, _convert_in_worker, url, raw_html)
+            s.set(out_bytes=len(result or ""))
+        if result is None:
+            return None
+        self.offloaded += 1
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_default_pool: CPUPool | None = None
+
+
+def get_cpu_pool() -> CPUPool | None:
+    """返回进程级 CPU 进程池；未通过 configure_cpu_pool 启用时为 None。"""
+    return _default_pool
+
+
+def configure_cpu_pool(workers: int) -> CPUPool | None:
+    """启用 (workers > 0) 或关闭进程级 CPU 进程池。"""
+    global _default_pool
+    close_cpu_pool()
+    if workers > 0:
+        _default_pool = CPUPool(workers)
+    return _default_pool
+
+
+def close_cpu_pool():
+    global _default_pool
+    if _default_pool is not None:
+        _default_pool.close()
+        _default_pool = None
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from .timings import span
+
+if TYPE_CHECKING:
+    # crawl4ai 在首次启动浏览器时才导入，避免拖慢 CLI 启动
+    from crawl4ai import AsyncWebCrawler
+    from crawl4ai.async_configs import BrowserConfig
+
+DEFAULT_MAX_SIZE = 1
+DEFAULT_MAX_LEASES = 4
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+
+class _PooledCrawler:
+    """池中的一个无头浏览器实例及其使用状态。"""
+
+    def __init__(self, crawler: AsyncWebCrawler):
+        self.crawler = crawler
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+
+def _is_healthy(crawler: AsyncWebCrawler) -> bool:
+    """
+    健康检查：底层 Playwright 浏览器是否仍处于连接状态。
+    Crawl4AI 不同版本的内部结构不同，找不到浏览器对象时视为健康。
+    """
+    strategy = getattr(crawler, "crawler_strategy", None)
+    manager = getattr(strategy, "browser_manager", None)
+    browser = getattr(manager, "browser", None) or getattr(strategy, "browser", None)
+    if browser is None or not hasattr(browser, "is_connected"):
+        return True
+    try:
+        return browser.is_connected()
+    except Exception:
+        return False
+
+
+class CrawlerPool:
+    """
+    进程级的 AsyncWebCrawler 池。
+    浏览器实例启动后保持常驻，由各次转换借用，避免每次转换都重新启动 Chromium。
+
+    max_size: 最多同时存在的浏览器实例数
+    max_leases: 单个实例允许同时借出的次数 (Crawl4AI 支持同一实例并发 arun)
+    idle_timeout: 实例空闲超过该秒数后自动关闭
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_leases: int = DEFAULT_MAX_LEASES,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        browser_config: BrowserConfig | None = None,
+    ):
+        self.max_size = max(1, max_size)
+        self.max_leases = max(1, max_leases)
+        self.idle_timeout = idle_timeout
+        self.browser_config = browser_config
+        self._members: list[_PooledCrawler] = []
+        self._launching = 0
+        self._condition = asyncio.Condition()
+        self._reaper: asyncio.Task | None = None
+        self._closed = False
+
+    async def _launch(self) -> _PooledCrawler:
+        from crawl4ai import AsyncWebCrawler
+        from crawl4ai.async_configs import BrowserConfig
+
+        if self.browser_config is None:
+            self.browser_config = BrowserConfig(headless=True, verbose=False)
+        with span("crawler launch"):
+            crawler = AsyncWebCrawler(config=self.browser_config)
+            await crawler.__aenter__()
+        return _PooledCrawler(crawler)
+
+    async def _shutdown(self, member: _PooledCrawler):
+        try:
+            await member.crawler.__aexit__(None, None, None)
+        except Exception as e:
+            print(f"⚠️  关闭无头浏览器失败: {e}")
+
+    def _pick(self) -> _PooledCrawler | None:
+        """选择一个健康且未满载的实例 (借出次数最少者优先)。"""
+        available = [m for m in self._members if m.leases < self.max_leases]
+        return min(available, key=lambda m: m.leases, default=None)
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self):
+        """后台任务：定期关闭空闲超时的实例。"""
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            async with self._condition:
+                expired = [
+                    m
+                    for m in self._members
+                    if m.leases == 0 and now - m.last_used >= self.idle_timeout
+                ]
+                for member in expired:
+                    self._members.remove(member)
+            for member in expired:
+                await self._shutdown(member)
+
+    async def acquire(self) -> AsyncWebCrawler:
+        """借出一个可用的 crawler；池满时等待其他转换归还。"""
+        if self._closed:
+            raise RuntimeError("CrawlerPool 已关闭")
+        self._ensure_reaper()
+
+        async with self._condition:
+            while True:
+                # 剔除已经断开的实例
+                dead = [
+                    m for m in self._members if m.leases == 0 and not _is_healthy(m.crawler)
+                ]
+                for member in dead:
+                    self._members.remove(member)
+                    asyncio.create_task(self._shutdown(member))
+
+                member = self._pick()
+                if member is not None:
+                    member.leases += 1
+                    member.last_used = time.monotonic()
+                    return member.crawler
+
+                if len(self._members) + self._launching < self.max_size:
+                    self._launching += 1
+                    break
+
+                await self._condition.wait()
+
+        # 在锁外启动浏览器，避免阻塞其他借用者
+        try:
+            member = await self._launch()
+        except BaseException:
+            async with self._condition:
+                self._launching -= 1
+                self._condition.notify_all()
+            raise
+
+        async with self._condition:
+            self._launching -= 1
+            member.leases = 1
+            self._members.append(member)
+            self._condition.notify_all()
+        return member.crawler
+
+    async def release(self, crawler: AsyncWebCrawler):
+        """归还借出的 crawler。"""
+        async with self._condition:
+            for member in self._members:
+                if member.crawler is crawler:
+                    member.leases = max(0, member.leases - 1)
+                    member.last_used = time.monotonic()
+                    break
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def borrow(self):
+        crawler = await self.acquire()
+        try:
+            yield crawler
+        finally:
+            await self.release(crawler)
+
+    async def warm_up(self, count: int = 1):
+        """预先启动若干实例，使首次转换无需等待浏览器启动。"""
+        count = min(count, self.max_size)
+        crawlers = [await self.acquire() for _ in range(count)]
+        for crawler in crawlers:
+            await self.release(crawler)
+
+    async def close(self):
+        """关闭池中所有实例。"""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+        async with self._condition:
+            members, self._members = self._members, []
+        for member in members:
+            await self._shutdown(member)
+
+
+_default_pool: CrawlerPool | None = None
+
+
+def get_crawler_pool() -> CrawlerPool:
+    """返回进程级默认 crawler 池 (按需创建)。"""
+    global _default_pool
+    if _default_pool is None or _default_pool._closed:
+        _default_pool = CrawlerPool()
+    return _default_pool
+
+
+def configure_crawler_pool(**kwargs) -> CrawlerPool:
+    """使用自定义参数替换默认 crawler 池 (需在首次借用前调用)。"""
+    global _default_pool
+    _default_pool = CrawlerPool(**kwargs)
+    return _default_pool
+
+
+async def close_crawler_pool():
+    """关闭进程级默认 crawler 池。"""
+    global _default_pool
+    if _default_pool is not None:
+        await _default_pool.close()
+        _default_pool = None
@@ -0,0 +1,122 @@
+import asyncio
+
+# 流水线各阶段的时限 (秒)，0 或 None 表示不限制
+# fetch: 站点接口请求 (文章/目录接口) 与专栏文章页的导航；assets: 图片本地化
+STAGES = ("connect", "resolve", "fetch", "capture", "extract", "assets")
+DEFAULT_DEADLINES = {
+    "connect": 5.0,
+    "resolve": 10.0,
+    "fetch": 30.0,
+    "capture": 30.0,
+    "extract": 60.0,
+    "assets": 60.0,
+}
+DEADLINES: dict[str, float] = dict(DEFAULT_DEADLINES)
+
+
+class StageTimeout(Exception):
+    """某个阶段超过了时限；stage 为阶段名称。"""
+
+    def __init__(self, stage: str, seconds: float, url: str = ""):
+        target = f" ({url})" if url else ""
+        super().__init__(f"阶段 [{stage}] 超过时限 {seconds:g} 秒{target}")
+        self.stage = stage
+        self.seconds = seconds
+        self.url = url
+
+
+class RunSummary:
+    """记录本次运行中的超时与回退，运行结束时统一输出。"""
+
+    def __init__(self):
+        self.events: list[tuple[str, str, str]] = []  # (阶段, URL, 说明)
+
+    def record(self, stage: str, url: str, detail: str):
+        self.events.append((stage, url, detail))
+
+    def report(self):
+        if not self.events:
+            return
+        print("\n⏰ 超时与回退:")
+        for stage, url, detail in self.events:
+            print(f"   [{stage}] {detail}" + (f"\n      {url}" if url else ""))
+
+
+RUN_SUMMARY = RunSummary()
+
+
+def parse_deadline(text: str) -> tuple[str, float]:
+    """解析命令行中的 STAGE=SECONDS。"""
+    stage, sep, seconds = text.partition("=")
+    if not sep or stage not in STAGES:
+        raise ValueError(f"格式应为 STAGE=SECONDS，STAGE 取值: {', '.join(STAGES)}")
+    return stage, float(seconds)
+
+
+async def with_deadline(stage: str, awaitable, url: str = ""):
+    """
+    在阶段时限内等待 awaitable；超时时取消它、记录到运行摘要并抛出 StageTimeout。
+    只对真正等待 I/O 的操作有效，同步执行的 CPU 计算无法被中途打断。
+    """
+    seconds = DEADLINES.get(stage)
+    if not seconds:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, seconds)
+    except asyncio.TimeoutError:
+        RUN_SUMMARY.record(stage, url, f"超过时限 {seconds:g} 秒")
+        raise StageTimeout(stage, seconds, url) from None
+
+
+async def hedged(stage: str, primary, hedge=None, url: str = "", label: str = ""):
+    """
+    在阶段时限内等待 primary (协程)。超时后若提供了 hedge (返回协程的无参可调用对象)，
+    同时启动对冲任务，谁先得到非空结果就用谁，另一个被取消；
+    总等待不超过两倍时限 (没有对冲时为一倍)，仍未完成则抛出 StageTimeout。
+    返回 (结果, 是否为对冲结果)。
+    """
+    seconds = DEADLINES.get(stage)
+    task = asyncio.ensure_future(primary)
+    if not seconds:
+        return await task, False
+
+    done, _ = await asyncio.wait({task}, timeout=seconds)
+    if done:
+        return task.result(), False
+    if hedge is None:
+        task.cancel()
+        RUN_SUMMARY.record(stage, url, f"{label} 超过时限 {seconds:g} 秒，已放弃")
+        raise StageTimeout(stage, seconds, url)
+
+    print(f"⏰ {label} 超过 [{stage}] 时限 {seconds:g} 秒，启动对冲转换...")
+    backup = asyncio.ensure_future(hedge())
+    pending = {task, backup}
+    loop = asyncio.get_running_loop()
+    cutoff = loop.time() + seconds
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, cutoff - loop.time()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for finished in done:
+                if finished.cancelled() or finished.exception() is not None:
+                    continue
+                result = finished.result()
+                if result and str(result).strip():
+                    winner = "对冲转换" if finished is backup else label
+                    RUN_SUMMARY.record(stage, url, f"{label} 超时，{winner}先完成")
+                    return result, finished is backup
+    finally:
+        for unfinished in pending:
+            unfinished.cancel()
+
+    if task.done() and not task.cancelled():
+        # 两者都没有得到有效结果：沿用主任务的结果 (或异常)
+        RUN_SUMMARY.record(stage, url, f"{label} 超时，对冲转换也未得到结果")
+        return task.result(), False
+    RUN_SUMMARY.record(stage, url, f"{label} 与对冲转换均超过 {seconds * 2:g} 秒")
+    raise StageTimeout(stage, seconds * 2, url)
@@ -0,0 +1,177 @@
+# 极简的可变 DOM：基于标准库 html.parser 构建，用于在 Python 侧改写快照
+# (替代在无头浏览器里执行的 js_code)。只实现策略改写所需的最小 API。
+
+from html import escape
+from html.parser import HTMLParser
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+RAW_TEXT_TAGS = {"script", "style"}
+
+
+class Node:
+    __slots__ = ("parent",)
+
+    def __init__(self):
+        self.parent: "Element | None" = None
+
+    def remove(self):
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def replace_with(self, new: "Node"):
+        parent = self.parent
+        index = parent.children.index(self)
+        new.remove()
+        parent.children[index] = new
+        new.parent = parent
+        self.parent = None
+
+
+class Text(Node):
+    __slots__ = ("data",)
+
+    def __init__(self, data: str):
+        super().__init__()
+        self.data = data
+
+
+class Element(Node):
+    __slots__ = ("tag", "attrs", "children")
+
+    def __init__(self, tag: str, attrs: dict | None = None):
+        super().__init__()
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.children: list[Node] = []
+
+    # --- 结构修改 ---
+    def append(self, node: Node) -> Node:
+        node.remove()
+        node.parent = self
+        self.children.append(node)
+        return node
+
+    def insert(self, index: int, node: Node) -> Node:
+        node.remove()
+        node.parent = self
+        self.children.insert(index, node)
+        return node
+
+    def take_children(self, other: "Element"):
+        """把 other 的全部子节点移入本元素 (相当于 innerHTML 搬迁)。"""
+        for child in other.children:
+            child.parent = self
+        self.children.extend(other.children)
+        other.children = []
+
+    # --- 查询 ---
+    def iter(self):
+        """前序遍历所有后代节点 (不含自身)。"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            if isinstance(node, Element):
+                stack.extend(reversed(node.children))
+
+    def iter_elements(self, tag: str | None = None, **attrs):
+        for node in self.iter():
+            if not isinstance(node, Element):
+                continue
+            if tag is not None and node.tag != tag:
+                continue
+            if all(node.attrs.get(k.replace("_", "-")) == v for k, v in attrs.items()):
+                yield node
+
+    def iter_text(self):
+        for node in self.iter():
+            if isinstance(node, Text):
+                yield node
+
+    def text_content(self) -> str:
+        return "".join(t.data for t in self.iter_text())
+
+    def closest(self, tags) -> "Element | None":
+        node = self
+        while node is not None and isinstance(node, Element):
+            if node.tag in tags:
+                return node
+            node = node.parent
+        return None
+
+    def find_body(self) -> "Element":
+        return next(self.iter_elements("body"), self)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document")
+        self.doctype = ""
+        self._stack = [self.root]
+
+    def handle_decl(self, decl):
+        if decl.lower().startswith("doctype"):
+            self.doctype = f"<!{decl}>"
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, {k: (v if v is not None else "") for k, v in attrs})
+        self._stack[-1].append(element)
+        if tag not in VOID_TAGS:
+            self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._stack.pop()
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].append(Text(data))
+
+
+def parse_html(html: str) -> Element:
+    """解析 HTML，返回 #document 根节点 (doctype 保存在 root.attrs['doctype'])。"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    if builder.doctype:
+        builder.root.attrs["doctype"] = builder.doctype
+    return builder.root
+
+
+def _serialize(node: Node, out: list[str], raw: bool = False):
+    if isinstance(node, Text):
+        out.append(node.data if raw else escape(node.data, quote=False))
+        return
+    attrs = "".join(
+        f' {k}="{escape(v, quote=True)}"' if v != "" else f" {k}"
+        for k, v in node.attrs.items()
+    )
+    out.append(f"<{node.tag}{attrs}>")
+    if node.tag in VOID_TAGS:
+        return
+    for child in node.children:
+        _serialize(child, out, raw=node.tag in RAW_TEXT_TAGS)
+    out.append(f"</{node.tag}>")
+
+
+def serialize(node: Element) -> str:
+    """序列化为 HTML。传入 #document 根节点时输出整篇文档。"""
+    out: list[str] = []
+    if node.tag == "#document":
+        out.append(node.attrs.get("doctype", ""))
+        for child in node.children:
+            _serialize(child, out)
+    else:
+        _serialize(node, out)
+    return "".join(out)
@@ -0,0 +1,40 @@
+import os
+
+from .base import ConversionEngine, EngineUnsupportedError
+
+ENGINE_NAMES = ("auto", "fast", "crawl4ai", "browser")
+
+# engine = "auto" 且配置了 js_code 时使用的引擎:
+#   "crawl4ai" - 启动独立的无头浏览器重新渲染快照 (默认)
+#   "browser"  - 在用户浏览器的隐藏目标中执行 js_code，再用快速引擎提取
+JS_ENGINES = ("crawl4ai", "browser")
+JS_ENGINE = os.environ.get("TAB2MD_JS_ENGINE", "crawl4ai")
+
+
+def get_engine(name: str, crawler=None, endpoint: str | None = None) -> ConversionEngine:
+    """
+    按名称创建转换引擎。Crawl4AI 与浏览器内引擎按需导入，避免无谓加载浏览器依赖。
+    endpoint: 浏览器内引擎使用的 CDP 端点 (快照来源)。
+    """
+    if name == "fast":
+        from .fast import FastEngine
+
+        return FastEngine()
+    if name == "crawl4ai":
+        from .crawl4ai_engine import Crawl4AIEngine
+
+        return Crawl4AIEngine(crawler=crawler)
+    if name == "browser":
+        from .browser_engine import BrowserEngine
+
+        return BrowserEngine(endpoint=endpoint)
+    raise ValueError(f"未知的转换引擎: {name}")
+
+
+__all__ = [
+    "ConversionEngine",
+    "EngineUnsupportedError",
+    "ENGINE_NAMES",
+    "JS_ENGINES",
+    "get_engine",
+]
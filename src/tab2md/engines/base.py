@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+
+
+class EngineUnsupportedError(Exception):
+    """引擎无法处理当前配置 (例如需要执行 js_code)，调用方应回退到其他引擎。"""
+
+
+class ConversionEngine(ABC):
+    """
+    HTML → Markdown 转换引擎的基类。
+    策略负责给出配置 (CrawlerRunConfig)，引擎负责执行实际的提取。
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def convert(self, url: str, html: str, run_cfg) -> str:
+        """
+        将已注入 <base> 的快照 HTML 转换为 Markdown。
+        无法处理时抛出 EngineUnsupportedError。
+        """
+        pass
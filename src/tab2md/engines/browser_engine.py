@@ -0,0 +1,222 @@
+import asyncio
+import copy
+import html as html_lib
+import itertools
+import json
+import re
+from contextlib import suppress
+
+from ..prune import prune_html
+from ..timings import span
+from .base import ConversionEngine, EngineUnsupportedError
+
+LOAD_TIMEOUT = 10.0  # 等待快照中的样式表加载 (秒)
+SCRIPT_TIMEOUT = 30.0  # 单段 js_code 的执行上限 (秒)
+# 隐藏目标中用不到的资源；样式表保留，js_code 可能依赖计算样式 (如识别加粗)
+_BLOCKED_EXTENSIONS = "png jpg jpeg gif webp avif ico svg mp4 webm woff woff2 ttf otf"
+BLOCKED_URL_PATTERNS = [f"*.{ext}" for ext in _BLOCKED_EXTENSIONS.split()]
+
+_WAIT_LOAD_JS = """
+Promise.race([
+    new Promise(resolve => {
+        if (document.readyState === 'complete') return resolve();
+        window.addEventListener('load', () => resolve(), { once: true });
+    }),
+    new Promise(resolve => setTimeout(resolve, %d)),
+])
+""" % (LOAD_TIMEOUT * 1000)
+# 载入隐藏目标前删除快照中一切可能执行脚本或导航的内容 (在用户已登录的浏览器中运行)：
+# 脚本与可嵌入文档的元素整段删除，事件处理属性、javascript: 地址与 meta refresh 逐个删除
+_ACTIVE_ELEMENTS = ("script", "iframe", "object", "frame", "frameset")
+_TAG_RE = re.compile(r"""<([a-zA-Z][\w:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+_ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?""")
+_SCRIPT_URL_RE = re.compile(r"^(?:javascript|vbscript):", re.I)
+_URL_NOISE_RE = re.compile(r"[\x00-\x20]+")
+
+_OUTER_HTML_JS = (
+    "(document.doctype ? new XMLSerializer().serializeToString(document.doctype) : '')"
+    " + document.documentElement.outerHTML"
+)
+
+
+def _sanitize_tag(match: re.Match) -> str:
+    tag, attr_text = match.group(1), match.group(2)
+    attrs = []
+    for attr in _ATTR_RE.finditer(attr_text):
+        name, raw = attr.group(1), attr.group(2) or ""
+        value = html_lib.unescape(raw.strip("\"'"))
+        if name.lower().startswith("on") or _SCRIPT_URL_RE.match(_URL_NOISE_RE.sub("", value)):
+            continue
+        attrs.append(attr.group(0))
+    tag = tag.lower()
+    if tag == "embed":
+        return ""
+    if tag == "meta" and any(a.lower().startswith("http-equiv") and "refresh" in a.lower() for a in attrs):
+        return ""
+    closing = "/" if attr_text.rstrip().endswith("/") and attrs else ""
+    return f"<{match.group(1)}{''.join(' ' + a for a in attrs)}{closing}>"
+
+
+def sanitize_snapshot(html: str) -> str:
+    """
+    去掉快照中在页面载入时就会执行或导航的内容：脚本与内嵌文档、
+    on* 事件处理属性 (如被拦截图片的 onerror)、javascript: 地址与 <meta http-equiv="refresh">。
+    之后只有策略的 js_code 会在隐藏目标中运行。
+    """
+    pruned = prune_html(html, _ACTIVE_ELEMENTS, strip_data_uris=False)
+    return _TAG_RE.sub(_sanitize_tag, pruned)
+
+
+class _TargetSession:
+    """
+    经由浏览器级 CDP 会话与隐藏目标通信 (Target.sendMessageToTarget)。
+    Playwright 不认识我们自建的浏览器上下文，因此不通过 Page 对象驱动该目标。
+    """
+
+    def __init__(self, browser_session, session_id: str):
+        self._browser_session = browser_session
+        self.session_id = session_id
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+
+    def dispatch(self, event: dict):
+        """Target.receivedMessageFromTarget 事件回调：把响应交给等待中的请求。"""
+        if event.get("sessionId") != self.session_id:
+            return
+        message = json.loads(event["message"])
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(RuntimeError(message["error"].get("message", "CDP 调用失败")))
+        else:
+            future.set_result(message.get("result", {}))
+
+    async def send(self, method: str, params: dict | None = None, timeout: float = SCRIPT_TIMEOUT):
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self._browser_session.send(
+                "Target.sendMessageToTarget",
+                {
+                    "sessionId": self.session_id,
+                    "message": json.dumps(
+                        {"id": message_id, "method": method, "params": params or {}}
+                    ),
+                },
+            )
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def evaluate(self, expression: str, timeout: float = SCRIPT_TIMEOUT):
+        result = await self.send(
+            "Runtime.evaluate",
+            {"expression": expression, "awaitPromise": True, "returnByValue": True},
+            timeout,
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            description = details.get("exception", {}).get("description") or details.get("text")
+            raise RuntimeError(f"脚本执行失败: {description}")
+        return result.get("result", {}).get("value")
+
+
+async def _create_hidden_target(session, context_id: str) -> str:
+    """
+    在独立上下文中创建不出现在标签栏中的目标。
+    浏览器不支持 hidden 参数时抛出 EngineUnsupportedError (由调用方回退到 Crawl4AI)：
+    没有 hidden 的新上下文可能打开一个用户可见的窗口。
+    """
+    params = {
+        "url": "about:blank",
+        "browserContextId": context_id,
+        "background": True,
+        "hidden": True,
+    }
+    try:
+        result = await session.send("Target.createTarget", params)
+    except Exception as e:
+        raise EngineUnsupportedError(f"浏览器不支持隐藏目标 ({e})") from e
+    return result["targetId"]
+
+
+class BrowserEngine(ConversionEngine):
+    """
+    在用户已经运行的浏览器中执行 js_code 的提取引擎：
+    通过现有 CDP 连接创建一次性的独立浏览器上下文与隐藏目标，载入快照 (去掉页面脚本)，
+    执行策略的 js_code，取回修复后的 DOM 交给快速引擎提取。
+    用户的标签页不会被改动，也不会启动额外的浏览器进程。
+
+    endpoint: 快照所在的 CDP 端点 (默认第一个端点)。
+    """
+
+    name = "browser"
+
+    def __init__(self, endpoint: str | None = None):
+        self.endpoint = endpoint
+
+    async def _render(self, browser, html: str, js_code) -> str:
+        session = await browser.new_browser_cdp_session()
+        context_id = target_id = None
+        try:
+            created = await session.send("Target.createBrowserContext", {"disposeOnDetach": True})
+            context_id = created["browserContextId"]
+            target_id = await _create_hidden_target(session, context_id)
+            attached = await session.send(
+                "Target.attachToTarget", {"targetId": target_id, "flatten": False}
+            )
+            target = _TargetSession(session, attached["sessionId"])
+            session.on("Target.receivedMessageFromTarget", target.dispatch)
+
+            await target.send("Network.enable")
+            await target.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            frame = await target.send("Page.getFrameTree")
+            await target.send(
+                "Page.setDocumentContent",
+                {
+                    "frameId": frame["frameTree"]["frame"]["id"],
+                    # 快照中的页面脚本与事件处理属性不再执行，只运行策略的 js_code
+                    "html": sanitize_snapshot(html),
+                },
+            )
+            await target.evaluate(_WAIT_LOAD_JS, LOAD_TIMEOUT + 1)
+
+            scripts = [js_code] if isinstance(js_code, str) else list(js_code or ())
+            for script in scripts:
+                await target.evaluate(f"(async () => {{\n{script}\n}})()")
+            return await target.evaluate(_OUTER_HTML_JS)
+        finally:
+            # 每一步清理单独忽略失败：关闭目标出错时仍要销毁上下文 (连同其中的目标)，
+            # 否则隐藏目标会遗留在用户的浏览器中
+            if target_id is not None:
+                with suppress(Exception):
+                    await session.send("Target.closeTarget", {"targetId": target_id})
+            if context_id is not None:
+                with suppress(Exception):
+                    await session.send(
+                        "Target.disposeBrowserContext", {"browserContextId": context_id}
+                    )
+            with suppress(Exception):
+                await session.detach()
+
+    async def convert(self, url: str, html: str, run_cfg) -> str:
+        from ..browser_ops import async_playwright, connect_browser
+        from .fast import FastEngine
+
+        async with async_playwright() as p:
+            browser = await connect_browser(p, self.endpoint)
+            if browser is None:
+                raise EngineUnsupportedError("无法通过 CDP 连接用户浏览器")
+            try:
+                with span("browser target", js_code=bool(run_cfg.js_code), bytes=len(html)) as s:
+                    rendered = await self._render(browser, html, run_cfg.js_code)
+                    s.set(out_bytes=len(rendered))
+            finally:
+                await browser.close()
+
+        # js_code 已在隐藏目标中执行完毕，剩下的提取交给快速引擎
+        fast_cfg = copy.copy(run_cfg)
+        fast_cfg.js_code = None
+        return await FastEngine().convert(url, rendered, fast_cfg)
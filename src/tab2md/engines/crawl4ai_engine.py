@@ -0,0 +1,92 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from ..timings import span
+from .base import ConversionEngine
+
+# 快照交给 Crawl4AI 的方式:
+#   "raw"  - 通过 raw: 前缀直接在内存中传递 HTML (默认，无磁盘 I/O)
+#   "file" - 写入唯一命名的临时文件，再以 file:// URI 读取 (兼容兜底)
+SNAPSHOT_TRANSPORTS = ("raw", "file")
+SNAPSHOT_TRANSPORT = os.environ.get("TAB2MD_SNAPSHOT_TRANSPORT", "raw")
+
+
+def _default_snapshot_dir() -> str:
+    """file 模式下的临时目录：优先使用内存文件系统 /dev/shm。"""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm)
+    return tempfile.gettempdir()
+
+
+SNAPSHOT_DIR = os.environ.get("TAB2MD_SNAPSHOT_DIR") or _default_snapshot_dir()
+
+
+def _file_uri(path: Path) -> str:
+    # 使用标准库生成跨平台 file URI
+    local_file_uri = path.as_uri()
+
+    # Windows 兼容性修复:
+    # pathlib 生成的是 file:///C:/... (3个斜杠)
+    # crawl4ai 内部逻辑是 url[7:]，会导致路径变为 /C:/... (带前导斜杠)
+    # 这在 Windows 上会导致 os.path.exists 失败。
+    # 因此我们需要手动将其调整为 file://C:/... (以便切片后得到 C:/...)
+    if os.name == "nt":
+        local_file_uri = local_file_uri.replace("file:///", "file://")
+    return local_file_uri
+
+
+@contextmanager
+def snapshot_source(html: str, transport: str | None = None):
+    """
+    生成交给 Crawl4AI 的快照地址。
+    raw 模式直接返回 raw:<html>；file 模式写入唯一命名的临时文件并在结束后删除。
+    """
+    transport = transport or SNAPSHOT_TRANSPORT
+    if transport not in SNAPSHOT_TRANSPORTS:
+        raise ValueError(f"未知的快照传递方式: {transport}")
+
+    if transport == "raw":
+        yield f"raw:{html}"
+        return
+
+    fd, name = tempfile.mkstemp(prefix="tab2md_", suffix=".html", dir=SNAPSHOT_DIR)
+    temp_file = Path(name)
+    try:
+        with span("snapshot write", bytes=len(html)), os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(html)
+        yield _file_uri(temp_file)
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+
+class Crawl4AIEngine(ConversionEngine):
+    """
+    基于 Crawl4AI 无头浏览器的提取引擎，支持 js_code 等需要真实浏览器的配置。
+
+    crawler: 可选的 AsyncWebCrawler 实例；未指定时从进程级 crawler 池借用常驻浏览器。
+    """
+
+    name = "crawl4ai"
+
+    def __init__(self, crawler=None):
+        self.crawler = crawler
+
+    async def convert(self, url: str, html: str, run_cfg) -> str:
+        with snapshot_source(html) as source_url:
+            if self.crawler is not None:
+                with span("crawl4ai arun", js_code=bool(run_cfg.js_code), bytes=len(html)):
+                    result = await self.crawler.arun(url=source_url, config=run_cfg)
+            else:
+                from ..crawler_pool import get_crawler_pool
+
+                async with get_crawler_pool().borrow() as pooled_crawler:
+                    with span("crawl4ai arun", js_code=bool(run_cfg.js_code), bytes=len(html)):
+                        result = await pooled_crawler.arun(url=source_url, config=run_cfg)
+
+        if result.success:
+            return result.markdown
+        else:
+            raise Exception(f"转换失败: {result.error_message}")
@@ -0,0 +1,533 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from .base import ConversionEngine, EngineUnsupportedError
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# 无论策略如何配置，这些标签的内容都不会出现在正文中
+ALWAYS_SKIPPED_TAGS = {"head", "title", "script", "style", "template"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "figure", "figcaption",
+    "dl", "dt", "dd", "address", "details", "summary", "center", "body", "html",
+}
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+INLINE_WRAPPERS = {
+    "strong": "**", "b": "**", "em": "*", "i": "*", "del": "~~", "s": "~~",
+}
+
+# 带有该属性的元素中的文本本身就是 Markdown (如 DOM 修复补上的列表标记)，原样输出不转义
+MARKDOWN_ATTR = "data-tab2md-markdown"
+
+_BR = "\x00"
+_LITERAL = "\x01"  # 标记原样输出的文本，避免其位于行首时被当作普通文本转义
+_WHITESPACE_RE = re.compile(r"\s+")
+_SPACES_RE = re.compile(r"[ \t]+")
+# 文本节点中会被当作 Markdown 语法的字符：强调、代码、链接、删除线，
+# 以及像 HTML 标签或字符实体的 < 与 & (&lt;b&gt; 解码后不能变回真正的 <b>)
+_MD_SPECIAL_RE = re.compile(r"([\\`*_\[\]~])|<(?=[A-Za-z/!?])|&(?=#?\w+;)")
+# 只在行首有意义的块级标记：标题、引用、列表项、分隔线与 Setext 下划线
+_LINE_START_RE = re.compile(
+    r"^(?:(?P<mark>#{1,6}(?=\s|$)|>|[-+](?=\s|$)|-+[ \t]*$|=+[ \t]*$)|(?P<num>\d+)(?=[.)](?:\s|$)))",
+    re.M,
+)
+# CJK 字符逐字计数，其它文字按空白分词计数
+_CJK = "\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af"
+_WORD_RE = re.compile(f"[{_CJK}]|[^\\s{_CJK}]+")
+_SELECTOR_RE = re.compile(
+    r"""^(?P<tag>[a-zA-Z][\w-]*|\*)?
+        (?P<rest>(?:\#[\w-]+|\.[\w-]+|\[[\w-]+(?:=(?:'[^']*'|"[^"]*"|[^\]]*))?\])*)$""",
+    re.VERBOSE,
+)
+_SELECTOR_PART_RE = re.compile(
+    r"""\#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:=(?P<val>'[^']*'|"[^"]*"|[^\]]*))?\]"""
+)
+
+
+def count_words(text: str) -> int:
+    return len(_WORD_RE.findall(text))
+
+
+def escape_markdown(text: str) -> str:
+    """转义文本节点中的 Markdown 行内语法字符。"""
+    return _MD_SPECIAL_RE.sub(lambda m: "\\" + m.group(0), text)
+
+
+def _escape_line_starts(text: str) -> str:
+    """转义每行开头会被解析为块级标记的文本 (有序列表标记转义数字后的 . 或 ))。"""
+    return _LINE_START_RE.sub(
+        lambda m: "\\" + m.group("mark") if m.group("mark") else m.group("num") + "\\", text
+    )
+
+
+class SimpleSelector:
+    """
+    仅支持单个复合选择器，例如 div#main.content[data-x='1']。
+    后代/子代组合器等复杂语法会抛出 EngineUnsupportedError。
+    """
+
+    def __init__(self, selector: str):
+        m = _SELECTOR_RE.match(selector.strip())
+        if not m:
+            raise EngineUnsupportedError(f"不支持的 CSS 选择器: {selector}")
+        tag = m.group("tag")
+        self.tag = None if tag in (None, "*") else tag.lower()
+        self.ids, self.classes, self.attrs = [], [], []
+        for part in _SELECTOR_PART_RE.finditer(m.group("rest")):
+            if part.group("id"):
+                self.ids.append(part.group("id"))
+            elif part.group("cls"):
+                self.classes.append(part.group("cls"))
+            else:
+                value = part.group("val")
+                if value is not None and value[:1] in ("'", '"'):
+                    value = value[1:-1]
+                self.attrs.append((part.group("attr").lower(), value))
+
+    def matches(self, tag: str, attrs: dict) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        if any(attrs.get("id") != i for i in self.ids):
+            return False
+        classes = (attrs.get("class") or "").split()
+        if any(c not in classes for c in self.classes):
+            return False
+        for name, value in self.attrs:
+            if name not in attrs:
+                return False
+            if value is not None and attrs[name] != value:
+                return False
+        return True
+
+
+def parse_selector_list(css_selector: str | None) -> list[SimpleSelector]:
+    if not css_selector:
+        return []
+    return [SimpleSelector(s) for s in css_selector.split(",") if s.strip()]
+
+
+class _Frame:
+    __slots__ = ("tag", "attrs", "skip", "selected", "opened")
+
+    def __init__(self, tag: str, attrs: dict):
+        self.tag = tag
+        self.attrs = attrs
+        self.skip = False
+        self.selected = False
+        self.opened = False
+
+
+class MarkdownConverter(HTMLParser):
+    """
+    流式 HTML → Markdown 转换器，不依赖浏览器。
+    支持分块 feed()，实现与 Crawl4AI 配置相同的 excluded_tags、
+    word_count_threshold、css_selector (简单选择器) 与基于 <base> 的链接解析。
+
+    on_block: 可选回调，每产出一个 Markdown 片段 (含前导分隔换行) 即调用一次。
+        设置后转换器不再保留已输出的块，用于把超大页面增量写入文件。
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        excluded_tags=(),
+        word_count_threshold: int = 0,
+        css_selector: str | None = None,
+        on_block=None,
+    ):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self._base_seen = False
+        self.excluded_tags = {t.lower() for t in excluded_tags or ()}
+        self.word_count_threshold = word_count_threshold or 0
+        self.selectors = parse_selector_list(css_selector)
+        self.on_block = on_block
+
+        self.blocks: list[str] = []
+        self._emitted = False
+        self._stack: list[_Frame] = []
+        self._skip_count = 0
+        self._selected_count = 0
+        self._inline: list[list[str]] = [[]]
+        self._heading = 0
+        self._quote_depth = 0
+        self._last_quote_depth = 0
+        self._code_depth = 0
+        self._literal_depth = 0
+        self._lists: list[list] = []  # [ordered, counter]
+        self._li_marker: str | None = None
+        self._last_tight = False
+        self._pre_depth = 0
+        self._pre_buf: list[str] = []
+        self._pre_lang = ""
+        self._table_row: list[str] | None = None
+        self._table_rows = 0
+        self._cell_depth = 0
+
+    # --- 状态判断 ---
+    def _active(self) -> bool:
+        if self._skip_count:
+            return False
+        return not self.selectors or self._selected_count > 0
+
+    def _resolve(self, href: str) -> str:
+        return urljoin(self.base_url, href) if self.base_url else href
+
+    # --- 输出 ---
+    def _emit(self, text: str, tight: bool = False):
+        if self._quote_depth:
+            prefix = "> " * self._quote_depth
+            text = "\n".join(prefix + line if line else prefix.rstrip() for line in text.split("\n"))
+        if not self._emitted:
+            piece = text
+        elif tight and self._last_tight:
+            piece = "\n" + text
+        else:
+            # 同一引用内的段落之间，空行也要带引用前缀，否则会被拆成多个引用
+            shared = min(self._quote_depth, self._last_quote_depth)
+            piece = "\n" + ("> " * shared).rstrip() + "\n" + text
+        self._emitted = True
+        self._last_tight = tight
+        self._last_quote_depth = self._quote_depth
+        if self.on_block is not None:
+            self.on_block(piece)
+        else:
+            self.blocks.append(piece)
+
+    def _take_inline_text(self) -> str:
+        raw = "".join(self._inline[0])
+        self._inline[0] = []
+        text = _SPACES_RE.sub(" ", raw).strip()
+        text = _escape_line_starts(re.sub(r" ?\x00 ?", "  \n", text).strip())
+        return text.replace(_LITERAL, "")
+
+    def _flush_block(self):
+        if self._cell_depth or len(self._inline) > 1:
+            return
+        text = self._take_inline_text()
+        if not text:
+            return
+        if self._heading:
+            self._emit("#" * self._heading + " " + text.replace("  \n", " "))
+        elif self._lists:
+            indent = "  " * (len(self._lists) - 1)
+            if self._li_marker is not None:
+                line = indent + self._li_marker + text
+                self._li_marker = None
+            else:
+                line = indent + "  " + text
+            self._emit(line, tight=True)
+        else:
+            has_media = "![" in text
+            if (
+                self.word_count_threshold
+                and not has_media
+                and count_words(text) < self.word_count_threshold
+            ):
+                return
+            self._emit(text)
+
+    # --- HTMLParser 回调 ---
+    def handle_starttag(self, tag, attrs):
+        attrs = {k.lower(): (v or "") for k, v in attrs}
+        if tag == "base" and not self._base_seen and attrs.get("href"):
+            self.base_url = self._resolve(attrs["href"])
+            self._base_seen = True
+            return
+        if tag in VOID_TAGS:
+            if self._active():
+                self._handle_void(tag, attrs)
+            return
+
+        frame = _Frame(tag, attrs)
+        self._stack.append(frame)
+        if self._skip_count:
+            return
+        if tag in self.excluded_tags or tag in ALWAYS_SKIPPED_TAGS:
+            frame.skip = True
+            self._skip_count += 1
+            return
+        if self.selectors and not self._selected_count:
+            if any(s.matches(tag, attrs) for s in self.selectors):
+                frame.selected = True
+                self._selected_count += 1
+        if self._active():
+            frame.opened = True
+            if MARKDOWN_ATTR in attrs:
+                self._literal_depth += 1
+            self._open(frame)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            frame = self._stack.pop()
+            if frame.opened:
+                if MARKDOWN_ATTR in frame.attrs:
+                    self._literal_depth -= 1
+                self._close(frame)
+            if frame.skip:
+                self._skip_count -= 1
+            if frame.selected:
+                self._selected_count -= 1
+                self._flush_block()
+
+    def handle_data(self, data):
+        if not self._active():
+            return
+        if self._pre_depth:
+            self._pre_buf.append(data)
+        elif self._literal_depth:
+            self._inline[-1].append(_LITERAL + _WHITESPACE_RE.sub(" ", data))
+        elif self._code_depth:  # 行内代码按原文输出
+            self._inline[-1].append(_WHITESPACE_RE.sub(" ", data))
+        else:
+            self._inline[-1].append(escape_markdown(_WHITESPACE_RE.sub(" ", data)))
+
+    # --- 元素处理 ---
+    def _handle_void(self, tag, attrs):
+        if tag == "br":
+            if self._pre_depth:
+                self._pre_buf.append("\n")
+            else:
+                self._inline[-1].append(_BR)
+        elif tag == "hr":
+            self._flush_block()
+            self._emit("---")
+        elif tag == "img":
+            src = attrs.get("src") or attrs.get("data-src") or ""
+            if not src or src.startswith("data:"):
+                return
+            alt = escape_markdown(_WHITESPACE_RE.sub(" ", attrs.get("alt", "")).strip())
+            self._inline[-1].append(f"![{alt}]({self._resolve(src)})")
+
+    def _open(self, frame: _Frame):
+        tag, attrs = frame.tag, frame.attrs
+        if self._pre_depth:
+            if tag == "code" and not self._pre_lang:
+                self._pre_lang = _language_of(attrs)
+            return
+        if tag in INLINE_WRAPPERS or tag in ("a", "code"):
+            self._inline.append([])
+            if tag == "code":
+                self._code_depth += 1
+        elif tag == "pre":
+            self._flush_block()
+            self._pre_depth += 1
+            self._pre_buf = []
+            self._pre_lang = _language_of(attrs)
+        elif tag in HEADING_LEVELS:
+            self._flush_block()
+            self._heading = HEADING_LEVELS[tag]
+        elif tag in ("ul", "ol"):
+            self._flush_block()
+            if not self._lists:
+                self._last_tight = False
+            self._lists.append([tag == "ol", 0])
+        elif tag == "li":
+            self._flush_block()
+            if self._lists:
+                current = self._lists[-1]
+                current[1] += 1
+                self._li_marker = f"{current[1]}. " if current[0] else "- "
+        elif tag == "blockquote":
+            self._flush_block()
+            self._quote_depth += 1
+        elif tag == "table":
+            self._flush_block()
+            self._table_rows = 0
+            self._last_tight = False
+        elif tag == "tr":
+            self._table_row = []
+        elif tag in ("td", "th"):
+            self._cell_depth += 1
+            self._inline.append([])
+        elif tag in BLOCK_TAGS:
+            self._flush_block()
+
+    def _close(self, frame: _Frame):
+        tag, attrs = frame.tag, frame.attrs
+        if tag == "pre":
+            self._pre_depth -= 1
+            code = "".join(self._pre_buf).strip("\n")
+            self._pre_buf = []
+            if code:
+                self._emit(f"```{self._pre_lang}\n{code}\n```")
+            self._pre_lang = ""
+            return
+        if self._pre_depth:
+            return
+        if tag in INLINE_WRAPPERS or tag in ("a", "code"):
+            if tag == "code":
+                self._code_depth -= 1
+            inner = "".join(self._inline.pop())
+            self._inline[-1].append(self._wrap_inline(tag, attrs, inner))
+        elif tag in HEADING_LEVELS:
+            self._flush_block()
+            self._heading = 0
+        elif tag in ("ul", "ol"):
+            self._flush_block()
+            if self._lists:
+                self._lists.pop()
+            self._li_marker = None
+        elif tag == "li":
+            self._flush_block()
+            self._li_marker = None
+        elif tag == "blockquote":
+            self._flush_block()
+            self._quote_depth = max(0, self._quote_depth - 1)
+        elif tag in ("td", "th"):
+            cell = "".join(self._inline.pop())
+            self._cell_depth -= 1
+            if self._table_row is not None:
+                cell = _SPACES_RE.sub(" ", cell.replace(_BR, " ").replace(_LITERAL, "")).strip()
+                self._table_row.append(cell.replace("|", "\\|"))
+        elif tag == "tr":
+            row, self._table_row = self._table_row, None
+            if row:
+                self._emit("| " + " | ".join(row) + " |", tight=True)
+                if self._table_rows == 0:
+                    self._emit("|" + " --- |" * len(row), tight=True)
+                self._table_rows += 1
+        elif tag in BLOCK_TAGS or tag == "table":
+            self._flush_block()
+
+    def _wrap_inline(self, tag: str, attrs: dict, inner: str) -> str:
+        stripped = inner.strip()
+        if not stripped:
+            return inner
+        lead = " " if inner[:1].isspace() else ""
+        trail = " " if inner[-1:].isspace() else ""
+        if tag == "a":
+            href = attrs.get("href", "")
+            if not href or href.startswith(("javascript:", "#")):
+                return inner
+            return f"{lead}[{stripped}]({self._resolve(href)}){trail}"
+        if tag == "code":
+            # 代码中含反引号时用更长的反引号串包裹，两端的反引号与包裹符之间留空格
+            fence = "`" * (max(map(len, re.findall("`+", stripped)), default=0) + 1)
+            pad = " " if stripped[:1] == "`" or stripped[-1:] == "`" else ""
+            return f"{lead}{fence}{pad}{stripped}{pad}{fence}{trail}"
+        marker = INLINE_WRAPPERS[tag]
+        return f"{lead}{marker}{stripped}{marker}{trail}"
+
+    def close(self):
+        super().close()
+        # 关闭所有未闭合的元素
+        while self._stack:
+            self.handle_endtag(self._stack[-1].tag)
+        while len(self._inline) > 1:
+            inner = "".join(self._inline.pop())
+            self._inline[-1].append(inner)
+        self._flush_block()
+
+    def markdown(self) -> str:
+        text = "".join(self.blocks)
+        return text + "\n" if text else ""
+
+
+def _language_of(attrs: dict) -> str:
+    for cls in (attrs.get("class") or "").split():
+        if cls.startswith(("language-", "lang-")):
+            return cls.split("-", 1)[1]
+    return attrs.get("data-code-language", "")
+
+
+def html_to_markdown(
+    html: str,
+    base_url: str = "",
+    excluded_tags=(),
+    word_count_threshold: int = 0,
+    css_selector: str | None = None,
+) -> str:
+    converter = MarkdownConverter(
+        base_url=base_url,
+        excluded_tags=excluded_tags,
+        word_count_threshold=word_count_threshold,
+        css_selector=css_selector,
+    )
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
+
+
+def stream_markdown(
+    chunks,
+    out,
+    base_url: str = "",
+    excluded_tags=(),
+    word_count_threshold: int = 0,
+    css_selector: str | None = None,
+) -> int:
+    """
+    逐块喂入 HTML 并把 Markdown 增量写入文本文件对象 out，返回写出的字符数。
+    内存占用只与单个分块和当前未闭合的块有关，与页面总大小无关。
+    """
+    written = 0
+
+    def write(piece: str):
+        nonlocal written
+        written += out.write(piece)
+
+    converter = MarkdownConverter(
+        base_url=base_url,
+        excluded_tags=excluded_tags,
+        word_count_threshold=word_count_threshold,
+        css_selector=css_selector,
+        on_block=write,
+    )
+    for chunk in chunks:
+        converter.feed(chunk)
+    converter.close()
+    if written:
+        write("\n")
+    return written
+
+
+class FastEngine(ConversionEngine):
+    """
+    纯 Python 的快速提取引擎：无需启动无头浏览器，
+    直接解析用户浏览器已经渲染好的快照。
+    不支持 js_code，遇到时抛出 EngineUnsupportedError。
+    """
+
+    name = "fast"
+
+    async def convert(self, url: str, html: str, run_cfg) -> str:
+        return self.convert_sync(url, html, run_cfg)
+
+    def convert_sync(self, url: str, html: str, run_cfg) -> str:
+        """同步版本的 convert，供进程池中的工作进程直接调用。"""
+        if getattr(run_cfg, "js_code", None):
+            raise EngineUnsupportedError("快速引擎不支持 js_code")
+        return html_to_markdown(
+            html,
+            base_url=url,
+            excluded_tags=getattr(run_cfg, "excluded_tags", None) or (),
+            word_count_threshold=getattr(run_cfg, "word_count_threshold", 0) or 0,
+            css_selector=getattr(run_cfg, "css_selector", None),
+        )
+
+    def convert_stream(self, url: str, chunks, out, run_cfg) -> int:
+        """流式版本的 convert：分块读入快照，Markdown 直接写入 out。"""
+        if getattr(run_cfg, "js_code", None):
+            raise EngineUnsupportedError("快速引擎不支持 js_code")
+        return stream_markdown(
+            chunks,
+            out,
+            base_url=url,
+            excluded_tags=getattr(run_cfg, "excluded_tags", None) or (),
+            word_count_threshold=getattr(run_cfg, "word_count_threshold", 0) or 0,
+            css_selector=getattr(run_cfg, "css_selector", None),
+        )
@@ -1,65 +1,773 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
 import asyncio
 import re
+import sqlite3
+import sys
 from pathlib import Path
 
 # 导入自定义模块
-from .browser_ops import ensure_chromium_installed, get_active_tab_snapshot
+# 注意：playwright 与 crawl4ai 均在真正需要时才导入，保持 CLI 启动轻量
+from .browser_ops import (
+    CDP_ENDPOINTS,
+    CONNECT_TIMEOUT,
+    DEFAULT_MEMORY_CEILING,
+    ensure_chromium_installed,
+    get_active_tab_snapshot,
+    get_all_tab_snapshots,
+)
+from .assets import (
+    DEFAULT_BYTE_BUDGET,
+    DEFAULT_CONNECTIONS,
+    DEFAULT_TIME_BUDGET,
+    AssetDownloader,
+)
+from .cache import DEFAULT_MAX_BYTES, ConversionCache
+from .column import DEFAULT_RATE, DEFAULT_WORKERS, ColumnExporter
+from .deadlines import (
+    DEADLINES,
+    RUN_SUMMARY,
+    STAGES,
+    StageTimeout,
+    hedged,
+    parse_deadline,
+    with_deadline,
+)
+from .cpu_pool import DEFAULT_CPU_WORKERS, close_cpu_pool, configure_cpu_pool, get_cpu_pool
+from .crawler_pool import (
+    close_crawler_pool,
+    configure_crawler_pool,
+    get_crawler_pool,
+)
+from . import browser_ops, engines
+from .engines import EngineUnsupportedError, crawl4ai_engine
+from .watch import DEFAULT_DEBOUNCE, TabWatcher
+from .prewarm import DEFAULT_PREWARM, PREWARM_MODES, Prewarmer
+from .serve import (
+    DEFAULT_HOST,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_PORT,
+    ConversionServer,
+)
+from .sinks import (
+    DEFAULT_ARCHIVE,
+    OUTPUT_DIR,
+    SINK_NAMES,
+    FileSink,
+    OutputSink,
+    SQLiteSink,
+    create_sink,
+    extract_title,
+)
+from .strategies.base import StructuredMarkdown
 from .strategies.basic import BasicStrategy
-from .strategies.geekbang import GeekbangColumnStrategy
-# 将来可以在这里导入更多策略，例如: from strategies.wiki import WikiStrategy
+from .strategies.registry import get_registry
+from .timings import (
+    enable_profiling,
+    peak_memory_bytes,
+    print_profile,
+    print_timings,
+    record,
+    span,
+    timed,
+    write_trace,
+)
+
+record("import", time.perf_counter() - _IMPORT_STARTED)
 
-OUTPUT_DIR = "exports"
+DEFAULT_CONCURRENCY = 4
 
 
 def get_strategy_for_url(url: str):
     """
-    简单的策略路由工厂。
-    遍历所有已知策略，找到第一个匹配的；如果没找到，返回 BasicStrategy。
+    策略路由：通过注册表按域名后缀 (及正则) 查找匹配的策略；
+    如果没找到，返回 BasicStrategy。策略实例会被缓存复用。
     """
-    # 注册你的特定策略类 (优先匹配特定策略)
-    # known_strategies = [WikiStrategy, CsdnStrategy, ...]
-    known_strategies = [GeekbangColumnStrategy]
+    return get_registry().lookup(url)
 
-    for strategy_cls in known_strategies:
-        if strategy_cls.match(url):
-            return strategy_cls()
 
-    return BasicStrategy()
+def has_specific_strategy(url: str) -> bool:
+    """URL 是否命中了某个专用策略 (而非 BasicStrategy 兜底)。"""
+    return type(get_strategy_for_url(url)) is not BasicStrategy
 
 
-async def process_conversion():
-    # 1. 获取快照
-    url, raw_html = await get_active_tab_snapshot()
-    if not raw_html:
-        return
+def capture_scope_for_url(url: str) -> str | None:
+    """返回匹配策略声明的捕获范围 (CSS 选择器)，用于在标签页内只截取正文。"""
+    return get_strategy_for_url(url).capture_selector
+
+
+async def prefetch_markdown(url: str, context) -> StructuredMarkdown | None:
+    """
+    站点接口快速路径：命中的策略能直接给出 Markdown 时跳过 DOM 捕获。
+    接口请求与其转换受 fetch 阶段时限约束，超时后回退到 DOM 捕获。
+    """
+    strategy = get_strategy_for_url(url)
+    try:
+        return await with_deadline("fetch", strategy.fetch_markdown(url, context), url)
+    except StageTimeout as e:
+        print(f"⏰ {e}，改为捕获页面 DOM。")
+        return None
+
 
-    # 2. 选择策略
+async def convert_snapshot(
+    url: str, raw_html: str, cache: ConversionCache | None = None, source: str = ""
+) -> str:
+    """
+    选择策略并转换快照；启用缓存时命中即直接返回已保存的 Markdown。
+    source: 快照来源的 CDP 端点 (浏览器内引擎在该浏览器中执行 js_code)。
+    通过站点接口得到的 StructuredMarkdown 已是转换结果，原样返回。
+    """
+    if isinstance(raw_html, StructuredMarkdown):
+        return raw_html
     strategy = get_strategy_for_url(url)
 
+    key = None
+    if cache is not None:
+        with span("cache lookup", bytes=len(raw_html)):
+            key = strategy.cache_key(url, raw_html)
+            cached = cache.get(key)
+        if cached is not None:
+            print(f"⚡ 命中转换缓存 [{strategy.__class__.__name__}]: {url}")
+            return cached
+
+    async def primary():
+        pool = get_cpu_pool()
+        if pool is not None and pool.accepts(strategy, raw_html):
+            # CPU 密集的转换交给工作进程，事件循环继续处理其他标签页的 CDP 通信
+            markdown = await pool.convert(url, raw_html)
+            if markdown and markdown.strip():
+                return markdown
+        return await strategy.execute(url, raw_html, source=source or None)
+
+    # 专用策略超过提取时限时，对冲运行不依赖浏览器的 BasicStrategy + 快速引擎
+    def hedge():
+        return asyncio.to_thread(BasicStrategy().convert_fast, url, raw_html)
+
+    markdown_content, from_hedge = await hedged(
+        "extract",
+        primary(),
+        hedge if type(strategy) is not BasicStrategy else None,
+        url,
+        f"[{type(strategy).__name__}]",
+    )
+    # 对冲结果是降级的输出，不写入缓存，下次仍尝试专用策略
+    if cache is not None and not from_hedge:
+        cache.put(key, markdown_content)
+    return markdown_content
+
+
+async def export_snapshot(
+    url: str,
+    raw_html: str,
+    cache: ConversionCache | None = None,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+    title: str = "",
+    source: str = "",
+) -> str:
+    """
+    转换快照并写入输出端 (默认 FileSink)，返回保存位置。
+    启用资源本地化时先下载图片并改写链接。source 为快照来源 (CDP 端点)。
+    """
+    markdown_content = await convert_snapshot(url, raw_html, cache, source)
+    if isinstance(raw_html, StructuredMarkdown):
+        title = title or raw_html.title
+        raw_html = ""
+    if assets is not None:
+        with span("assets"):
+            try:
+                markdown_content = await with_deadline(
+                    "assets",
+                    assets.localize(markdown_content, Path(OUTPUT_DIR), source or None),
+                    url,
+                )
+            except StageTimeout as e:
+                print(f"⏰ {e}，图片保留远程链接。")
+    sink = sink or FileSink()
+    return sink.write(
+        url,
+        markdown_content,
+        title=title or extract_title(raw_html),
+        strategy=type(get_strategy_for_url(url)).__name__,
+        raw_html=raw_html,
+        source=source,
+    )
+
+
+async def export_snapshot_file(
+    url: str,
+    snapshot_path: Path,
+    cache: ConversionCache | None = None,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+    source: str = "",
+) -> str:
+    """
+    转换超大页面的快照文件：策略支持时流式转换并增量写出 Markdown 文件
+    (不经过缓存、资源本地化与归档输出端)；否则读入内存走常规转换。
+    """
+    strategy = get_strategy_for_url(url)
+    md_file = FileSink().path_for(url)
     try:
-        # 3. 执行转换
-        markdown_content = await strategy.execute(url, raw_html)
+        await strategy.execute_streaming(url, snapshot_path, md_file)
+        return str(md_file)
+    except EngineUnsupportedError as e:
+        print(f"⚠️  {e}，读入完整快照后常规转换。")
+    raw_html = snapshot_path.read_text(encoding="utf-8")
+    return await export_snapshot(url, raw_html, cache, assets, sink, source=source)
+
+
+def report_peak_memory():
+    peak = peak_memory_bytes()
+    if peak is not None:
+        print(f"📈 峰值内存: {peak / 1024 / 1024:.1f} MB")
 
-        # 4. 保存结果
-        slug = re.sub(r"[^a-zA-Z0-9]", "_", url.split("//")[-1])
-        safe_name = f"{slug[:50]}"
 
-        output_path = Path(OUTPUT_DIR)
-        output_path.mkdir(exist_ok=True)
+async def process_conversion(
+    cache: ConversionCache | None = None,
+    use_os_titles: bool = True,
+    memory_ceiling: int | None = DEFAULT_MEMORY_CEILING,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+    prewarmer: Prewarmer | None = None,
+    prefetch=None,
+):
+    # 0. 预热 (安装检查、导入 crawl4ai、启动引擎) 与下面的连接、定位、捕获并行进行
+    path_started = time.perf_counter()
+    if prewarmer is not None:
+        prewarmer.start()
 
-        md_file = output_path / f"{safe_name}.md"
-        md_file.write_text(markdown_content, encoding="utf-8")
+    # 1. 获取快照 (超过内存上限时为磁盘上的快照文件)
+    url, snapshot, source = await get_active_tab_snapshot(
+        capture_scope_for_url,
+        use_os_titles,
+        memory_ceiling,
+        on_resolved=prewarmer.on_url if prewarmer is not None else None,
+        prefetch=prefetch,
+    )
+    if prewarmer is not None:
+        prewarmer.report(path_started, time.perf_counter())
+    if not snapshot:
+        return
+
+    try:
+        # 2. 选择策略并执行转换，3. 保存结果
+        if isinstance(snapshot, Path):
+            md_file = await export_snapshot_file(
+                url, snapshot, cache, assets, sink, source=source
+            )
+        else:
+            md_file = await export_snapshot(url, snapshot, cache, assets, sink, source=source)
 
         print("\n✅ 转换完成!")
         print(f"📂 已保存至: {md_file}")
 
     except Exception as e:
         print(f"❌ 处理过程中发生错误: {e}")
+    finally:
+        if isinstance(snapshot, Path):
+            snapshot.unlink(missing_ok=True)
+        report_peak_memory()
+
+
+async def process_batch_conversion(
+    url_pattern: re.Pattern | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: ConversionCache | None = None,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+    prefetch=None,
+):
+    """
+    批量导出：一次 CDP 连接抓取所有标签页，
+    并通过 crawler 池中的常驻浏览器、在并发上限内完成全部转换。
+    返回失败的标签页数 (抓取或转换失败均计入)。
+    """
+    # 1. 并发获取所有快照
+    snapshots = await get_all_tab_snapshots(url_pattern, capture_scope_for_url, prefetch)
+    if not snapshots:
+        print("❌ 没有可导出的标签页。")
+        return 0
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def convert_one(url, title, raw_html, source):
+        if isinstance(raw_html, BaseException):  # 抓取阶段已失败，原样计入汇总
+            return raw_html
+        async with semaphore:
+            return await export_snapshot(url, raw_html, cache, assets, sink, title, source)
+
+    # 2. 所有转换共享 crawler 池中的常驻浏览器
+    results = await asyncio.gather(
+        *(convert_one(*snapshot) for snapshot in snapshots),
+        return_exceptions=True,
+    )
+    if sink is not None:
+        sink.flush()
+
+    # 3. 汇总结果
+    succeeded = 0
+    print("\n📋 批量导出结果:")
+    show_source = len({source for *_, source in snapshots}) > 1
+    for (url, title, raw_html, source), result in zip(snapshots, results):
+        origin = f"\n   🔌 {source}" if show_source else ""
+        # 被取消的转换返回 CancelledError (BaseException)，同样算作失败
+        if isinstance(result, BaseException):
+            stage = "抓取" if result is raw_html else "转换"
+            print(
+                f"❌ {title or url}\n   {url}{origin}\n"
+                f"   {stage}失败: {str(result) or type(result).__name__}"
+            )
+        else:
+            succeeded += 1
+            print(f"✅ {title or url}\n   📂 {result}{origin}")
+    failed = len(results) - succeeded
+    print(f"\n🏁 完成: 成功 {succeeded} / 失败 {failed}")
+    return failed
+
+
+async def process_watch(
+    cache: ConversionCache | None = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    all_pages: bool = False,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+):
+    """监听模式：页面导航完成后自动导出，常驻运行直到 Ctrl+C。"""
+    # 预热无头浏览器，使每次导出都不必等待 Chromium 启动
+    await get_crawler_pool().warm_up()
+    sink = sink or FileSink()
+
+    async def convert(url, raw_html):
+        location = await export_snapshot(url, raw_html, cache, assets, sink)
+        # 常驻模式下逐条提交，避免异常退出时丢失尚未提交的批次
+        sink.flush()
+        return location
+
+    watcher = TabWatcher(
+        convert=convert,
+        should_export=(lambda url: True) if all_pages else has_specific_strategy,
+        scope_for_url=capture_scope_for_url,
+        debounce=debounce,
+    )
+    await watcher.run()
+
+
+async def process_column(
+    column_url: str,
+    cache: ConversionCache | None = None,
+    workers: int = DEFAULT_WORKERS,
+    rate: float = DEFAULT_RATE,
+    assets: AssetDownloader | None = None,
+    sink: OutputSink | None = None,
+    prefetch=None,
+):
+    """整个专栏导出：枚举文章、后台并发抓取并转换，支持断点续传。"""
+    exporter = ColumnExporter(
+        convert=lambda url, raw_html: export_snapshot(url, raw_html, cache, assets, sink),
+        scope_for_url=capture_scope_for_url,
+        workers=workers,
+        rate=rate,
+        prefetch=prefetch,
+    )
+    await exporter.run(column_url)
+
+
+async def process_serve(
+    cache: ConversionCache | None = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+):
+    """本地 HTTP 转换服务：复用策略路由与转换缓存，常驻运行直到 Ctrl+C。"""
+    # 预热无头浏览器，首个需要 Crawl4AI 的请求不必等待 Chromium 启动
+    await get_crawler_pool().warm_up()
+
+    async def convert(url, raw_html):
+        strategy = get_strategy_for_url(url)
+        return type(strategy).__name__, await convert_snapshot(url, raw_html, cache)
+
+    server = ConversionServer(
+        convert, host=host, port=port, max_in_flight=max_in_flight, max_queue=max_queue
+    )
+    await server.run()
+
+
+def _deadline_arg(text: str) -> tuple[str, float]:
+    try:
+        return parse_deadline(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _url_regex_arg(text: str) -> re.Pattern:
+    try:
+        return re.compile(text)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"无效的正则表达式 {text!r}: {e}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="tab2md", description="将浏览器标签页转换为 Markdown。"
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="导出所有打开的标签页，而不仅是当前激活的标签页"
+    )
+    parser.add_argument(
+        "--match",
+        type=_url_regex_arg,
+        metavar="URL_REGEX",
+        help="仅导出 URL 匹配该正则表达式的标签页 (隐含 --all)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"批量导出时的并发转换数 (默认 {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=DEFAULT_CPU_WORKERS,
+        metavar="N",
+        help="在 N 个工作进程中执行 CPU 密集的 HTML 处理与 Markdown 生成，"
+        "适合大批量/专栏导出 (默认 0，在主进程中转换)",
+    )
+    parser.add_argument(
+        "--cdp",
+        action="append",
+        metavar="URL",
+        help="CDP 端点，可重复指定以同时连接多个浏览器/配置文件 "
+        f"(默认 {', '.join(CDP_ENDPOINTS)}，也可用环境变量 TAB2MD_CDP_ENDPOINTS 逗号分隔)",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=CONNECT_TIMEOUT,
+        metavar="SECONDS",
+        help="每个 CDP 端点的连接超时 (默认 %(default)s 秒)",
+    )
+    parser.add_argument(
+        "--snapshot-transport",
+        choices=crawl4ai_engine.SNAPSHOT_TRANSPORTS,
+        default=crawl4ai_engine.SNAPSHOT_TRANSPORT,
+        help="快照交给提取引擎的方式: raw=内存传递 (默认), file=tmpfs 临时文件",
+    )
+    parser.add_argument(
+        "--js-engine",
+        choices=engines.JS_ENGINES,
+        default=engines.JS_ENGINE,
+        help="策略需要执行 js_code 时使用的引擎: crawl4ai=独立的无头浏览器 (默认), "
+        "browser=在用户浏览器的隐藏目标中执行，不启动额外的浏览器进程",
+    )
+    parser.add_argument(
+        "--no-os-titles",
+        action="store_true",
+        help="多个候选标签页无法区分时，不查询操作系统窗口标题辅助判断",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="跳过本地转换缓存，强制重新转换"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="转换缓存的容量上限，超出后按 LRU 淘汰 (默认 %(default)s MB)",
+    )
+    parser.add_argument(
+        "--memory-ceiling",
+        type=int,
+        default=DEFAULT_MEMORY_CEILING // (1024 * 1024),
+        metavar="MB",
+        help="页面快照超过该大小 (百万字符) 时改为分块捕获并流式写出 Markdown，"
+        "0 表示不限制 (默认 %(default)s)",
+    )
+    parser.add_argument(
+        "--dom-only",
+        action="store_true",
+        help="总是捕获渲染后的页面 DOM，不使用策略的站点接口快速路径 (如极客时间文章接口)",
+    )
+    parser.add_argument(
+        "--deadline",
+        action="append",
+        type=_deadline_arg,
+        default=[],
+        metavar="STAGE=SECONDS",
+        help=f"覆盖阶段时限 (可重复，0 表示不限制)，STAGE 取值: {', '.join(STAGES)}; "
+        f"默认 {', '.join(f'{k}={v:g}' for k, v in DEADLINES.items())}。"
+        "专用策略超过 extract 时限时会对冲运行 BasicStrategy，先完成者胜出",
+    )
+    parser.add_argument(
+        "--prewarm",
+        choices=PREWARM_MODES,
+        default=DEFAULT_PREWARM,
+        help="单页导出时与捕获并行的预热: auto=需要 Crawl4AI 时才提前启动浏览器 (默认), "
+        "always=进程启动即启动浏览器, off=按顺序执行",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=SINK_NAMES,
+        default="file",
+        help="输出端: file=每个页面一个 Markdown 文件 (默认), sqlite=写入带全文索引的归档数据库",
+    )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=DEFAULT_ARCHIVE,
+        help="sqlite 输出端与 search 命令使用的数据库 (默认 %(default)s)",
+    )
+    parser.add_argument(
+        "--assets",
+        action="store_true",
+        help="下载 Markdown 中的图片到 exports/assets/ (携带浏览器登录态) 并改写为本地链接",
+    )
+    parser.add_argument(
+        "--asset-connections",
+        type=int,
+        default=DEFAULT_CONNECTIONS,
+        help="同时下载图片的连接数 (默认 %(default)s)",
+    )
+    parser.add_argument(
+        "--asset-budget",
+        type=int,
+        default=DEFAULT_BYTE_BUDGET // (1024 * 1024),
+        metavar="MB",
+        help="每次运行最多下载的图片总量 (默认 %(default)s MB)",
+    )
+    parser.add_argument(
+        "--asset-timeout",
+        type=float,
+        default=DEFAULT_TIME_BUDGET,
+        metavar="SECONDS",
+        help="每次运行用于下载图片的总时间 (默认 %(default)s 秒)，超出后保留远程链接",
+    )
+
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="输出启动耗时报告 (模块导入、Chromium 安装检查、CDP 连接等)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="输出流水线各阶段 (连接、定位、捕获、提取、写出等) 的耗时与字节数",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE_JSON",
+        help="将各阶段写入 Chrome trace-event JSON (可在 Perfetto 中查看，隐含 --profile)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    watch_parser = subparsers.add_parser(
+        "watch", help="常驻监听标签页导航，页面加载完成后自动导出"
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help="页面稳定多少秒后再导出 (默认 %(default)s)",
+    )
+    watch_parser.add_argument(
+        "--all-pages",
+        action="store_true",
+        help="导出所有页面，而不仅是命中专用策略的站点",
+    )
+
+    column_parser = subparsers.add_parser(
+        "column", help="导出整个专栏 (使用浏览器登录态，支持断点续传)"
+    )
+    column_parser.add_argument(
+        "url", help="专栏地址，例如 https://time.geekbang.org/column/intro/100xxxx"
+    )
+    column_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="同时打开的后台标签页数 (默认 %(default)s)",
+    )
+    column_parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="每个站点每秒最多打开的文章数 (默认 %(default)s)",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="启动本地 HTTP 转换服务 (POST /convert，GET /metrics)"
+    )
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="监听地址 (默认 %(default)s)")
+    serve_parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="监听端口 (默认 %(default)s)"
+    )
+    serve_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help="同时进行的转换数上限 (默认 %(default)s)",
+    )
+    serve_parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help="排队请求数上限，超出后返回 429 (默认 %(default)s)",
+    )
+
+    search_parser = subparsers.add_parser("search", help="在 sqlite 归档中全文检索已导出的页面")
+    search_parser.add_argument(
+        "query", nargs="?", help="FTS5 查询，例如 'asyncio AND task' 或 '\"事件循环\"'"
+    )
+    search_parser.add_argument(
+        "--limit", type=int, default=20, help="最多显示的结果数 (默认 %(default)s)"
+    )
+    search_parser.add_argument(
+        "--show", type=int, metavar="ID", help="输出指定编号的 Markdown 全文而不是检索"
+    )
+    args = parser.parse_args(argv)
+    if args.command == "search" and args.query is None and args.show is None:
+        search_parser.error("需要提供查询 query 或 --show ID")
+    return args
+
+
+def run_search(args):
+    """search 命令：只读归档数据库，不需要连接浏览器。"""
+    if not Path(args.archive).exists():
+        print(f"❌ 归档数据库不存在: {args.archive} (使用 --sink sqlite 导出后再检索)")
+        return
+    archive = SQLiteSink(args.archive)
+    try:
+        if args.show is not None:
+            markdown = archive.get_markdown(args.show)
+            print(markdown if markdown is not None else f"❌ 没有编号为 {args.show} 的导出。")
+            return
+        try:
+            rows = archive.search(args.query, args.limit)
+        except sqlite3.OperationalError as e:
+            print(f"❌ 查询语法错误: {e}")
+            return
+        if not rows:
+            print("🔍 没有匹配的结果。")
+        for export_id, url, title, snippet, updated in rows:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(updated))
+            print(f"[{export_id}] {title or url}  ({when})\n    {url}\n    {snippet}")
+    finally:
+        archive.close()
+
+
+async def run(args) -> int:
+    """执行子命令或导出，返回失败数 (用作进程退出状态)。"""
+    # 单个浏览器实例即可承载全部并发转换
+    leases = args.max_in_flight if args.command == "serve" else args.concurrency
+    configure_crawler_pool(max_size=1, max_leases=max(1, leases))
+    cache = None
+    if not args.no_cache:
+        cache = ConversionCache(max_bytes=args.cache_size * 1024 * 1024)
+    assets = None
+    if args.assets:
+        assets = AssetDownloader(
+            connections=args.asset_connections,
+            byte_budget=args.asset_budget * 1024 * 1024,
+            time_budget=args.asset_timeout,
+        )
+    sink = create_sink(args.sink, args.archive)
+    prewarmer = Prewarmer(args.prewarm)
+    prefetch = None if args.dom_only else prefetch_markdown
+    cpu_pool = configure_cpu_pool(args.cpu_workers)
+    if cpu_pool is not None:
+        # 工作进程的启动与导入和 CDP 连接、快照捕获并行进行
+        cpu_pool.warm_up()
+    failed = 0
+    try:
+        if args.command == "serve":
+            await process_serve(
+                cache, args.host, args.port, args.max_in_flight, args.max_queue
+            )
+        elif args.command == "watch":
+            await process_watch(cache, args.debounce, args.all_pages, assets, sink)
+        elif args.command == "column":
+            await process_column(
+                args.url, cache, args.workers, args.rate, assets, sink, prefetch
+            )
+        elif args.all or args.match:
+            failed = await process_batch_conversion(
+                args.match, args.concurrency, cache, assets, sink, prefetch
+            )
+        else:
+            await process_conversion(
+                cache,
+                use_os_titles=not args.no_os_titles,
+                memory_ceiling=args.memory_ceiling * 1024 * 1024,
+                assets=assets,
+                sink=sink,
+                prewarmer=prewarmer,
+                prefetch=prefetch,
+            )
+    finally:
+        sink.close()
+        await prewarmer.wait()
+        await close_crawler_pool()
+        RUN_SUMMARY.report()
+        if cpu_pool is not None:
+            print(f"🧮 进程池转换: {cpu_pool.offloaded} 个快照 ({cpu_pool.workers} 个工作进程)")
+            close_cpu_pool()
+        if assets is not None:
+            await assets.close()
+            print(assets.summary())
+        if cache is not None:
+            stats = cache.stats()
+            print(
+                f"🗃️  缓存: 命中 {stats['hits']} / 未命中 {stats['misses']} / "
+                f"淘汰 {stats['evictions']} (共 {stats['entries']} 条)"
+            )
+            cache.close()
+    return failed
+
+
+def is_single_conversion(args) -> bool:
+    """是否为默认的单页导出 (非子命令、非批量)。"""
+    return args.command is None and not (args.all or args.match)
 
 
 def entry_point():
-    ensure_chromium_installed()
-    asyncio.run(process_conversion())
+    args = parse_args()
+    if args.command == "search":
+        run_search(args)
+        return
+    if args.profile or args.trace:
+        enable_profiling()
+    crawl4ai_engine.SNAPSHOT_TRANSPORT = args.snapshot_transport
+    engines.JS_ENGINE = args.js_engine
+    if args.cdp:
+        # 原地修改，已导入该列表的模块 (监听、专栏导出) 也能看到新的端点
+        CDP_ENDPOINTS[:] = args.cdp
+    DEADLINES["connect"] = args.connect_timeout
+    DEADLINES.update(args.deadline)
+    browser_ops.CONNECT_TIMEOUT = DEADLINES["connect"] or None
+    if not is_single_conversion(args) or args.prewarm == "off":
+        # 单页导出时由 Prewarmer 在后台线程中检查，与 CDP 连接并行
+        with timed("install check"):
+            ensure_chromium_installed()
+    failed = 0
+    try:
+        failed = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n👋 已退出。")
+    if args.timings:
+        print_timings()
+    if args.profile or args.trace:
+        print_profile()
+    if args.trace:
+        write_trace(args.trace)
+    if failed:
+        # 批量导出中有标签页失败时以非零状态退出，便于脚本判断
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from .browser_ops import ensure_chromium_installed
+from .crawler_pool import get_crawler_pool
+from .strategies.registry import get_registry
+from .timings import record, record_overlap, span
+
+PREWARM_MODES = ("auto", "always", "off")
+DEFAULT_PREWARM = "auto"
+
+
+def _import_engine_modules():
+    """在线程中预先导入 crawl4ai (先导入其依赖的 playwright，保持与主线程一致的加锁顺序)。"""
+    try:
+        import playwright.async_api  # noqa: F401
+        import crawl4ai  # noqa: F401
+        import crawl4ai.async_configs  # noqa: F401
+    except ImportError:
+        pass
+
+
+class Prewarmer:
+    """
+    单页导出的并行预热：让与快照无关的准备工作和 CDP 连接、标签页定位、捕获同时进行。
+
+    - 进程启动时：在线程中检查 Chromium 安装、导入 crawl4ai (策略配置依赖它)
+    - 定位到标签页 URL 后 (捕获之前)：选出策略并准备运行配置；
+      需要 Crawl4AI 引擎时立即启动常驻浏览器，快照捕获完成后直接交给已就绪的引擎
+    mode:
+        "auto"   - 只在策略需要 Crawl4AI 时启动浏览器
+        "always" - 进程启动时即启动浏览器 (快速引擎用不到时白白占用资源)
+        "off"    - 不预热，各阶段按顺序执行
+    """
+
+    def __init__(self, mode: str = DEFAULT_PREWARM):
+        self.mode = mode
+        self._tasks: list[asyncio.Task] = []
+        self._windows: list[list] = []  # 各预热任务的 [开始, 结束]，仍在运行时结束为 None
+        self._install = None
+        self._imports = None
+        self._launch = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _spawn(self, name: str, coro, timing: str | None = None) -> asyncio.Task:
+        """
+        启动一个预热任务。timing 不为 None 时把耗时计入 --timings 的同名启动阶段，
+        使其与顺序执行 (--prewarm off 或非单页导出) 时的报告一致。
+        """
+
+        async def runner():
+            window = [time.perf_counter(), None]
+            self._windows.append(window)
+            try:
+                with span(f"prewarm: {name}"):
+                    return await coro
+            finally:
+                window[1] = time.perf_counter()
+                if timing is not None:
+                    record(timing, window[1] - window[0])
+
+        task = asyncio.create_task(runner())
+        self._tasks.append(task)
+        return task
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._install = self._spawn(
+            "install check", asyncio.to_thread(ensure_chromium_installed), timing="install check"
+        )
+        self._imports = self._spawn("import crawl4ai", asyncio.to_thread(_import_engine_modules))
+        if self.mode == "always":
+            self._start_launch()
+
+    def _start_launch(self):
+        if self._launch is None:
+            self._launch = self._spawn("crawler launch", self._launch_engine())
+
+    async def _launch_engine(self):
+        await asyncio.gather(self._install, self._imports)
+        await get_crawler_pool().warm_up()
+
+    def on_url(self, url: str):
+        """标签页已定位 (尚未捕获) 时调用：准备策略配置，按需启动引擎。"""
+        if self.enabled:
+            self._spawn("strategy config", self._prepare(url))
+
+    async def _prepare(self, url: str):
+        await self._imports
+        strategy = get_registry().lookup(url)
+        run_cfg = strategy.get_run_config()
+        if strategy.resolve_engine(run_cfg) == "crawl4ai":
+            self._start_launch()
+
+    def report(self, path_started: float, path_finished: float):
+        """
+        统计预热任务与关键路径 (连接 → 定位 → 捕获) 重叠的时间，即顺序执行时会额外等待的时长。
+        多个预热任务彼此也是并行的，因此按时间区间的并集计算。
+        """
+        clipped = sorted(
+            (max(start, path_started), min(end or path_finished, path_finished))
+            for start, end in self._windows
+        )
+        saved, cursor = 0.0, path_started
+        for start, end in clipped:
+            start = max(start, cursor)
+            if end > start:
+                saved += end - start
+                cursor = end
+        if saved:
+            record_overlap("prewarm", saved)
+
+    async def wait(self):
+        """等待所有预热任务结束 (关闭 crawler 池之前调用，避免浏览器在启动途中被遗弃)。"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,138 @@
+# 快照预裁剪：在交给提取引擎之前，用一次线性扫描删除体积大但不产生正文的元素
+# (内联脚本、样式、SVG 图标、JSON 状态等) 以及超长的内联 data URI。
+
+import re
+from functools import lru_cache
+
+# 可以整段安全删除的标签：内容不会出现在 Markdown 中，且不需要维护嵌套结构之外的上下文
+PRUNABLE_TAGS = ("script", "style", "noscript", "template", "iframe", "svg")
+# 内容是原始文本、不会嵌套同名标签的元素：遇到第一个结束标签即可
+_RAW_TEXT_TAGS = {"script", "style", "noscript", "iframe"}
+DATA_URI_LIMIT = 1024  # 超过该长度的 data URI 替换为空的 data:,
+
+_DATA_URI_RE = re.compile(r"""(["'(])data:[^"')\s]{%d,}""" % DATA_URI_LIMIT, re.I)
+# 文本末尾可能被分块截断的 data URI (含只截到 "data:" 前缀一部分的情况)
+_DATA_URI_TAIL_RE = re.compile(r"""["'(](?:d(?:a(?:t(?:a(?::[^"')\s]*)?)?)?)?)?\Z""", re.I)
+
+# 注释与 CDATA 原样保留，其中的 "<iframe>" 等文本不是标签；未闭合时一直延续到文档末尾
+_SKIP = r"(?P<skip><!--.*?(?:-->|\Z)|<!\[CDATA\[.*?(?:\]\]>|\Z))"
+# 标签名之后必须是空白、/ 或 >，避免 <style-card> 之类的自定义元素被当成 <style>；
+# 属性值中可能出现 >，按引号跳过
+_TAG_END = r"""(?=[\s/>])(?:[^>"']|"[^"]*"|'[^']*')*?(?P<selfclose>/?)>"""
+
+
+@lru_cache(maxsize=None)
+def _open_tag_re(tags: tuple[str, ...]) -> re.Pattern:
+    names = "|".join(map(re.escape, tags))
+    return re.compile(rf"{_SKIP}|<(?P<tag>{names}){_TAG_END}", re.I | re.S)
+
+
+@lru_cache(maxsize=None)
+def _close_tag_re(tag: str) -> re.Pattern:
+    return re.compile(rf"</{re.escape(tag)}(?=[\s/>])[^>]*>", re.I)
+
+
+@lru_cache(maxsize=None)
+def _nesting_tag_re(tag: str) -> re.Pattern:
+    return re.compile(rf"{_SKIP}|<(?P<close>/?){re.escape(tag)}{_TAG_END}", re.I | re.S)
+
+
+def _element_end(html: str, tag: str, start: int) -> int | None:
+    """返回从 start (开始标签之后) 起该元素结束标签之后的位置；元素未闭合时返回 None。"""
+    tag = tag.lower()
+    if tag in _RAW_TEXT_TAGS:
+        close = _close_tag_re(tag).search(html, start)
+        return close.end() if close else None
+
+    depth = 1
+    for match in _nesting_tag_re(tag).finditer(html, start):
+        if match.group("skip"):
+            continue
+        if match.group("close"):
+            depth -= 1
+        elif not match.group("selfclose"):
+            depth += 1
+        if depth == 0:
+            return match.end()
+    return None
+
+
+# 流式裁剪时，为等待结束标签而暂存的未决内容上限 (字符)；超出后该元素按未闭合处理
+STREAM_CARRY_LIMIT = 16 * 1024 * 1024
+
+
+def _prune(html: str, tags, final: bool = True) -> tuple[str, str]:
+    """
+    裁剪 html 中可以确定的部分，返回 (裁剪结果, 未决的剩余部分)。
+    final 为 False 时 html 只是文档的前缀：结束标签可能在后续内容中的元素、
+    未闭合的注释以及末尾可能被截断的标签都留在剩余部分，等待更多内容。
+    """
+    pieces = []
+    position = 0
+    if tags:
+        opener = _open_tag_re(tuple(sorted(t.lower() for t in tags)))
+        while True:
+            match = opener.search(html, position)
+            if match is None:
+                break
+            if match.group("skip"):
+                if not final and match.end() == len(html) and not match.group(0).endswith(
+                    ("-->", "]]>")
+                ):
+                    return "".join(pieces) + html[position:match.start()], html[match.start():]
+                pieces.append(html[position:match.end()])
+                position = match.end()
+                continue
+            pieces.append(html[position:match.start()])
+            if match.group("selfclose"):  # <svg ... /> 自闭合
+                position = match.end()
+                continue
+            end = _element_end(html, match.group("tag"), match.end())
+            if end is None:
+                if not final and len(html) - match.start() <= STREAM_CARRY_LIMIT:
+                    return "".join(pieces), html[match.start():]
+                # 找不到结束标签：保留开始标签并继续扫描，而不是删到文档末尾
+                pieces.append(match.group(0))
+                position = match.end()
+            else:
+                position = end
+    if final:
+        pieces.append(html[position:])
+        return "".join(pieces), ""
+    # 最后一个 < 之后可能是被分块截断的标签，末尾也可能是被截断的 data URI，留到下一块再处理
+    cut = html.rfind("<", position)
+    if cut == -1:
+        cut = len(html)
+    quote = max(html.rfind(q, position) for q in "\"'(")
+    if quote != -1 and _DATA_URI_TAIL_RE.match(html, quote):
+        cut = min(cut, quote)
+    pieces.append(html[position:cut])
+    return "".join(pieces), html[cut:]
+
+
+def _strip_data_uris(html: str) -> str:
+    return _DATA_URI_RE.sub(lambda m: m.group(1) + "data:,", html)
+
+
+def prune_html(html: str, tags=PRUNABLE_TAGS, strip_data_uris: bool = True) -> str:
+    """
+    删除 tags 指定的整段元素，并缩短超长的内联 data URI。
+    注释、CDATA 与未闭合的元素保持原样，宁可少删也不误删正文。
+    """
+    pruned, _ = _prune(html, tags)
+    return _strip_data_uris(pruned) if strip_data_uris else pruned
+
+
+def prune_chunks(chunks, tags=PRUNABLE_TAGS, strip_data_uris: bool = True):
+    """
+    prune_html 的流式版本：逐块裁剪并产出结果，拼接后与对整篇文档调用 prune_html 相同。
+    跨越分块边界的元素暂存到其结束标签到达为止 (最多 STREAM_CARRY_LIMIT 个字符)。
+    """
+    carry = ""
+    for chunk in chunks:
+        pruned, carry = _prune(carry + chunk, tags, final=False)
+        if pruned:
+            yield _strip_data_uris(pruned) if strip_data_uris else pruned
+    pruned, _ = _prune(carry, tags)
+    if pruned:
+        yield _strip_data_uris(pruned) if strip_data_uris else pruned
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import time
+from collections import deque
+from http import HTTPStatus
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_QUEUE = 32
+MAX_BODY_BYTES = 64 * 1024 * 1024
+HEADER_TIMEOUT = 10.0
+LATENCY_WINDOW = 1000  # 延迟统计只保留最近的请求
+SHUTDOWN_GRACE = 10.0  # 关闭时等待进行中的转换完成的上限 (秒)
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class ConversionServer:
+    """
+    本地 HTTP 转换服务：已经持有 HTML 的工具 (浏览器扩展、笔记流水线等)
+    直接 POST 快照即可拿到 Markdown，无需经过 CDP 标签页发现。
+
+    POST /convert   {"url": ..., "html": ...} -> {"url", "strategy", "markdown", "elapsed_ms"}
+                    或批量 [{"url", "html"}, ...] -> {"results": [...]}，逐项给出结果或 error
+    GET  /metrics   队列深度、并发数、计数与延迟分位数
+    GET  /healthz
+
+    同时进行的转换不超过 max_in_flight，其余请求排队；
+    排队数达到 max_queue 时立即返回 429，由调用方稍后重试。
+    批量请求的各项共享同一队列，整批一次性准入：放不下全部条目时整批返回 429。
+    关闭时不再接受新请求，排队中的请求返回 503，进行中的转换最多等待 SHUTDOWN_GRACE 秒。
+
+    convert: async (url, html) -> (策略名称, markdown)
+    """
+
+    def __init__(
+        self,
+        convert,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        self.convert = convert
+        self.host = host
+        self.port = port
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._waits: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.time()
+        self._server: asyncio.Server | None = None
+        self._closing = False
+        self._handlers: set[asyncio.Task] = set()
+        self._waiting: set[asyncio.Task] = set()
+
+    # --- 指标 ---
+    def metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "p50": _percentile(self._latencies, 0.5) * 1000,
+                "p95": _percentile(self._latencies, 0.95) * 1000,
+                "max": max(self._latencies, default=0.0) * 1000,
+            },
+            "queue_wait_ms": {
+                "p50": _percentile(self._waits, 0.5) * 1000,
+                "p95": _percentile(self._waits, 0.95) * 1000,
+            },
+            "uptime_s": time.time() - self._started,
+        }
+
+    # --- 转换 ---
+    @staticmethod
+    def _document(payload) -> tuple[str, str]:
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "批量请求的每一项都必须是 JSON 对象")
+        url, html = payload.get("url"), payload.get("html")
+        if not isinstance(url, str) or not isinstance(html, str) or not url:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "需要 JSON 字段 url 与 html (字符串)")
+        return url, html
+
+    def _admit(self, count: int):
+        """准入 count 个转换并计入排队数；服务关闭中或容量不足时拒绝。"""
+        if self._closing:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "服务正在关闭")
+        # 背压：并发与排队都已满时直接拒绝，不让请求无限堆积
+        if self.in_flight + self.queued + count > self.max_in_flight + self.max_queue:
+            self.rejected += count
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "转换队列已满，请稍后重试")
+        self.queued += count
+
+    async def _run(self, url: str, html: str) -> dict:
+        """执行一个已经准入 (计入排队数) 的转换。"""
+        task = asyncio.current_task()
+        enqueued = time.perf_counter()
+        self._waiting.add(task)
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            if not self._closing:
+                raise
+            # 关闭时取消的是仍在排队的请求：告知调用方服务不可用，而不是断开连接
+            task.uncancel()
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "服务正在关闭") from None
+        finally:
+            self._waiting.discard(task)
+            self.queued -= 1
+        self._waits.append(time.perf_counter() - enqueued)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            strategy, markdown = await self.convert(url, html)
+        except Exception as e:
+            self.failed += 1
+            raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"转换失败: {e}") from e
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+        elapsed = time.perf_counter() - started
+        self._latencies.append(elapsed)
+        self.completed += 1
+        return {
+            "url": url,
+            "strategy": strategy,
+            "markdown": str(markdown),
+            "elapsed_ms": elapsed * 1000,
+        }
+
+    async def _convert(self, payload: dict) -> dict:
+        url, html = self._document(payload)
+        self._admit(1)
+        return await self._run(url, html)
+
+    async def _convert_batch(self, payload: list) -> dict:
+        """批量转换：先校验全部条目并整批准入，各项并发排队，单项失败不影响其它条目。"""
+        if not payload:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "批量请求不能为空")
+        documents = [self._document(item) for item in payload]
+        self._admit(len(documents))
+        results = await asyncio.gather(
+            *(self._run(url, html) for url, html in documents), return_exceptions=True
+        )
+        for index, result in enumerate(results):
+            if isinstance(result, HTTPError):
+                results[index] = {
+                    "url": documents[index][0],
+                    "error": str(result),
+                    "status": result.status.value,
+                }
+            elif isinstance(result, BaseException):
+                raise result
+        return {"results": results}
+
+    # --- HTTP ---
+    async def _read_request(self, reader):
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST)
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], body
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> dict:
+        if path == "/healthz" and method == "GET":
+            return {"ok": True}
+        if path == "/metrics" and method == "GET":
+            return self.metrics()
+        if path == "/convert":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "请求体不是合法的 JSON")
+            if isinstance(payload, list):
+                return await self._convert_batch(payload)
+            if not isinstance(payload, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "请求体必须是 JSON 对象或数组")
+            return await self._convert(payload)
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    async def _write_response(self, writer, status: HTTPStatus, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+        ]
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+                status, payload = HTTPStatus.OK, await self._dispatch(method, path, body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+            except ValueError:
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": "无法解析请求"}
+            await self._write_response(writer, status, payload)
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def start(self):
+        """开始监听；port 为 0 时由系统分配端口，start() 之后写回 self.port。"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self, grace: float = SHUTDOWN_GRACE):
+        """
+        停止接受新连接，排队中的请求返回 503；
+        进行中的转换最多等待 grace 秒，之后取消并断开连接。
+        """
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._waiting):
+            task.cancel()
+        if self._handlers:
+            _, pending = await asyncio.wait(set(self._handlers), timeout=grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def run(self):
+        await self.start()
+        print(
+            f"🌐 转换服务已启动: http://{self.host}:{self.port} "
+            f"(并发 {self.max_in_flight}，队列 {self.max_queue}，Ctrl+C 退出)"
+        )
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
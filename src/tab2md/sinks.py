@@ -0,0 +1,283 @@
+import hashlib
+import html as html_lib
+import re
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from .timings import span
+
+OUTPUT_DIR = "exports"
+DEFAULT_ARCHIVE = Path(OUTPUT_DIR) / "archive.sqlite3"
+DEFAULT_BATCH_SIZE = 50
+SINK_NAMES = ("file", "sqlite")
+# trigram 分词按 3 个字符切分，中文等不以空格分词的文字也能按子串检索；
+# 更短的查询词无法命中索引，改为对归档做子串扫描
+TRIGRAM_MIN_CHARS = 3
+SNIPPET_CONTEXT = 24
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS exports_fts USING fts5(
+    title, url, markdown, content='exports', content_rowid='id', tokenize='trigram'
+);
+"""
+
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+_CANONICAL_RE = re.compile(r"<link\b[^>]*>", re.I)
+_ATTR_RE = re.compile(r'([\w-]+)\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)')
+# 不影响页面内容的跟踪参数，生成规范 URL 时去掉
+_TRACKING_PARAMS = ("utm_", "spm", "fbclid", "gclid")
+
+
+def extract_title(raw_html: str) -> str:
+    """快照中的 <title> 文本 (只查看文档开头)。"""
+    match = _TITLE_RE.search(raw_html, 0, 64 * 1024)
+    return html_lib.unescape(match.group(1)).strip() if match else ""
+
+
+def canonical_url(url: str, raw_html: str = "") -> str:
+    """
+    规范 URL：优先取快照中的 <link rel="canonical">；
+    否则去掉片段与常见跟踪参数。
+    """
+    for tag in _CANONICAL_RE.finditer(raw_html, 0, 64 * 1024):
+        attrs = {k.lower(): v.strip("\"'") for k, v in _ATTR_RE.findall(tag.group(0))}
+        if attrs.get("rel", "").lower() == "canonical" and attrs.get("href"):
+            return urljoin(url, html_lib.unescape(attrs["href"]))
+    parts = urlsplit(url)
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def content_hash(markdown: str) -> str:
+    return hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+
+
+class OutputSink(ABC):
+    """
+    导出结果的输出端。write() 返回可展示给用户的保存位置；
+    批量写入的输出端应在 flush()/close() 时落盘。
+    """
+
+    name = ""
+
+    @abstractmethod
+    def write(
+        self,
+        url: str,
+        markdown: str,
+        title: str = "",
+        strategy: str = "",
+        raw_html: str = "",
+        source: str = "",
+    ) -> str:
+        """source: 快照来源 (CDP 端点、HTTP 服务等)，用于追溯导出来自哪个浏览器。"""
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class FileSink(OutputSink):
+    """默认输出端：每个页面一个 Markdown 文件 (exports/<slug>_<hash>.md)。"""
+
+    name = "file"
+
+    def __init__(self, output_dir: Path | str = OUTPUT_DIR):
+        self.output_dir = Path(output_dir)
+
+    def path_for(self, url: str) -> Path:
+        """
+        URL 对应的文件路径 (会确保输出目录存在)。
+        slug 截断到 50 个字符，并追加完整 URL 的短哈希，避免不同 URL 互相覆盖。
+        """
+        slug = re.sub(r"[^a-zA-Z0-9]", "_", url.split("//")[-1])
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / f"{slug[:50]}_{digest}.md"
+
+    def write(self, url, markdown, title="", strategy="", raw_html="", source=""):
+        md_file = self.path_for(url)
+        with span("write", bytes=len(markdown)):
+            md_file.write_text(markdown, encoding="utf-8")
+        return str(md_file)
+
+
+class SQLiteSink(OutputSink):
+    """
+    归档输出端：所有导出保存在一个 SQLite 数据库中，按 URL 去重 (再次导出即更新)，
+    并维护 FTS5 全文索引供 `tab2md search` 查询。
+    写入按 batch_size 条合并为一个事务，批量导出时避免逐条提交。
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path | str = DEFAULT_ARCHIVE, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self._pending = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS exports (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                canonical_url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                markdown TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT '',
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_exports_canonical ON exports (canonical_url);
+            """
+            + _FTS_SCHEMA
+            + """
+            CREATE TRIGGER IF NOT EXISTS exports_ai AFTER INSERT ON exports BEGIN
+                INSERT INTO exports_fts (rowid, title, url, markdown)
+                VALUES (new.id, new.title, new.url, new.markdown);
+            END;
+            CREATE TRIGGER IF NOT EXISTS exports_ad AFTER DELETE ON exports BEGIN
+                INSERT INTO exports_fts (exports_fts, rowid, title, url, markdown)
+                VALUES ('delete', old.id, old.title, old.url, old.markdown);
+            END;
+            CREATE TRIGGER IF NOT EXISTS exports_au AFTER UPDATE ON exports BEGIN
+                INSERT INTO exports_fts (exports_fts, rowid, title, url, markdown)
+                VALUES ('delete', old.id, old.title, old.url, old.markdown);
+                INSERT INTO exports_fts (rowid, title, url, markdown)
+                VALUES (new.id, new.title, new.url, new.markdown);
+            END;
+            """
+        )
+        # 早期创建的归档没有 source 列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(exports)")}
+        if "source" not in columns:
+            self._conn.execute("ALTER TABLE exports ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+        # 早期创建的全文索引使用默认的 unicode61 分词 (整段中文是一个词)：按 trigram 重建
+        fts_sql = self._conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'exports_fts'"
+        ).fetchone()[0]
+        if "trigram" not in fts_sql:
+            self._conn.execute("DROP TABLE exports_fts")
+            self._conn.execute(_FTS_SCHEMA)
+            self._conn.execute("INSERT INTO exports_fts (exports_fts) VALUES ('rebuild')")
+        self._conn.commit()
+
+    def write(self, url, markdown, title="", strategy="", raw_html="", source=""):
+        now = time.time()
+        with span("write", bytes=len(markdown)):
+            row = self._conn.execute(
+                """
+                INSERT INTO exports
+                    (url, canonical_url, title, strategy, content_hash, markdown, source,
+                     created, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    canonical_url = excluded.canonical_url,
+                    title = excluded.title,
+                    strategy = excluded.strategy,
+                    content_hash = excluded.content_hash,
+                    markdown = excluded.markdown,
+                    source = excluded.source,
+                    updated = excluded.updated
+                RETURNING id
+                """,
+                (
+                    url,
+                    canonical_url(url, raw_html),
+                    title or extract_title(raw_html),
+                    strategy,
+                    content_hash(markdown),
+                    markdown,
+                    source,
+                    now,
+                    now,
+                ),
+            ).fetchone()
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self.flush()
+        return f"{self.path}#{row[0]}"
+
+    def flush(self):
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def search(self, query: str, limit: int = 20) -> list[tuple]:
+        """
+        全文检索，返回 [(id, url, title, 片段, 更新时间)]，按相关度排序。
+        单个少于 TRIGRAM_MIN_CHARS 个字符的词 (如 "算法") 按子串扫描，结果按更新时间排序。
+        """
+        term = query.strip()
+        if term.startswith('"') and term.endswith('"') and len(term) > 1:
+            term = term[1:-1]
+        if term and len(term) < TRIGRAM_MIN_CHARS and not re.search(r'[\s"*()^:]', term):
+            return self._search_substring(term, limit)
+        return self._conn.execute(
+            """
+            SELECT e.id, e.url, e.title,
+                   snippet(exports_fts, 2, '[', ']', ' … ', 16),
+                   e.updated
+            FROM exports_fts JOIN exports e ON e.id = exports_fts.rowid
+            WHERE exports_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+
+    def _search_substring(self, term: str, limit: int) -> list[tuple]:
+        pattern = "%" + re.sub(r"([%_\\])", r"\\\1", term) + "%"
+        rows = self._conn.execute(
+            """
+            SELECT id, url, title, markdown, updated FROM exports
+            WHERE title LIKE ?1 ESCAPE '\\' OR markdown LIKE ?1 ESCAPE '\\'
+            ORDER BY updated DESC
+            LIMIT ?2
+            """,
+            (pattern, limit),
+        ).fetchall()
+        results = []
+        for export_id, url, title, markdown, updated in rows:
+            index = markdown.lower().find(term.lower())
+            if index < 0:
+                snippet = markdown[: SNIPPET_CONTEXT * 2]
+            else:
+                end = index + len(term)
+                snippet = (
+                    ("… " if index > SNIPPET_CONTEXT else "")
+                    + markdown[max(0, index - SNIPPET_CONTEXT) : index]
+                    + f"[{markdown[index:end]}]"
+                    + markdown[end : end + SNIPPET_CONTEXT]
+                    + (" …" if end + SNIPPET_CONTEXT < len(markdown) else "")
+                )
+            results.append((export_id, url, title, snippet.replace("\n", " "), updated))
+        return results
+
+    def get_markdown(self, export_id: int) -> str | None:
+        row = self._conn.execute(
+            "SELECT markdown FROM exports WHERE id = ?", (export_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def create_sink(name: str, archive: Path | str = DEFAULT_ARCHIVE) -> OutputSink:
+    if name == "sqlite":
+        return SQLiteSink(archive)
+    return FileSink()
@@ -0,0 +1,5 @@
+# 内置策略清单: 域名后缀 -> "模块:类"
+# 模块在首次有 URL 命中该域名时才导入 (见 registry.StrategyRegistry)
+BUILTIN_STRATEGIES = {
+    "geekbang.org": "tab2md.strategies.geekbang:GeekbangColumnStrategy",
+}
@@ -1,15 +1,56 @@
+from __future__ import annotations
+
+import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-import os
-from crawl4ai import AsyncWebCrawler
-from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from ..cache import fingerprint_config, make_cache_key
+from .. import engines
+from ..engines import EngineUnsupportedError, get_engine
+from ..prune import PRUNABLE_TAGS, prune_chunks, prune_html
+from ..timings import span
+
+if TYPE_CHECKING:
+    # crawl4ai 导入较慢，仅在 get_run_config 被调用时才真正加载
+    from crawl4ai.async_configs import CrawlerRunConfig
+
+
+class StructuredMarkdown(str):
+    """
+    策略通过站点接口 (而非渲染后的 DOM) 直接得到的 Markdown。
+    作为快照在流水线中传递时无需再经过提取引擎；title 为接口给出的标题。
+    """
+
+    title = ""
 
 
 class BaseStrategy(ABC):
     """
     所有网页转换策略的基类。
+
+    engine: 使用的转换引擎
+        "auto"     - 配置中没有 js_code 时使用纯 Python 快速引擎，失败再回退到 Crawl4AI
+        "fast"     - 强制使用快速引擎 (不支持时仍会回退)
+        "crawl4ai" - 始终使用 Crawl4AI 无头浏览器
+        "browser"  - 在用户浏览器的隐藏目标中执行 js_code，再用快速引擎提取 (失败时回退到 Crawl4AI)
+        "auto" 遇到 js_code 时使用 engines.JS_ENGINE 指定的引擎 (--js-engine)。
+
+    capture_selector: 捕获范围。设置后只在用户标签页内序列化匹配的子树
+        (外加 <head> 元数据)，而不是整页 content()。
+
+    domains / url_patterns: 供策略注册表建立索引的域名后缀与 URL 正则。
+
+    prune_keep_tags: 提取前预裁剪时需要保留的标签 (即使它们在 excluded_tags 中)。
     """
 
+    engine = "auto"
+    capture_selector: str | None = None
+    domains: tuple[str, ...] = ()
+    url_patterns: tuple[str, ...] = ()
+    prune_keep_tags: tuple[str, ...] = ()
+
     def inject_base_tag(self, html: str, url: str) -> str:
         """注入 <base> 标签以修复相对链接 (Common Utility)。"""
         base_tag = f'<base href="{url}">'
@@ -17,47 +58,201 @@ class BaseStrategy(ABC):
             return html.replace("<head>", f"<head>\n{base_tag}", 1)
         return f"<html><head>{base_tag}</head>" + html
 
-    async def execute(self, url: str, raw_html: str) -> str:
+    def resolve_engine(self, run_cfg: CrawlerRunConfig) -> str:
+        """根据策略声明与配置决定本次使用的引擎名称。"""
+        if self.engine == "auto":
+            return engines.JS_ENGINE if run_cfg.js_code else "fast"
+        return self.engine
+
+    def prune_tags(self, run_cfg: CrawlerRunConfig) -> set[str]:
         """
-        执行转换逻辑。
-        1. 处理 HTML (注入 base tag)
-        2. 保存临时文件
-        3. 调用 Crawl4AI 进行提取
+        预裁剪要整段删除的标签：excluded_tags 中可以安全整段删除的部分，
+        去掉 prune_keep_tags。配置了 js_code 时保留 <style>，脚本可能依赖计算样式。
         """
-        # 1. 预处理
-        html_with_base = self.inject_base_tag(raw_html, url)
-        temp_file = Path("temp_snapshot.html").resolve()
-        temp_file.write_text(html_with_base, encoding="utf-8")
+        excluded = {t.lower() for t in getattr(run_cfg, "excluded_tags", None) or ()}
+        tags = excluded & set(PRUNABLE_TAGS)
+        if run_cfg.js_code:
+            tags.discard("style")
+        return tags - set(self.prune_keep_tags)
 
-        # 使用标准库生成跨平台 file URI
-        local_file_uri = temp_file.as_uri()
+    def prune_snapshot(self, html: str, run_cfg: CrawlerRunConfig) -> str:
+        """在交给提取引擎之前删除不产生正文的大块内容，并报告裁剪前后的大小。"""
+        with span("prune", bytes=len(html)) as s:
+            pruned = prune_html(html, self.prune_tags(run_cfg))
+            s.set(out_bytes=len(pruned))
+        if len(pruned) < len(html):
+            print(
+                f"🧹 预裁剪: {len(html) / 1024:.1f} KB → {len(pruned) / 1024:.1f} KB "
+                f"(-{1 - len(pruned) / len(html):.0%})"
+            )
+        return pruned
 
-        # Windows 兼容性修复:
-        # pathlib 生成的是 file:///C:/... (3个斜杠)
-        # crawl4ai 内部逻辑是 url[7:]，会导致路径变为 /C:/... (带前导斜杠)
-        # 这在 Windows 上会导致 os.path.exists 失败。
-        # 因此我们需要手动将其调整为 file://C:/... (以便切片后得到 C:/...)
-        if os.name == "nt":
-            local_file_uri = local_file_uri.replace("file:///", "file://")
+    def strategy_settings(self) -> dict:
+        """策略类上声明的简单设置 (engine、capture_selector 等)，参与缓存指纹。"""
+        simple = (str, int, float, bool, tuple, type(None))
+        settings = {}
+        for klass in reversed(type(self).__mro__):
+            for name, value in vars(klass).items():
+                if not name.startswith("_") and isinstance(value, simple):
+                    settings[name] = value
+        return settings
 
-        # 2. 获取配置 (由子类实现)
-        browser_cfg = BrowserConfig(headless=True, verbose=False)
+    def cache_key(self, url: str, raw_html: str) -> str:
+        """由快照、策略类与运行配置 (含 js_code、引擎与策略设置) 计算转换缓存键。"""
         run_cfg = self.get_run_config()
+        fingerprint = fingerprint_config(
+            run_cfg,
+            engine=self.resolve_engine(run_cfg),
+            strategy=self.strategy_settings(),
+        )
+        strategy_name = f"{type(self).__module__}.{type(self).__qualname__}"
+        return make_cache_key(self.inject_base_tag(raw_html, url), strategy_name, fingerprint)
+
+    def transform_html(self, html: str, url: str) -> str:
+        """
+        提取前在 Python 中改写快照的钩子 (默认原样返回)。
+        需要修复 DOM 的策略应优先覆盖此方法，而不是注入 js_code，
+        这样无需无头浏览器即可走快速引擎。
+        """
+        return html
 
-        print(f"🚀 正在使用策略 [{self.__class__.__name__}] 运行提取引擎...")
+    async def fetch_markdown(self, url: str, context) -> StructuredMarkdown | None:
+        """
+        结构化数据快速路径 (默认不提供)。
+        策略可以通过站点接口直接获取正文并转换为 Markdown，跳过 DOM 序列化与提取；
+        context 为标签页所在的 Playwright 浏览器上下文，其 request API 携带登录态 Cookie。
+        返回 None 时回退到常规的快照捕获。
+        """
+        return None
+
+    def prepare(self, url: str, raw_html: str) -> tuple[str, CrawlerRunConfig, str]:
+        """
+        提取前的纯 CPU 步骤：注入 base tag、执行 transform_html、获取配置并预裁剪。
+        返回 (处理后的 HTML, 运行配置, 引擎名称)。
+        """
+        # 1. 预处理
+        with span("transform_html", strategy=type(self).__name__, bytes=len(raw_html)) as s:
+            html_with_base = self.transform_html(self.inject_base_tag(raw_html, url), url)
+            s.set(out_bytes=len(html_with_base))
+
+        # 2. 获取配置 (由子类实现)
+        with span("run config"):
+            run_cfg = self.get_run_config()
+            engine_name = self.resolve_engine(run_cfg)
+        html_with_base = self.prune_snapshot(html_with_base, run_cfg)
+        return html_with_base, run_cfg, engine_name
+
+    def convert_fast(self, url: str, raw_html: str) -> str:
+        """
+        同步执行完整的快速引擎路径 (prepare + 提取)，不涉及事件循环与浏览器，
+        可以在进程池中运行。策略不使用快速引擎时抛出 EngineUnsupportedError。
+        """
+        html_with_base, run_cfg, engine_name = self.prepare(url, raw_html)
+        if engine_name != "fast":
+            raise EngineUnsupportedError(f"策略 [{self.__class__.__name__}] 不使用快速引擎")
+        with span("extract", engine="fast", bytes=len(html_with_base)) as s:
+            markdown = get_engine("fast").convert_sync(url, html_with_base, run_cfg)
+            s.set(out_bytes=len(markdown))
+        return markdown
+
+    async def execute(
+        self, url: str, raw_html: str, crawler=None, source: str | None = None
+    ) -> str:
+        """
+        执行转换逻辑。
+        1. 处理 HTML (注入 base tag，执行 transform_html)
+        2. 选择转换引擎 (见 engine 属性)，预裁剪快照 (见 prune_tags)
+        3. 运行提取；快速引擎或浏览器内引擎无法处理、结果为空时自动回退到 Crawl4AI
+
+        crawler: 可选的 AsyncWebCrawler 实例；未指定时从进程级 crawler 池借用常驻浏览器。
+        source: 快照来源的 CDP 端点，浏览器内引擎在该浏览器中创建隐藏目标。
+        """
+        # 1-2. 预处理、获取配置、预裁剪
+        html_with_base, run_cfg, engine_name = self.prepare(url, raw_html)
+
+        print(
+            f"🚀 正在使用策略 [{self.__class__.__name__}] 运行提取引擎 [{engine_name}]..."
+        )
 
         # 3. 运行提取
-        async with AsyncWebCrawler(config=browser_cfg) as crawler:
-            result = await crawler.arun(url=local_file_uri, config=run_cfg)
+        if engine_name == "fast":
+            try:
+                with span("extract", engine="fast", bytes=len(html_with_base)) as s:
+                    markdown = await get_engine("fast").convert(url, html_with_base, run_cfg)
+                    s.set(out_bytes=len(markdown))
+                if markdown.strip():
+                    return markdown
+                print("⚠️  快速引擎未提取到内容，回退到 Crawl4AI。")
+            except EngineUnsupportedError as e:
+                print(f"⚠️  {e}，回退到 Crawl4AI。")
+        elif engine_name == "browser":
+            try:
+                with span("extract", engine="browser", bytes=len(html_with_base)) as s:
+                    engine = get_engine("browser", endpoint=source)
+                    markdown = await engine.convert(url, html_with_base, run_cfg)
+                    s.set(out_bytes=len(markdown))
+                if markdown.strip():
+                    return markdown
+                print("⚠️  浏览器内转换未提取到内容，回退到 Crawl4AI。")
+            except Exception as e:
+                print(f"⚠️  浏览器内转换失败 ({e})，回退到 Crawl4AI。")
+
+        engine = get_engine("crawl4ai", crawler=crawler)
+        with span("extract", engine="crawl4ai", bytes=len(html_with_base)) as s:
+            markdown = await engine.convert(url, html_with_base, run_cfg)
+            s.set(out_bytes=len(markdown))
+        return markdown
+
+    def supports_streaming(self, run_cfg: CrawlerRunConfig) -> bool:
+        """
+        能否对超大快照走流式转换：需要使用快速引擎，且没有覆盖 transform_html
+        (DOM 改写需要完整文档，无法分块进行)。
+        """
+        return (
+            self.resolve_engine(run_cfg) == "fast"
+            and type(self).transform_html is BaseStrategy.transform_html
+        )
+
+    async def execute_streaming(
+        self, url: str, snapshot_path: Path, output_path: Path, chunk_chars: int = 1 << 20
+    ) -> int:
+        """
+        流式转换磁盘上的快照文件，Markdown 增量写入 output_path，返回写出的字符数。
+        <base> 标签只注入到第一个分块中，不会复制整篇文档；
+        与 execute() 相同地逐块预裁剪 (见 prune_tags)，输出与内存中转换一致。
+        不支持流式转换时抛出 EngineUnsupportedError，由调用方回退到 execute()。
+        """
+        run_cfg = self.get_run_config()
+        if not self.supports_streaming(run_cfg):
+            raise EngineUnsupportedError(f"策略 [{self.__class__.__name__}] 不支持流式转换")
+
+        print(f"🚀 正在使用策略 [{self.__class__.__name__}] 流式运行提取引擎 [fast]...")
+        sizes = {"in": 0, "out": 0}
+
+        def chunks(source):
+            first = self.inject_base_tag(source.read(chunk_chars), url)
+            sizes["in"] += len(first)
+            yield first
+            while chunk := source.read(chunk_chars):
+                sizes["in"] += len(chunk)
+                yield chunk
 
-            # 清理临时文件 (可选)
-            # try: temp_file.unlink()
-            # except: pass
+        def pruned(source):
+            for piece in prune_chunks(chunks(source), self.prune_tags(run_cfg)):
+                sizes["out"] += len(piece)
+                yield piece
 
-            if result.success:
-                return result.markdown
-            else:
-                raise Exception(f"转换失败: {result.error_message}")
+        with span("extract", engine="fast-stream") as s, open(
+            snapshot_path, encoding="utf-8"
+        ) as source, open(output_path, "w", encoding="utf-8") as out:
+            written = get_engine("fast").convert_stream(url, pruned(source), out, run_cfg)
+            s.set(bytes=snapshot_path.stat().st_size, out_bytes=written)
+        if sizes["out"] < sizes["in"]:
+            print(
+                f"🧹 预裁剪: {sizes['in'] / 1024:.1f} KB → {sizes['out'] / 1024:.1f} KB "
+                f"(-{1 - sizes['out'] / sizes['in']:.0%})"
+            )
+        return written
 
     @abstractmethod
     def get_run_config(self) -> CrawlerRunConfig:
@@ -70,6 +265,9 @@ class BaseStrategy(ABC):
     def match(cls, url: str) -> bool:
         """
         判断该策略是否适用于给定的 URL。
-        默认返回 False，需要在子类中覆盖逻辑 (除了 BasicStrategy)。
+        默认按 domains (域名后缀) 与 url_patterns (正则) 判断；两者都未声明时返回 False。
         """
-        return False
+        host = (urlparse(url).hostname or "").lower()
+        if any(host == d or host.endswith("." + d) for d in cls.domains):
+            return True
+        return any(re.search(p, url) for p in cls.url_patterns)
@@ -1,6 +1,12 @@
-from crawl4ai.async_configs import CrawlerRunConfig, CacheMode
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from .base import BaseStrategy
 
+if TYPE_CHECKING:
+    from crawl4ai.async_configs import CrawlerRunConfig
+
 
 class BasicStrategy(BaseStrategy):
     """
@@ -8,6 +14,8 @@ class BasicStrategy(BaseStrategy):
     """
 
     def get_run_config(self) -> CrawlerRunConfig:
+        from crawl4ai.async_configs import CacheMode, CrawlerRunConfig
+
         return CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             magic=True,
@@ -28,5 +36,8 @@ class BasicStrategy(BaseStrategy):
 
     @classmethod
     def match(cls, url: str) -> bool:
-        # BasicStrategy 作为最后的兜底，通常不参与自动匹配，或者总是返回 True (取决于你的路由逻辑)
-        return True
+        # BasicStrategy 作为最后的兜底总是适用；
+        # 继承它的站点策略仍按自己声明的 domains / url_patterns 判断
+        if cls is BasicStrategy:
+            return True
+        return super().match(url)
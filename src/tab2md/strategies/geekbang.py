@@ -1,13 +1,384 @@
+from __future__ import annotations
+
+import copy
+import re
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
-from crawl4ai.async_configs import CrawlerRunConfig
+
+from ..dom import Element, Text, parse_html, serialize
+from ..engines import get_engine
+from ..engines.fast import MARKDOWN_ATTR
+from ..timings import span
+from .base import StructuredMarkdown
 from .basic import BasicStrategy
 
+if TYPE_CHECKING:
+    from crawl4ai.async_configs import CrawlerRunConfig
+
+EDITOR_SELECTOR = "div[data-slate-editor='true']"
+# 文章详情接口：页面本身也是用它返回的正文渲染 Slate 编辑器
+GEEKBANG_ARTICLE_API = "https://time.geekbang.org/serv/v1/article"
+API_TIMEOUT_MS = 15000
+_ARTICLE_ID_RE = re.compile(r"/column/article/(\d+)")
+
+# 旧的浏览器内修复脚本 (dom_transform = "js" 时使用)。
+# 网页原始结构是用 div 模拟代码块，Markdown 转换器无法识别。
+# 我们在提取前，用 JS 将其强制转换为标准的 <pre><code> 标签。
+GEEKBANG_FIX_JS = """
+    // --- 处理代码块 ---
+    // 找到所有 Slate 伪装的代码块容器
+    const blocks = document.querySelectorAll('div[data-slate-type="pre"]');
+
+    blocks.forEach(block => {
+        const pre = document.createElement('pre');
+        const code = document.createElement('code');
+
+        // 尝试提取语言标记 (如 python, java)
+        const lang = block.getAttribute('data-code-language');
+        if (lang) {
+            code.className = `language-${lang}`;
+        }
+        
+        // 提取所有代码行的文本并拼接
+        const lines = [];
+        block.querySelectorAll('div[data-slate-type="code-line"]').forEach(line => {
+            // 使用 textContent 获取纯文本，保留缩进
+            lines.push(line.textContent);
+        });
+        
+        // 将代码放入标准标签中
+        code.textContent = lines.join('\\n');
+        pre.appendChild(code);
+        
+        // 用标准 <pre> 替换掉原始的 <div>
+        block.parentNode.replaceChild(pre, block);
+    });
+
+    // --- 修复丢失的加粗格式 ---
+    // 使用 getComputedStyle 捕捉所有形式的加粗 (Inline Style 或 CSS Class)
+    (function() {
+        const editor = document.querySelector("div[data-slate-editor='true']");
+        if (!editor) return;
+
+        // 转换为数组以安全遍历
+        const spans = Array.from(editor.querySelectorAll('span'));
+
+        spans.forEach(span => {
+            // [核心修改] 获取最终计算样式，而非仅检查 style 属性
+            const computed = window.getComputedStyle(span);
+            const weight = computed.fontWeight; // 返回如 "700" 或 "bold"
+            
+            // 判定标准：bold(700), bolder, 或数值 >= 600
+            // 注意：parseInt('bold') 会是 NaN，所以需要分别判断
+            const isBold = (
+                weight === 'bold' || 
+                weight === 'bolder' || 
+                (!isNaN(parseInt(weight)) && parseInt(weight) >= 600)
+            );
+
+            if (isBold) {
+                const strong = document.createElement('strong');
+                // 保留 span 内部的文字和潜在的其他格式
+                strong.innerHTML = span.innerHTML;
+                
+                // 如果 span 有特定类名可能影响布局，但在 Markdown 转换中我们只关心语义
+                if (span.parentNode) {
+                    span.parentNode.replaceChild(strong, span);
+                }
+            }
+        });
+    })();
+
+    // --- 智能列表修复 ---
+    (function() {
+        // 触发词：你将能够、主要包括、学习目标等
+        const triggers = ['你将能够：', '你将能够:', '主要包括：', '通过本节课的学习'];
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
+        
+        let node;
+        let activeTrigger = false; 
+        let itemsCount = 0;
+        
+        while(node = walker.nextNode()) {
+            const text = node.nodeValue.trim();
+            if (!text) continue;
+            
+            // A. 发现路标：开启列表模式
+            if (triggers.some(t => text.includes(t))) {
+                activeTrigger = true;
+                itemsCount = 0;
+                continue; 
+            }
+
+            // B. 处于列表区域中，进行智能判断
+            if (activeTrigger) {
+                // 1. 找到承载文本的容器
+                let container = node.parentElement;
+                // 跳过行内元素，找到真正的“行”容器
+                while (container && ['SPAN', 'STRONG', 'B', 'EM', 'I', 'A', 'CODE'].includes(container.tagName)) {
+                    container = container.parentElement;
+                }
+                if (!container || container === document.body) continue;
+
+                // 2. [关键修改] 刹车机制：遇到标题或长段落，立即结束列表模式
+                const isHeader = ['H1','H2','H3','H4'].includes(container.tagName);
+                const isLongText = text.length > 80; // 阈值：超过80字通常是正文
+                const isCode = container.closest('pre');
+
+                if (isHeader || isLongText || isCode) {
+                    activeTrigger = false; // 关闭开关
+                    continue; // 这一行作为普通正文处理
+                }
+
+                // 3. 避免重复处理
+                if (!container.getAttribute('data-fix-bullet')) {
+                    // 排除无意义的短语
+                    if (text.startsWith('你好') || text.includes('欢迎来到')) continue;
+
+                    // 4. [修改] 添加圆点
+                    if (!text.match(/^[-*]|\d+\./)) {
+                        const bullet = document.createElement('span');
+                        bullet.textContent = '- '; 
+                        bullet.style.fontWeight = 'bold';
+                        bullet.setAttribute('data-tab2md-markdown', '');  // 快速引擎原样输出，不转义
+                        if (container.firstChild) {
+                            container.insertBefore(bullet, container.firstChild);
+                        } else {
+                            container.appendChild(bullet);
+                        }
+                    }
+                    
+                    // 5. [关键修改] 强制换行隔离！
+                    // 极客时间很多 div 是紧挨着的，Markdownify 容易把它们拼成一行
+                    // 我们给它加一个不可见的块级分隔，或者直接追加 br
+                    const br = document.createElement('br');
+                    container.appendChild(br);
+                    
+                    // 或者强制设为块级显示
+                    container.style.display = 'block';
+                    container.style.marginBottom = '10px'; // 视觉上分开，辅助转换器识别
+
+                    // 标记并计数
+                    container.setAttribute('data-fix-bullet', 'true');
+                    itemsCount++;
+                    
+                    // 安全阀：最多修 6 行
+                    if (itemsCount >= 6) activeTrigger = false;
+                }
+            }
+        }
+    })();
+    
+    // 3. 全局段落粘连修复 (针对正文)
+    // 如果所有正文都粘连，说明 div 之间没有空行。
+    // 我们可以给所有 slate-paragraph 强制加下边距或换行
+    document.querySelectorAll('div[data-slate-type="paragraph"]').forEach(p => {
+        p.appendChild(document.createElement('br'));
+        p.appendChild(document.createTextNode('\\n')); // 显式添加换行符文本
+    });
+"""
+
+# --- Python 版 DOM 修复 (与 GEEKBANG_FIX_JS 逐步对应) ---
+
+# 列表修复的触发词：你将能够、主要包括、学习目标等
+LIST_TRIGGERS = ("你将能够：", "你将能够:", "主要包括：", "通过本节课的学习")
+LIST_MAX_ITEMS = 6
+LIST_LONG_TEXT = 80  # 阈值：超过80字通常是正文
+INLINE_TAGS = {"span", "strong", "b", "em", "i", "a", "code"}
+HEADER_TAGS = {"h1", "h2", "h3", "h4"}
+# 浏览器默认样式中加粗的元素 (font-weight: bold / bolder)
+BOLD_TAGS = {"strong", "b", "h1", "h2", "h3", "h4", "h5", "h6", "th"}
+
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_CLASS_SELECTOR_RE = re.compile(r"^(?:[a-zA-Z][\w-]*)?\.([\w-]+)$")
+_FONT_WEIGHT_RE = re.compile(r"font-weight\s*:\s*([^;!]+)", re.IGNORECASE)
+_BULLET_LIKE_RE = re.compile(r"^[-*]|\d+\.")
+
+
+def _is_bold_weight(value: str | None) -> bool | None:
+    """bold(700)、bolder 或数值 >= 600 视为加粗；normal 等返回 False；None 表示未声明。"""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("bold", "bolder"):
+        return True
+    if value.isdigit():
+        return int(value) >= 600
+    return False
+
+
+def build_bold_class_map(root: Element) -> dict[str, bool]:
+    """
+    从 <style> 中一次性解析 `.class { font-weight: ... }`，得到 类名 -> 是否加粗。
+    外链样式表的规则由捕获脚本从 document.styleSheets 中读出，
+    以 <style data-tab2md-weights> 的形式附在快照的 <head> 中，同样在这里解析。
+    """
+    class_map: dict[str, bool] = {}
+    for style in root.iter_elements("style"):
+        for selectors, declarations in _CSS_RULE_RE.findall(style.text_content()):
+            weights = _FONT_WEIGHT_RE.findall(declarations)
+            if not weights:
+                continue
+            bold = _is_bold_weight(weights[-1])
+            for selector in selectors.split(","):
+                m = _CLASS_SELECTOR_RE.match(selector.strip())
+                if m:
+                    class_map[m.group(1)] = bold
+    return class_map
+
+
+def _declared_bold(element: Element, class_map: dict[str, bool]) -> bool | None:
+    """元素自身声明的粗细：内联样式优先于类样式，未声明返回 None。"""
+    inline = _FONT_WEIGHT_RE.findall(element.attrs.get("style", ""))
+    if inline:
+        return _is_bold_weight(inline[-1])
+    declared = None
+    for cls in element.attrs.get("class", "").split():
+        if cls in class_map:
+            declared = class_map[cls]
+    return declared
+
+
+def rebuild_code_blocks(root: Element):
+    """div[data-slate-type=pre] -> <pre><code class="language-xx">，逐行拼接代码文本。"""
+    for block in list(root.iter_elements("div", data_slate_type="pre")):
+        if block.parent is None:
+            continue
+        code = Element("code")
+        lang = block.attrs.get("data-code-language")
+        if lang:
+            code.attrs["class"] = f"language-{lang}"
+        lines = [
+            line.text_content()
+            for line in block.iter_elements("div", data_slate_type="code-line")
+        ]
+        code.append(Text("\n".join(lines)))
+        pre = Element("pre")
+        pre.append(code)
+        block.replace_with(pre)
+
+
+def mark_bold_spans(root: Element, class_map: dict[str, bool]):
+    """
+    将计算后为粗体的 <span> 替换为 <strong>，与 GEEKBANG_FIX_JS 的 getComputedStyle 判断一致。
+    粗细按 内联样式 > 类样式 > 继承 的顺序解析 (标题、<strong> 等按浏览器默认样式视为粗体)，
+    因此父元素加粗时其中的 span 同样会被包裹；
+    只有已经生成的 <strong> 内部不再重复处理 (JS 中它们是 innerHTML 的副本，不在遍历列表中)。
+    """
+    editor = next(root.iter_elements("div", data_slate_editor="true"), None)
+    if editor is None:
+        return
+
+    # (节点, 继承的粗细)
+    stack = [(child, False) for child in reversed(editor.children)]
+    while stack:
+        node, inherited = stack.pop()
+        if not isinstance(node, Element):
+            continue
+        declared = _declared_bold(node, class_map)
+        if declared is None:
+            declared = True if node.tag in BOLD_TAGS else None
+        bold = inherited if declared is None else declared
+        if node.tag == "span" and bold:
+            strong = Element("strong")
+            strong.take_children(node)
+            node.replace_with(strong)
+            continue
+        stack.extend((child, bold) for child in reversed(node.children))
+
+
+def repair_bullets(root: Element):
+    """智能列表修复：触发词之后的若干短行补上 "- " 并强制换行隔离。"""
+    body = root.find_body()
+    active = False
+    items = 0
+    for node in list(body.iter_text()):
+        text = node.data.strip()
+        if not text:
+            continue
+
+        # A. 发现路标：开启列表模式
+        if any(t in text for t in LIST_TRIGGERS):
+            active = True
+            items = 0
+            continue
+        if not active:
+            continue
+
+        # B. 找到承载文本的"行"容器 (跳过行内元素)
+        container = node.parent
+        while container is not None and container.tag in INLINE_TAGS:
+            container = container.parent
+        if container is None or container is body:
+            continue
+
+        # 刹车机制：遇到标题、长段落或代码，立即结束列表模式
+        if (
+            container.tag in HEADER_TAGS
+            or len(text) > LIST_LONG_TEXT
+            or container.closest({"pre"}) is not None
+        ):
+            active = False
+            continue
+
+        if container.attrs.get("data-fix-bullet"):
+            continue
+        # 排除无意义的短语
+        if text.startswith("你好") or "欢迎来到" in text:
+            continue
+
+        if not _BULLET_LIKE_RE.search(text):
+            bullet = Element("span", {"style": "font-weight: bold", MARKDOWN_ATTR: ""})
+            bullet.append(Text("- "))
+            container.insert(0, bullet)
+        container.append(Element("br"))
+        container.attrs["data-fix-bullet"] = "true"
+        items += 1
+        # 安全阀：最多修 6 行
+        if items >= LIST_MAX_ITEMS:
+            active = False
+
+
+def separate_paragraphs(root: Element):
+    """全局段落粘连修复：每个 slate 段落末尾追加换行。"""
+    for paragraph in list(root.iter_elements("div", data_slate_type="paragraph")):
+        paragraph.append(Element("br"))
+        paragraph.append(Text("\n"))
+
+
+def transform_geekbang_html(html: str) -> str:
+    """在解析后的快照上依次执行：代码块重建、加粗识别、列表修复、段落分隔。"""
+    with span("geekbang: parse", bytes=len(html)):
+        root = parse_html(html)
+    with span("geekbang: fix-ups"):
+        class_map = build_bold_class_map(root)
+        rebuild_code_blocks(root)
+        mark_bold_spans(root, class_map)
+        repair_bullets(root)
+        separate_paragraphs(root)
+    with span("geekbang: serialize"):
+        return serialize(root)
+
 
 class GeekbangColumnStrategy(BasicStrategy):
     """
     极客时间专栏文章策略 (适配 Slate.js 编辑器)
+
+    dom_transform:
+        "python" - 在 Python 中改写快照 (默认，无需无头浏览器，可走快速引擎)
+        "js"     - 旧路径：在 Crawl4AI 无头浏览器中执行 GEEKBANG_FIX_JS
+
+    api_fast_path: 文章页优先携带登录态请求文章详情接口，直接转换接口返回的正文
+        (代码块是原始文本，不需要从 Slate 的逐行 div 中拼回)；接口失败时才捕获 DOM。
     """
 
+    domains = ("geekbang.org",)
+    dom_transform = "python"
+    api_fast_path = True
+
+    # 只从标签页中截取 Slate 编辑器正文，跳过侧边栏、评论与内联脚本
+    capture_selector = EDITOR_SELECTOR
+
     def get_run_config(self) -> CrawlerRunConfig:
         config = super().get_run_config()
 
@@ -16,170 +387,59 @@ class GeekbangColumnStrategy(BasicStrategy):
 
         # 2. 精准定位正文区域
         # 极客时间新版使用 Slate.js，正文容器通常带有 data-slate-editor="true" 属性
-        config.css_selector = "div[data-slate-editor='true']"
-
-        # 3. [关键] 注入 JS 修复代码块
-        # 网页原始结构是用 div 模拟代码块，Markdown 转换器无法识别。
-        # 我们在提取前，用 JS 将其强制转换为标准的 <pre><code> 标签。
-        config.js_code = """
-            // --- 处理代码块 ---
-            // 找到所有 Slate 伪装的代码块容器
-            const blocks = document.querySelectorAll('div[data-slate-type="pre"]');
-
-            blocks.forEach(block => {
-                const pre = document.createElement('pre');
-                const code = document.createElement('code');
-
-                // 尝试提取语言标记 (如 python, java)
-                const lang = block.getAttribute('data-code-language');
-                if (lang) {
-                    code.className = `language-${lang}`;
-                }
-                
-                // 提取所有代码行的文本并拼接
-                const lines = [];
-                block.querySelectorAll('div[data-slate-type="code-line"]').forEach(line => {
-                    // 使用 textContent 获取纯文本，保留缩进
-                    lines.push(line.textContent);
-                });
-                
-                // 将代码放入标准标签中
-                code.textContent = lines.join('\\n');
-                pre.appendChild(code);
-                
-                // 用标准 <pre> 替换掉原始的 <div>
-                block.parentNode.replaceChild(pre, block);
-            });
-
-            // --- 修复丢失的加粗格式 ---
-            // 使用 getComputedStyle 捕捉所有形式的加粗 (Inline Style 或 CSS Class)
-            (function() {
-                const editor = document.querySelector("div[data-slate-editor='true']");
-                if (!editor) return;
-
-                // 转换为数组以安全遍历
-                const spans = Array.from(editor.querySelectorAll('span'));
-
-                spans.forEach(span => {
-                    // [核心修改] 获取最终计算样式，而非仅检查 style 属性
-                    const computed = window.getComputedStyle(span);
-                    const weight = computed.fontWeight; // 返回如 "700" 或 "bold"
-                    
-                    // 判定标准：bold(700), bolder, 或数值 >= 600
-                    // 注意：parseInt('bold') 会是 NaN，所以需要分别判断
-                    const isBold = (
-                        weight === 'bold' || 
-                        weight === 'bolder' || 
-                        (!isNaN(parseInt(weight)) && parseInt(weight) >= 600)
-                    );
-
-                    if (isBold) {
-                        const strong = document.createElement('strong');
-                        // 保留 span 内部的文字和潜在的其他格式
-                        strong.innerHTML = span.innerHTML;
-                        
-                        // 如果 span 有特定类名可能影响布局，但在 Markdown 转换中我们只关心语义
-                        if (span.parentNode) {
-                            span.parentNode.replaceChild(strong, span);
-                        }
-                    }
-                });
-            })();
-
-            // --- 智能列表修复 ---
-            (function() {
-                // 触发词：你将能够、主要包括、学习目标等
-                const triggers = ['你将能够：', '你将能够:', '主要包括：', '通过本节课的学习'];
-                const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
-                
-                let node;
-                let activeTrigger = false; 
-                let itemsCount = 0;
-                
-                while(node = walker.nextNode()) {
-                    const text = node.nodeValue.trim();
-                    if (!text) continue;
-                    
-                    // A. 发现路标：开启列表模式
-                    if (triggers.some(t => text.includes(t))) {
-                        activeTrigger = true;
-                        itemsCount = 0;
-                        continue; 
-                    }
+        config.css_selector = EDITOR_SELECTOR
 
-                    // B. 处于列表区域中，进行智能判断
-                    if (activeTrigger) {
-                        // 1. 找到承载文本的容器
-                        let container = node.parentElement;
-                        // 跳过行内元素，找到真正的“行”容器
-                        while (container && ['SPAN', 'STRONG', 'B', 'EM', 'I', 'A', 'CODE'].includes(container.tagName)) {
-                            container = container.parentElement;
-                        }
-                        if (!container || container === document.body) continue;
-
-                        // 2. [关键修改] 刹车机制：遇到标题或长段落，立即结束列表模式
-                        const isHeader = ['H1','H2','H3','H4'].includes(container.tagName);
-                        const isLongText = text.length > 80; // 阈值：超过80字通常是正文
-                        const isCode = container.closest('pre');
-
-                        if (isHeader || isLongText || isCode) {
-                            activeTrigger = false; // 关闭开关
-                            continue; // 这一行作为普通正文处理
-                        }
-
-                        // 3. 避免重复处理
-                        if (!container.getAttribute('data-fix-bullet')) {
-                            // 排除无意义的短语
-                            if (text.startsWith('你好') || text.includes('欢迎来到')) continue;
-
-                            // 4. [修改] 添加圆点
-                            if (!text.match(/^[-*]|\d+\./)) {
-                                const bullet = document.createElement('span');
-                                bullet.textContent = '- '; 
-                                bullet.style.fontWeight = 'bold';
-                                if (container.firstChild) {
-                                    container.insertBefore(bullet, container.firstChild);
-                                } else {
-                                    container.appendChild(bullet);
-                                }
-                            }
-                            
-                            // 5. [关键修改] 强制换行隔离！
-                            // 极客时间很多 div 是紧挨着的，Markdownify 容易把它们拼成一行
-                            // 我们给它加一个不可见的块级分隔，或者直接追加 br
-                            const br = document.createElement('br');
-                            container.appendChild(br);
-                            
-                            // 或者强制设为块级显示
-                            container.style.display = 'block';
-                            container.style.marginBottom = '10px'; // 视觉上分开，辅助转换器识别
-
-                            // 标记并计数
-                            container.setAttribute('data-fix-bullet', 'true');
-                            itemsCount++;
-                            
-                            // 安全阀：最多修 6 行
-                            if (itemsCount >= 6) activeTrigger = false;
-                        }
-                    }
-                }
-            })();
-            
-            // 3. 全局段落粘连修复 (针对正文)
-            // 如果所有正文都粘连，说明 div 之间没有空行。
-            // 我们可以给所有 slate-paragraph 强制加下边距或换行
-            document.querySelectorAll('div[data-slate-type="paragraph"]').forEach(p => {
-                p.appendChild(document.createElement('br'));
-                p.appendChild(document.createTextNode('\\n')); // 显式添加换行符文本
-            });
-        """
+        # 3. [关键] 修复代码块、加粗、列表与段落
+        # 默认在 transform_html 中用 Python 完成；旧路径需要注入 JS
+        if self.dom_transform == "js":
+            config.js_code = GEEKBANG_FIX_JS
 
         return config
 
-    @classmethod
-    def match(cls, url: str) -> bool:
+    def transform_html(self, html: str, url: str) -> str:
+        if self.dom_transform == "js":
+            return html
+        return transform_geekbang_html(html)
+
+    async def fetch_markdown(self, url: str, context) -> StructuredMarkdown | None:
+        match = _ARTICLE_ID_RE.search(urlparse(url).path)
+        if not self.api_fast_path or match is None:
+            return None
         try:
-            parsed = urlparse(url)
-            return "geekbang.org" in parsed.netloc
-        except Exception:
-            return False
+            with span("geekbang: article api") as s:
+                response = await context.request.post(
+                    GEEKBANG_ARTICLE_API,
+                    data={"id": match.group(1), "include_neighbors": False, "is_freelyread": True},
+                    headers={"Origin": "https://time.geekbang.org", "Referer": url},
+                    timeout=API_TIMEOUT_MS,
+                )
+                if not response.ok:
+                    raise RuntimeError(f"HTTP {response.status}")
+                payload = await response.json()
+                article = payload.get("data") or {}
+                content = article.get("article_content")
+                if payload.get("code", 0) != 0 or not content:
+                    raise RuntimeError(payload.get("error") or "接口未返回正文")
+                s.set(bytes=len(content))
+        except Exception as e:
+            print(f"⚠️  文章接口不可用 ({e})，改为捕获页面 DOM。")
+            return None
+
+        # 接口正文是完整的文章 HTML：不再按编辑器容器截取；
+        # 若仍是 Slate 结构则沿用 Python 侧的修复
+        if "data-slate-type" in content:
+            content = transform_geekbang_html(content)
+        run_cfg = copy.copy(self.get_run_config())
+        run_cfg.css_selector = None
+        run_cfg.js_code = None
+        with span("extract", engine="fast", bytes=len(content)) as s:
+            markdown = await get_engine("fast").convert(
+                url, self.inject_base_tag(content, url), run_cfg
+            )
+            s.set(out_bytes=len(markdown))
+        if not markdown.strip():
+            return None
+        print(f"⚡ 通过文章接口获取正文 [{self.__class__.__name__}]，跳过 DOM 捕获。")
+        result = StructuredMarkdown(markdown)
+        result.title = article.get("article_title", "")
+        return result
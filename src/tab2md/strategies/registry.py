@@ -0,0 +1,167 @@
+import importlib
+import inspect
+import pkgutil
+import re
+from importlib import metadata
+from urllib.parse import urlparse
+
+ENTRY_POINT_GROUP = "tab2md.strategies"
+FALLBACK_STRATEGY = "tab2md.strategies.basic:BasicStrategy"
+# 这些模块不包含站点策略，扫描策略包时跳过
+_INFRASTRUCTURE_MODULES = {"base", "basic", "registry"}
+
+
+def _import_object(spec: str):
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class _StrategyRef:
+    """对策略类的惰性引用：首次命中时才导入模块。"""
+
+    def __init__(self, name: str, loader):
+        self.name = name
+        self._loader = loader
+        self._cls = None
+
+    def load(self):
+        if self._cls is None:
+            self._cls = self._loader()
+        return self._cls
+
+
+class _TrieNode:
+    __slots__ = ("children", "refs")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.refs: list[_StrategyRef] = []
+
+
+class StrategyRegistry:
+    """
+    策略注册表。
+    - 域名层：按反转的域名标签建立前缀树 (org -> geekbang -> ...)，查找代价只与主机名长度相关
+    - 正则层：对无法用域名表达的策略按 URL 正则匹配
+    策略类在首次命中时才导入，实例按类缓存，供批量导出与常驻模式复用。
+    """
+
+    def __init__(self, fallback: str = FALLBACK_STRATEGY):
+        self._root = _TrieNode()
+        self._patterns: list[tuple[re.Pattern, _StrategyRef]] = []
+        self._instances: dict[type, object] = {}
+        self._fallback = _StrategyRef(fallback, lambda: _import_object(fallback))
+
+    # --- 注册 ---
+    def register(self, target, domains=(), url_patterns=()):
+        """
+        注册策略。target 可以是策略类，也可以是 "模块:类" 字符串 (惰性导入)。
+        传入策略类时，未显式给出的 domains/url_patterns 取自类属性。
+        """
+        if isinstance(target, str):
+            ref = _StrategyRef(target, lambda: _import_object(target))
+        else:
+            ref = _StrategyRef(target.__qualname__, lambda: target)
+            domains = domains or getattr(target, "domains", ())
+            url_patterns = url_patterns or getattr(target, "url_patterns", ())
+
+        for domain in domains:
+            node = self._root
+            for label in reversed(domain.lower().strip(".").split(".")):
+                node = node.children.setdefault(label, _TrieNode())
+            node.refs.append(ref)
+        for pattern in url_patterns:
+            self._patterns.append((re.compile(pattern), ref))
+
+    def discover(self, package: str = "tab2md.strategies"):
+        """从策略包 (内置清单 + 其余模块) 与已安装的 entry points 发现策略。"""
+        from . import BUILTIN_STRATEGIES
+
+        for domain, spec in BUILTIN_STRATEGIES.items():
+            self.register(spec, domains=[domain])
+        listed = {spec.partition(":")[0] for spec in BUILTIN_STRATEGIES.values()}
+
+        # 未登记在清单中的模块需要导入后才能读取其 domains/url_patterns
+        pkg = importlib.import_module(package)
+        for info in pkgutil.iter_modules(pkg.__path__):
+            module_name = f"{package}.{info.name}"
+            if info.name in _INFRASTRUCTURE_MODULES or module_name in listed:
+                continue
+            self._register_module(importlib.import_module(module_name))
+
+        for ep in metadata.entry_points(group=ENTRY_POINT_GROUP):
+            self._register_entry_point(ep)
+        return self
+
+    def _register_module(self, module):
+        from .base import BaseStrategy
+
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if (
+                issubclass(cls, BaseStrategy)
+                and cls.__module__ == module.__name__
+                and not inspect.isabstract(cls)
+                and (getattr(cls, "domains", ()) or getattr(cls, "url_patterns", ()))
+            ):
+                self.register(cls)
+
+    def _register_entry_point(self, ep):
+        """
+        entry point 名称约定：
+          "example.com"   - 按域名惰性注册
+          "re:<正则>"     - 按 URL 正则惰性注册
+          其它名称        - 立即加载，读取类属性 domains/url_patterns
+        """
+        if ep.name.startswith("re:"):
+            ref = _StrategyRef(ep.value, ep.load)
+            self._patterns.append((re.compile(ep.name[3:]), ref))
+        elif "." in ep.name:
+            self.register(ep.value, domains=[ep.name])
+        else:
+            self.register(ep.load())
+
+    # --- 查找 ---
+    def _candidates(self, url: str):
+        host = (urlparse(url).hostname or "").lower()
+        matched = []
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            matched.append(node.refs)
+        # 越具体 (越长) 的域名后缀优先
+        for refs in reversed(matched):
+            yield from refs
+        for pattern, ref in self._patterns:
+            if pattern.search(url):
+                yield ref
+
+    def _instance(self, cls):
+        instance = self._instances.get(cls)
+        if instance is None:
+            instance = self._instances[cls] = cls()
+        return instance
+
+    def lookup(self, url: str):
+        """返回适用于 url 的策略实例；没有专用策略时返回兜底策略。"""
+        for ref in self._candidates(url):
+            try:
+                cls = ref.load()
+            except Exception as e:
+                print(f"⚠️  加载策略 {ref.name} 失败: {e}")
+                continue
+            if cls.match(url):
+                return self._instance(cls)
+        return self._instance(self._fallback.load())
+
+
+_registry: StrategyRegistry | None = None
+
+
+def get_registry() -> StrategyRegistry:
+    """返回进程级策略注册表 (首次调用时执行发现)。"""
+    global _registry
+    if _registry is None:
+        _registry = StrategyRegistry().discover()
+    return _registry
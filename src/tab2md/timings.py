@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# 启动阶段耗时 (秒)，按记录顺序保存，供 --timings 输出
+STARTUP_TIMINGS: dict[str, float] = {}
+
+# --profile 开启后记录的阶段 (Chrome trace-event 格式的完整事件)
+TRACE_EVENTS: list[dict] = []
+PROFILING = False
+_EPOCH = time.perf_counter()
+_TRACKS: dict[int, int] = {}  # asyncio 任务 -> trace 中的 tid
+# 与关键路径并行完成、因而不再计入总耗时的工作 (秒)，供 --profile 输出
+OVERLAPPED: dict[str, float] = {}
+
+
+def record(name: str, seconds: float):
+    STARTUP_TIMINGS[name] = STARTUP_TIMINGS.get(name, 0.0) + seconds
+
+
+def record_overlap(name: str, seconds: float):
+    OVERLAPPED[name] = OVERLAPPED.get(name, 0.0) + seconds
+
+
+def enable_profiling():
+    global PROFILING
+    PROFILING = True
+
+
+class Span:
+    """一个计时阶段；可通过 set() 附加字节数等参数，写入 trace 的 args。"""
+
+    __slots__ = ("name", "args")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+def _track_id() -> int:
+    """并发的 asyncio 任务在 trace 中各占一行，便于看出重叠。"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is None:
+        return 0
+    return _TRACKS.setdefault(id(task), len(_TRACKS) + 1)
+
+
+@contextmanager
+def span(name: str, **args):
+    """
+    记录一个流水线阶段，未开启 --profile 时几乎没有开销。
+    策略也可以用它标注自己的子阶段:
+        with span("geekbang: code blocks") as s:
+            ...
+            s.set(bytes=len(html))
+    """
+    current = Span(name, args)
+    if not PROFILING:
+        yield current
+        return
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        TRACE_EVENTS.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (started - _EPOCH) * 1e6,
+                "dur": (time.perf_counter() - started) * 1e6,
+                "pid": os.getpid(),
+                "tid": _track_id(),
+                "args": current.args,
+            }
+        )
+
+
+@contextmanager
+def timed(name: str):
+    """记录代码块耗时到 STARTUP_TIMINGS (开启 --profile 时同时记录为 span)。"""
+    started = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def print_timings():
+    if not STARTUP_TIMINGS:
+        return
+    print("\n⏱️  启动耗时:")
+    for name, seconds in STARTUP_TIMINGS.items():
+        print(f"   {name:<16} {seconds * 1000:>8.1f} ms")
+
+
+def print_profile():
+    """按阶段汇总 span：次数、总耗时与处理的字节数。"""
+    if not TRACE_EVENTS:
+        return
+    stages: dict[str, list] = {}
+    for event in TRACE_EVENTS:
+        stage = stages.setdefault(event["name"], [0, 0.0, 0])
+        stage[0] += 1
+        stage[1] += event["dur"] / 1000
+        stage[2] += event["args"].get("bytes", 0)
+    print("\n🧭 阶段耗时:")
+    for name, (count, total_ms, size) in stages.items():
+        size_text = f"{size / 1024:>10.1f} KB" if size else ""
+        print(f"   {name:<24} x{count:<4} {total_ms:>9.1f} ms{size_text}")
+    if OVERLAPPED:
+        print("\n⚡ 关键路径节省 (与捕获并行完成的预热):")
+        for name, seconds in OVERLAPPED.items():
+            print(f"   {name:<24} {seconds * 1000:>15.1f} ms")
+
+
+def write_trace(path):
+    """写出 Chrome trace-event JSON，可在 chrome://tracing 或 Perfetto 中打开。"""
+    path = Path(path)
+    path.write_text(
+        json.dumps({"traceEvents": TRACE_EVENTS, "displayTimeUnit": "ms"}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    print(f"🧭 trace 已写入: {path}")
+
+
+def peak_memory_bytes() -> int | None:
+    """进程的峰值常驻内存 (RSS)；平台不支持时返回 None。"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return peak if sys.platform == "darwin" else peak * 1024
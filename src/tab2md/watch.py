@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+from .browser_ops import (
+    CDP_ENDPOINTS,
+    async_playwright,
+    capture_page_html,
+    connect_browser,
+    is_capturable_page,
+)
+
+DEFAULT_DEBOUNCE = 1.5
+LOAD_TIMEOUT_MS = 15000
+
+
+class TabWatcher:
+    """
+    监听模式：保持一个 CDP 连接，订阅标签页导航事件，
+    页面加载完成并稳定 debounce 秒后自动抓取并在后台转换。
+
+    convert: async (url, html) -> Path，负责转换与保存
+    should_export: url -> bool，是否需要导出该页面 (例如仅限有专用策略的站点)
+    scope_for_url: url -> CSS 选择器 (或 None)，捕获范围
+    """
+
+    def __init__(
+        self,
+        convert,
+        should_export,
+        scope_for_url=None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        concurrency: int = 2,
+    ):
+        self.convert = convert
+        self.should_export = should_export
+        self.scope_for_url = scope_for_url
+        self.debounce = debounce
+        self._browser = None
+        self._pending: dict = {}  # page -> 防抖定时任务
+        self._last_exported: dict = {}  # page -> 已导出的 URL
+        self._background: set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    # --- 事件入口 ---
+    def _watch_page(self, page):
+        page.on("load", lambda: self.schedule(page))
+        page.on("close", lambda: self._forget(page))
+
+    def _forget(self, page):
+        task = self._pending.pop(page, None)
+        if task:
+            task.cancel()
+        self._last_exported.pop(page, None)
+
+    def _on_target_changed(self, params):
+        """Target.targetInfoChanged：覆盖 SPA 内的 pushState 导航 (不会触发 load 事件)。"""
+        info = params.get("targetInfo", {})
+        if info.get("type") != "page":
+            return
+        for page in self._pages():
+            if page.url == info.get("url"):
+                self.schedule(page)
+
+    def _pages(self):
+        if self._browser is None:
+            return []
+        return [page for context in self._browser.contexts for page in context.pages]
+
+    def schedule(self, page):
+        """(重新) 启动该页面的防抖定时器。"""
+        if not is_capturable_page(page) or not self.should_export(page.url):
+            return
+        if self._last_exported.get(page) == page.url:
+            return
+        task = self._pending.pop(page, None)
+        if task:
+            task.cancel()
+        self._pending[page] = asyncio.create_task(self._settle_and_export(page))
+
+    # --- 抓取与转换 ---
+    async def _settle_and_export(self, page):
+        try:
+            await asyncio.sleep(self.debounce)
+            await page.wait_for_load_state("load", timeout=LOAD_TIMEOUT_MS)
+        except asyncio.CancelledError:
+            return
+        except Exception:
+            return
+        finally:
+            if self._pending.get(page) is asyncio.current_task():
+                self._pending.pop(page, None)
+
+        url = page.url
+        if self._last_exported.get(page) == url or not self.should_export(url):
+            return
+        try:
+            selector = self.scope_for_url(url) if self.scope_for_url else None
+            html = await capture_page_html(page, selector)
+        except Exception as e:
+            print(f"⚠️  抓取失败: {url} ({e})")
+            return
+
+        self._last_exported[page] = url
+        task = asyncio.create_task(self._convert(url, html))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _convert(self, url, html):
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                md_file = await self.convert(url, html)
+            except Exception as e:
+                print(f"❌ 导出失败: {url}\n   错误: {e}")
+                return
+            elapsed = time.perf_counter() - started
+            print(f"✅ 已导出 ({elapsed:.2f}s): {url}\n   📂 {md_file}")
+
+    # --- 主循环 ---
+    async def run(self):
+        async with async_playwright() as p:
+            self._browser = await connect_browser(p)
+            if self._browser is None:
+                return
+
+            for context in self._browser.contexts:
+                context.on("page", self._watch_page)
+                for page in context.pages:
+                    self._watch_page(page)
+
+            session = await self._browser.new_browser_cdp_session()
+            session.on("Target.targetInfoChanged", self._on_target_changed)
+            await session.send("Target.setDiscoverTargets", {"discover": True})
+
+            print(f"👀 正在监听 {CDP_ENDPOINTS[0]} 的标签页导航 (Ctrl+C 退出)...")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                for task in list(self._pending.values()):
+                    task.cancel()
+                if self._background:
+                    await asyncio.gather(*self._background, return_exceptions=True)
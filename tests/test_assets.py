@@ -0,0 +1,65 @@
+import asyncio
+from pathlib import Path
+
+from tab2md import deadlines
+from tab2md.assets import AssetDownloader, collect_image_urls
+from tab2md.deadlines import StageTimeout, with_deadline
+
+IMAGE = "https://example.com/a.png"
+
+
+def test_collect_image_urls_dedupes_remote_images():
+    markdown = f"![a]({IMAGE}) ![b](<{IMAGE}>) ![c](local.png) ![d](https://example.com/b.png)"
+    assert collect_image_urls(markdown) == [IMAGE, "https://example.com/b.png"]
+
+
+def test_timed_out_page_does_not_cancel_shared_download(tmp_path, monkeypatch):
+    monkeypatch.setitem(deadlines.DEADLINES, "assets", 0.05)
+    downloader = AssetDownloader(asset_dir=tmp_path)
+    release = asyncio.Event()
+    calls = []
+
+    async def download(url, source):
+        calls.append(url)
+        await release.wait()
+        return tmp_path / "a.png"
+
+    monkeypatch.setattr(downloader, "_download", download)
+
+    async def scenario():
+        markdown = f"![x]({IMAGE})"
+        try:
+            await with_deadline("assets", downloader.localize(markdown, Path(tmp_path)))
+        except StageTimeout:
+            pass
+        else:
+            raise AssertionError("第一个页面应当超时")
+        # 第二个页面复用同一个 (未被取消的) 下载任务
+        release.set()
+        return await downloader.localize(markdown, Path(tmp_path))
+
+    assert asyncio.run(scenario()) == "![x](a.png)"
+    assert calls == [IMAGE]
+
+
+def test_cancelled_download_is_restarted(tmp_path, monkeypatch):
+    downloader = AssetDownloader(asset_dir=tmp_path)
+    calls = []
+
+    async def download(url, source):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return tmp_path / "a.png"
+
+    monkeypatch.setattr(downloader, "_download", download)
+
+    async def scenario():
+        task = downloader.fetch(IMAGE)
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.sleep(0)
+        return await downloader.fetch(IMAGE)
+
+    assert asyncio.run(scenario()) == tmp_path / "a.png"
+    assert calls == [IMAGE, IMAGE]
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+from tab2md.engines import fast
+from tab2md.strategies.base import BaseStrategy
+
+URL = "https://example.com/docs/page"
+
+
+class DocsStrategy(BaseStrategy):
+    def get_run_config(self):
+        return SimpleNamespace(
+            js_code=None,
+            excluded_tags=["nav", "script", "style", "svg", "noscript"],
+            word_count_threshold=2,
+            css_selector=None,
+        )
+
+
+def docs_page(sections: int) -> str:
+    parts = ["<!DOCTYPE html><html><head><script>var s = '</p>';</script></head><body>"]
+    parts.append("<nav><a href='/'>home</a></nav>")
+    for i in range(sections):
+        parts.append(f"<h2>Section {i}</h2><p>Body text of section {i} <a href='ref/{i}'>ref</a></p>")
+        parts.append(f"<svg><g><text>icon {i}</text></g></svg><noscript><p>enable js {i}</p></noscript>")
+        parts.append(f"<pre><code>x = {i} * 2\n</code></pre><ul><li>item {i}</li></ul>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def test_streaming_matches_in_memory_conversion(tmp_path):
+    strategy = DocsStrategy()
+    html = docs_page(200)
+    snapshot, output = tmp_path / "snapshot.html", tmp_path / "out.md"
+    snapshot.write_text(html, encoding="utf-8")
+
+    in_memory = asyncio.run(strategy.execute(URL, html))
+    written = asyncio.run(strategy.execute_streaming(URL, snapshot, output, chunk_chars=997))
+    streamed = output.read_text(encoding="utf-8")
+
+    assert streamed == in_memory
+    assert written == len(streamed)
+    assert "icon" not in streamed and "enable js" not in streamed
+    assert "[ref](https://example.com/docs/ref/0)" in streamed
+
+
+def test_streaming_prunes_before_parsing(tmp_path, monkeypatch):
+    seen = []
+    strategy = DocsStrategy()
+    snapshot, output = tmp_path / "snapshot.html", tmp_path / "out.md"
+    snapshot.write_text(docs_page(20), encoding="utf-8")
+
+    original = fast.FastEngine.convert_stream
+
+    def spy(self, url, chunks, out, run_cfg):
+        chunks = list(chunks)
+        seen.append("".join(chunks))
+        return original(self, url, chunks, out, run_cfg)
+
+    monkeypatch.setattr(fast.FastEngine, "convert_stream", spy)
+    asyncio.run(strategy.execute_streaming(URL, snapshot, output, chunk_chars=256))
+    assert "<svg" not in seen[0] and "<script" not in seen[0]
+    assert '<base href="https://example.com/docs/page">' in seen[0]
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from tab2md.engines import EngineUnsupportedError
+from tab2md.engines.browser_engine import BrowserEngine, _create_hidden_target, sanitize_snapshot
+
+
+def test_scripts_and_embedded_documents_are_removed():
+    html = (
+        "<p>a</p><script>evil()</script><iframe srcdoc='<script>x</script>'></iframe>"
+        "<object data='x.swf'></object><embed src='x.swf'><p>b</p>"
+    )
+    assert sanitize_snapshot(html) == "<p>a</p><p>b</p>"
+
+
+def test_event_handlers_and_script_urls_are_removed():
+    html = (
+        '<body onload="evil()"><img src="a.png" onerror=\'evil()\' alt="a>b">'
+        '<a href=" jav&#x61;script:evil()">x</a><a href="/ok" ONCLICK=evil()>ok</a>'
+        '<p class="on">online</p></body>'
+    )
+    assert sanitize_snapshot(html) == (
+        '<body><img src="a.png" alt="a>b"><a>x</a><a href="/ok">ok</a>'
+        '<p class="on">online</p></body>'
+    )
+
+
+def test_meta_refresh_is_removed():
+    html = '<head><meta http-equiv="refresh" content="0;url=/logout"><meta charset="utf-8"></head>'
+    assert sanitize_snapshot(html) == '<head><meta charset="utf-8"></head>'
+
+
+class _Session:
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.calls = []
+
+    async def send(self, method, params=None):
+        self.calls.append((method, params))
+        if self.fail:
+            raise RuntimeError("Invalid parameters: hidden")
+        return {"targetId": "T1"}
+
+
+def test_hidden_target_is_required():
+    session = _Session(fail=False)
+    assert asyncio.run(_create_hidden_target(session, "C1")) == "T1"
+    assert session.calls[0][1]["hidden"] is True
+
+    session = _Session(fail=True)
+    with pytest.raises(EngineUnsupportedError):
+        asyncio.run(_create_hidden_target(session, "C1"))
+    assert len(session.calls) == 1  # 不会退回到可能可见的普通目标
+
+
+class _CleanupSession:
+    """创建上下文与目标成功，之后的每个调用都失败。"""
+
+    def __init__(self):
+        self.calls = []
+        self.detached = False
+
+    def on(self, event, handler):
+        pass
+
+    async def send(self, method, params=None):
+        self.calls.append(method)
+        if method == "Target.createBrowserContext":
+            return {"browserContextId": "C1"}
+        if method == "Target.createTarget":
+            return {"targetId": "T1"}
+        raise RuntimeError(f"{method} failed")
+
+    async def detach(self):
+        self.detached = True
+        raise RuntimeError("detach failed")
+
+
+class _Browser:
+    def __init__(self, session):
+        self.session = session
+
+    async def new_browser_cdp_session(self):
+        return self.session
+
+
+def test_each_cleanup_step_runs_even_if_an_earlier_one_fails():
+    session = _CleanupSession()
+    with pytest.raises(RuntimeError, match="attachToTarget"):
+        asyncio.run(BrowserEngine()._render(_Browser(session), "<p>x</p>", None))
+    assert session.calls[-2:] == ["Target.closeTarget", "Target.disposeBrowserContext"]
+    assert session.detached
@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+from tab2md.browser_ops import connect_browser, resolve_active_page
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_cdp_session(self, page):
+        raise AssertionError("定位标签页不应为每个页面打开 CDP 会话")
+
+
+class FakePage:
+    def __init__(self, context, title, url, visible=False, focused=False):
+        self.context = context
+        self.url = url
+        self.state = ["visible" if visible else "hidden", focused, title]
+        self.evaluations = 0
+        context.pages.append(self)
+
+    async def evaluate(self, script):
+        self.evaluations += 1
+        return self.state
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = [FakeContext()]
+
+    async def new_browser_cdp_session(self):
+        raise AssertionError("定位标签页不应调用 Target.getTargets")
+
+
+URL = "https://example.com/same"
+
+
+def test_duplicate_urls_keep_their_own_titles():
+    browser = FakeBrowser()
+    context = browser.contexts[0]
+    FakePage(context, "第一个标签页", URL)
+    active = FakePage(context, "第二个标签页", URL, visible=True, focused=True)
+    # 把 A 放到最后，确保不是靠顺序"碰巧"命中
+    context.pages.reverse()
+
+    page, title = asyncio.run(resolve_active_page(browser, use_os_titles=False))
+    assert page is active
+    assert title == "第二个标签页"
+
+
+def test_pages_on_different_endpoints_do_not_collide():
+    first, second = FakeBrowser(), FakeBrowser()
+    hidden = FakePage(first.contexts[0], "端点一", URL)
+    active = FakePage(second.contexts[0], "端点二", URL, visible=True)
+
+    page, title = asyncio.run(resolve_active_page([first, second], use_os_titles=False))
+    assert page is active
+    assert title == "端点二"
+    # 每个页面只求值一次 (状态与标题一起取回)
+    assert hidden.evaluations == active.evaluations == 1
+
+
+def test_falls_back_to_newest_page_when_none_visible():
+    browser = FakeBrowser()
+    FakePage(browser.contexts[0], "旧", URL)
+    newest = FakePage(browser.contexts[0], "新", URL + "?2")
+
+    assert asyncio.run(resolve_active_page(browser, use_os_titles=False)) == (newest, "新")
+
+
+class HangingChromium:
+    def __init__(self):
+        self.calls = []
+
+    async def connect_over_cdp(self, endpoint, timeout=0):
+        self.calls.append((endpoint, timeout))
+        await asyncio.sleep(10)
+
+
+def test_connect_browser_times_out_and_names_the_endpoint(capsys):
+    playwright = SimpleNamespace(chromium=HangingChromium())
+    endpoint = "http://127.0.0.1:9333"
+
+    browser = asyncio.run(connect_browser(playwright, endpoint, timeout=0.05))
+    assert browser is None
+    assert playwright.chromium.calls == [(endpoint, 50.0)]
+    out = capsys.readouterr().out
+    assert f"无法连接到浏览器 {endpoint}" in out
+    assert "--remote-debugging-port=9333" in out
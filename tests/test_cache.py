@@ -0,0 +1,44 @@
+import itertools
+from types import SimpleNamespace
+
+from tab2md import cache
+from tab2md.cache import ConversionCache, fingerprint_config, make_cache_key
+
+
+def test_whitespace_inside_pre_changes_the_key():
+    a = make_cache_key("<pre>a\n  b</pre>", "S", "{}")
+    b = make_cache_key("<pre>a\n b</pre>", "S", "{}")
+    assert a != b
+
+
+def test_key_depends_on_strategy_config_and_version(monkeypatch):
+    key = make_cache_key("<p>x</p>", "S", "{}")
+    assert key == make_cache_key("<p>x</p>", "S", "{}")
+    assert key != make_cache_key("<p>x</p>", "T", "{}")
+    assert key != make_cache_key("<p>x</p>", "S", '{"a": 1}')
+    monkeypatch.setattr(cache, "__version__", "999")
+    assert key != make_cache_key("<p>x</p>", "S", "{}")
+
+
+def test_fingerprint_skips_private_fields_and_names_objects():
+    run_cfg = SimpleNamespace(js_code="x()", _private=1, strategy=object())
+    fingerprint = fingerprint_config(run_cfg, engine="fast")
+    assert '"js_code": "x()"' in fingerprint
+    assert "_private" not in fingerprint
+    assert '"strategy": "object"' in fingerprint
+    assert '"engine": "fast"' in fingerprint
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(cache.time, "time", lambda: next(clock))
+    store = ConversionCache(tmp_path, max_bytes=10)
+    store.put("a", "aaaa")
+    store.put("b", "bbbb")
+    assert store.get("a") == "aaaa"  # a 成为最近使用
+    store.put("c", "cccc")
+    assert store.get("b") is None
+    assert store.get("a") == "aaaa"
+    assert store.get("c") == "cccc"
+    assert store.stats()["evictions"] == 1
+    store.close()
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from tab2md import deadlines
+from tab2md.deadlines import StageTimeout, hedged, parse_deadline, with_deadline
+
+
+@pytest.fixture(autouse=True)
+def summary(monkeypatch):
+    run_summary = deadlines.RunSummary()
+    monkeypatch.setattr(deadlines, "RUN_SUMMARY", run_summary)
+    monkeypatch.setitem(deadlines.DEADLINES, "extract", 0.05)
+    return run_summary
+
+
+async def _after(seconds, value):
+    await asyncio.sleep(seconds)
+    return value
+
+
+def test_primary_within_deadline_is_not_hedged(summary):
+    hedge_calls = []
+
+    async def hedge():
+        hedge_calls.append(1)
+        return "hedge"
+
+    result = asyncio.run(hedged("extract", _after(0, "primary"), lambda: hedge()))
+    assert result == ("primary", False)
+    assert hedge_calls == []
+    assert summary.events == []
+
+
+def test_hedge_wins_and_primary_is_cancelled(summary):
+    async def scenario():
+        primary = asyncio.ensure_future(_after(10, "primary"))
+        result = await hedged("extract", primary, lambda: _after(0, "hedge"), "u", "fast")
+        await asyncio.sleep(0)
+        return result, primary.cancelled()
+
+    assert asyncio.run(scenario()) == (("hedge", True), True)
+    assert summary.events == [("extract", "u", "fast 超时，对冲转换先完成")]
+
+
+def test_empty_hedge_result_waits_for_primary():
+    result = asyncio.run(hedged("extract", _after(0.08, "primary"), lambda: _after(0, "  ")))
+    assert result == ("primary", False)
+
+
+def test_both_empty_returns_primary_result(summary):
+    result = asyncio.run(hedged("extract", _after(0.08, ""), lambda: _after(0, "")))
+    assert result == ("", False)
+    assert summary.events[-1][2].endswith("对冲转换也未得到结果")
+
+
+def test_without_hedge_raises_stage_timeout(summary):
+    with pytest.raises(StageTimeout) as excinfo:
+        asyncio.run(hedged("extract", _after(10, "primary"), url="u", label="fast"))
+    assert excinfo.value.stage == "extract"
+    assert excinfo.value.seconds == 0.05
+    assert summary.events[0][:2] == ("extract", "u")
+
+
+def test_both_too_slow_raises_with_doubled_deadline():
+    with pytest.raises(StageTimeout) as excinfo:
+        asyncio.run(hedged("extract", _after(10, "primary"), lambda: _after(10, "hedge")))
+    assert excinfo.value.seconds == pytest.approx(0.1)
+
+
+def test_zero_deadline_means_no_limit(monkeypatch):
+    monkeypatch.setitem(deadlines.DEADLINES, "extract", 0)
+    assert asyncio.run(hedged("extract", _after(0.08, "primary"), None)) == ("primary", False)
+    assert asyncio.run(with_deadline("extract", _after(0.08, "x"))) == "x"
+
+
+def test_with_deadline_records_and_raises(summary):
+    with pytest.raises(StageTimeout):
+        asyncio.run(with_deadline("extract", _after(10, "x"), url="u"))
+    assert summary.events == [("extract", "u", "超过时限 0.05 秒")]
+
+
+def test_parse_deadline():
+    assert parse_deadline("fetch=2.5") == ("fetch", 2.5)
+    with pytest.raises(ValueError):
+        parse_deadline("write=1")
+    with pytest.raises(ValueError):
+        parse_deadline("fetch")
@@ -0,0 +1,74 @@
+from tab2md.dom import Element, Text, parse_html, serialize
+
+
+def test_roundtrip_keeps_doctype_void_tags_and_raw_text():
+    html = (
+        '<!DOCTYPE html><html><head><script>if (a < b) x();</script></head>'
+        '<body><p class="x">a &amp; b<br></p><img src="i.png" alt=""></body></html>'
+    )
+    root = parse_html(html)
+    assert root.attrs["doctype"] == "<!DOCTYPE html>"
+    assert serialize(root) == (
+        '<!DOCTYPE html><html><head><script>if (a < b) x();</script></head>'
+        '<body><p class="x">a &amp; b<br></p><img src="i.png" alt></body></html>'
+    )
+
+
+def test_unmatched_end_tag_is_ignored_and_stray_tags_close_nested():
+    root = parse_html("<div><p>a</span>b</div>c")
+    div = next(root.iter_elements("div"))
+    assert serialize(div) == "<div><p>ab</p></div>"
+    assert isinstance(root.children[-1], Text) and root.children[-1].data == "c"
+
+
+def test_iter_elements_matches_tag_and_dashed_attrs():
+    root = parse_html('<div data-slate-node="element"><span data-slate-node="text">x</span></div>')
+    assert [e.tag for e in root.iter_elements(data_slate_node="text")] == ["span"]
+    assert [e.tag for e in root.iter_elements("div", data_slate_node="element")] == ["div"]
+    assert list(root.iter_elements("p")) == []
+
+
+def test_text_content_and_find_body():
+    root = parse_html("<html><body><p>a<b>b</b></p>c</body></html>")
+    body = root.find_body()
+    assert body.tag == "body"
+    assert body.text_content() == "abc"
+    fragment = parse_html("<p>x</p>")
+    assert fragment.find_body() is fragment
+
+
+def test_closest_walks_up_to_matching_ancestor():
+    root = parse_html("<pre><code><span>x</span></code></pre>")
+    span = next(root.iter_elements("span"))
+    assert span.closest({"pre"}).tag == "pre"
+    assert span.closest({"span"}) is span
+    assert span.closest({"table"}) is None
+
+
+def test_replace_with_and_take_children_move_nodes():
+    root = parse_html("<div><span>a<i>b</i></span></div>")
+    span = next(root.iter_elements("span"))
+    strong = Element("strong")
+    strong.take_children(span)
+    assert span.children == []
+    assert all(child.parent is strong for child in strong.children)
+    span.replace_with(strong)
+    assert span.parent is None
+    assert serialize(root) == "<div><strong>a<i>b</i></strong></div>"
+
+
+def test_append_and_insert_detach_from_previous_parent():
+    a, b = Element("a"), Element("b")
+    text = a.append(Text("x"))
+    b.insert(0, text)
+    assert a.children == [] and b.children == [text] and text.parent is b
+    text.remove()
+    assert b.children == [] and text.parent is None
+
+
+def test_serialize_escapes_text_and_attributes():
+    element = Element("a", {"href": 'x?a=1&b="2"', "download": ""})
+    element.append(Text("<tag> & more"))
+    assert serialize(element) == (
+        '<a href="x?a=1&amp;b=&quot;2&quot;" download>&lt;tag&gt; &amp; more</a>'
+    )
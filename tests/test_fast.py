@@ -0,0 +1,89 @@
+import io
+
+from tab2md.engines.fast import MARKDOWN_ATTR, html_to_markdown, stream_markdown
+
+
+def test_headings_and_inline_wrappers():
+    html = "<h1>Title</h1><h3>Sub <em>part</em></h3><p>a <strong>b</strong> <del>c</del></p>"
+    assert html_to_markdown(html) == "# Title\n\n### Sub *part*\n\na **b** ~~c~~\n"
+
+
+def test_nested_lists():
+    html = "<ul><li>one</li><li>two<ol><li>first</li><li>second</li></ol></li></ul><p>after</p>"
+    assert html_to_markdown(html) == (
+        "- one\n- two\n  1. first\n  2. second\n\nafter\n"
+    )
+
+
+def test_links_and_images_resolve_against_base():
+    html = (
+        '<head><base href="/docs/"></head>'
+        '<p><a href="page.html">Page</a> <a href="#top">top</a> <img src="i.png" alt="pic"></p>'
+    )
+    assert html_to_markdown(html, base_url="https://example.com/a/b") == (
+        "[Page](https://example.com/docs/page.html) top ![pic](https://example.com/docs/i.png)\n"
+    )
+
+
+def test_code_spans_and_blocks_are_not_escaped():
+    html = (
+        "<p>call <code>a_b(*x)</code> or <code>`tick`</code></p>"
+        '<pre><code class="language-python">def f(*a, **k):\n    return a_b\n</code></pre>'
+    )
+    assert html_to_markdown(html) == (
+        "call `a_b(*x)` or `` `tick` ``\n\n"
+        "```python\ndef f(*a, **k):\n    return a_b\n```\n"
+    )
+
+
+def test_table_with_header_row_and_escaped_pipes():
+    html = "<table><tr><th>k</th><th>v</th></tr><tr><td>a|b</td><td>1<br>2</td></tr></table>"
+    assert html_to_markdown(html) == "| k | v |\n| --- | --- |\n| a\\|b | 1 2 |\n"
+
+
+def test_blockquote_paragraphs_stay_in_one_quote():
+    html = (
+        "<p>before</p><blockquote><p>one</p><p>two</p>"
+        "<blockquote><p>deep</p></blockquote></blockquote><p>after</p>"
+    )
+    assert html_to_markdown(html) == (
+        "before\n\n> one\n>\n> two\n>\n> > deep\n\nafter\n"
+    )
+
+
+def test_markdown_syntax_in_text_is_escaped():
+    html = (
+        "<p>2 * 3 * 4 and snake_case and `tick` and [x](y) ~~no~~</p>"
+        "<p>&lt;b&gt;not bold&lt;/b&gt; &amp;amp; 1 &lt; 2</p>"
+        "<p># not a heading</p><p>- not a list</p><p>1. not ordered</p><p>&gt; not a quote</p>"
+    )
+    assert html_to_markdown(html) == (
+        "2 \\* 3 \\* 4 and snake\\_case and \\`tick\\` and \\[x\\](y) \\~\\~no\\~\\~\n\n"
+        "\\<b>not bold\\</b> \\&amp; 1 < 2\n\n"
+        "\\# not a heading\n\n\\- not a list\n\n1\\. not ordered\n\n\\> not a quote\n"
+    )
+
+
+def test_marked_markdown_is_emitted_verbatim():
+    html = f"<p><span {MARKDOWN_ATTR}>- </span>item_one</p>"
+    assert html_to_markdown(html) == "- item\\_one\n"
+
+
+def test_excluded_tags_word_threshold_and_selector():
+    html = (
+        "<nav><p>menu words here</p></nav><div id='main'><p>Hi</p><p>long enough text here</p></div>"
+        "<p>outside the selector</p>"
+    )
+    markdown = html_to_markdown(
+        html, excluded_tags=("nav",), word_count_threshold=3, css_selector="div#main"
+    )
+    assert markdown == "long enough text here\n"
+
+
+def test_streaming_matches_in_memory_conversion():
+    html = "<h2>T</h2>" + "".join(f"<p>para {i} with *stars*</p>" for i in range(50))
+    out = io.StringIO()
+    chunks = [html[i:i + 37] for i in range(0, len(html), 37)]
+    written = stream_markdown(chunks, out)
+    assert out.getvalue() == html_to_markdown(html)
+    assert written == len(out.getvalue())
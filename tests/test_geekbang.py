@@ -0,0 +1,146 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from tab2md.dom import parse_html, serialize
+from tab2md.engines.fast import html_to_markdown
+from tab2md.strategies.geekbang import (
+    EDITOR_SELECTOR,
+    GEEKBANG_FIX_JS,
+    build_bold_class_map,
+    mark_bold_spans,
+    rebuild_code_blocks,
+    repair_bullets,
+    transform_geekbang_html,
+)
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+FIXTURE_URL = "https://time.geekbang.org/column/article/000000"
+
+
+def editor(body: str, head: str = "") -> str:
+    return (
+        f"<html><head>{head}</head><body>"
+        f'<div data-slate-editor="true">{body}</div></body></html>'
+    )
+
+
+def bolded(html: str) -> str:
+    root = parse_html(html)
+    mark_bold_spans(root, build_bold_class_map(root))
+    return serialize(root)
+
+
+def test_inline_and_class_weights():
+    html = editor(
+        '<p><span class="b">x</span><span style="font-weight: 600">y</span>'
+        '<span class="n">z</span></p>',
+        head="<style>.b { font-weight: 700 } span.n { font-weight: normal }</style>",
+    )
+    out = bolded(html)
+    assert "<strong>x</strong>" in out
+    assert "<strong>y</strong>" in out
+    assert '<span class="n">z</span>' in out
+
+
+def test_span_inside_bold_parent_is_wrapped():
+    html = editor(
+        '<div class="lead"><span>x</span></div><h2><span>t</span></h2>',
+        head="<style>.lead { font-weight: bold }</style>",
+    )
+    out = bolded(html)
+    assert '<div class="lead"><strong>x</strong></div>' in out
+    assert "<h2><strong>t</strong></h2>" in out
+
+
+def test_normal_weight_overrides_inherited_bold():
+    html = editor(
+        '<div class="lead"><span class="n">x</span></div>',
+        head="<style>.lead { font-weight: bold } .n { font-weight: 400 }</style>",
+    )
+    assert "<strong>" not in bolded(html)
+
+
+def test_spans_inside_emitted_strong_are_not_wrapped_again():
+    html = editor('<p><span style="font-weight: bold"><span>x</span></span></p>')
+    assert "<strong><span>x</span></strong>" in bolded(html)
+
+
+def test_weights_inlined_at_capture_time_are_used():
+    # browser_ops 的捕获脚本把外链样式表中的规则以 <style data-tab2md-weights> 附在 <head> 中
+    root = parse_html(
+        editor("", head="<style data-tab2md-weights>.a,span.c{font-weight:700}\n.d{font-weight:normal}</style>")
+    )
+    assert build_bold_class_map(root) == {"a": True, "c": True, "d": False}
+
+
+def test_code_blocks_are_rebuilt_line_by_line():
+    html = editor(
+        '<div data-slate-type="pre" data-code-language="py">'
+        '<div data-slate-type="code-line"><span>if x:</span></div>'
+        '<div data-slate-type="code-line"><span>    y()</span></div></div>'
+    )
+    root = parse_html(html)
+    rebuild_code_blocks(root)
+    assert '<pre><code class="language-py">if x:\n    y()</code></pre>' in serialize(root)
+
+
+def test_bullets_follow_trigger_and_stop_at_heading():
+    html = editor(
+        "<div><span>你将能够：</span></div>"
+        "<div><span>第一项</span></div>"
+        "<div><span>1. 已有编号</span></div>"
+        "<h3><span>标题</span></h3>"
+        "<div><span>正文</span></div>"
+    )
+    root = parse_html(html)
+    repair_bullets(root)
+    out = serialize(root)
+    assert (
+        '<span style="font-weight: bold" data-tab2md-markdown>- </span><span>第一项</span><br>' in out
+    )
+    assert "<span>1. 已有编号</span><br>" in out
+    assert "<div><span>正文</span></div>" in out
+
+
+def test_fixture_matches_golden_markdown():
+    html = (FIXTURES / "geekbang_article.html").read_text(encoding="utf-8")
+    golden = (FIXTURES / "geekbang_article.golden.md").read_text(encoding="utf-8")
+    markdown = html_to_markdown(
+        transform_geekbang_html(html),
+        base_url=FIXTURE_URL,
+        excluded_tags=("script", "style"),
+        word_count_threshold=1,
+        css_selector=EDITOR_SELECTOR,
+    )
+    assert markdown == golden
+
+
+def test_python_transform_matches_fix_js():
+    async_api = pytest.importorskip("playwright.async_api")
+    html = (FIXTURES / "geekbang_article.html").read_text(encoding="utf-8")
+
+    async def run_fix_js():
+        async with async_api.async_playwright() as p:
+            try:
+                browser = await p.chromium.launch()
+            except Exception as e:
+                pytest.skip(f"Chromium 不可用: {e}")
+            try:
+                page = await browser.new_page()
+                await page.set_content(html)
+                await page.add_script_tag(content=GEEKBANG_FIX_JS)
+                return await page.content()
+            finally:
+                await browser.close()
+
+    def to_markdown(document: str) -> str:
+        return html_to_markdown(
+            document,
+            excluded_tags=("script", "style"),
+            word_count_threshold=1,
+            css_selector=EDITOR_SELECTOR,
+        )
+
+    assert to_markdown(transform_geekbang_html(html)) == to_markdown(asyncio.run(run_fix_js()))
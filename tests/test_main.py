@@ -0,0 +1,54 @@
+import asyncio
+import re
+
+import pytest
+
+from tab2md import main
+from tab2md.deadlines import StageTimeout
+from tab2md.main import parse_args
+
+
+def test_match_is_compiled_at_parse_time():
+    args = parse_args(["--match", r"example\.com/docs"])
+    assert isinstance(args.match, re.Pattern)
+    assert args.match.search("https://example.com/docs/a")
+
+
+def test_invalid_match_regex_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        parse_args(["--all", "--match", "["])
+    assert excinfo.value.code == 2
+    assert "--match" in capsys.readouterr().err
+
+
+def test_failed_captures_are_counted_in_batch_summary(monkeypatch, capsys):
+    timeout = StageTimeout("capture", 30, "https://b.example/")
+
+    async def fake_snapshots(url_pattern, scope_for_url, prefetch):
+        return [
+            ("https://a.example/", "A", "<p>a</p>", "cdp"),
+            ("https://b.example/", "", timeout, "cdp"),
+        ]
+
+    async def fake_export(url, raw_html, *args):
+        return f"exports/{url[8]}.md"
+
+    monkeypatch.setattr(main, "get_all_tab_snapshots", fake_snapshots)
+    monkeypatch.setattr(main, "export_snapshot", fake_export)
+    failed = asyncio.run(main.process_batch_conversion())
+    out = capsys.readouterr().out
+    assert failed == 1
+    assert "抓取失败: 阶段 [capture]" in out
+    assert "成功 1 / 失败 1" in out
+
+
+def test_search_show_does_not_need_a_query():
+    args = parse_args(["search", "--show", "3"])
+    assert args.query is None and args.show == 3
+    assert parse_args(["search", "事件循环"]).query == "事件循环"
+
+
+def test_search_without_query_or_show_is_a_usage_error():
+    with pytest.raises(SystemExit) as excinfo:
+        parse_args(["search"])
+    assert excinfo.value.code == 2
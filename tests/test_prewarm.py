@@ -0,0 +1,32 @@
+import asyncio
+
+from tab2md import prewarm, timings
+from tab2md.prewarm import Prewarmer
+
+
+def test_prewarmed_install_check_is_reported_in_timings(monkeypatch):
+    monkeypatch.setattr(timings, "STARTUP_TIMINGS", {})
+    monkeypatch.setattr(prewarm, "ensure_chromium_installed", lambda: None)
+    monkeypatch.setattr(prewarm, "_import_engine_modules", lambda: None)
+
+    async def scenario():
+        prewarmer = Prewarmer("auto")
+        prewarmer.start()
+        await prewarmer.wait()
+
+    asyncio.run(scenario())
+    assert "install check" in timings.STARTUP_TIMINGS
+    assert "import crawl4ai" not in timings.STARTUP_TIMINGS
+
+
+def test_prewarm_off_starts_nothing(monkeypatch):
+    monkeypatch.setattr(timings, "STARTUP_TIMINGS", {})
+
+    async def scenario():
+        prewarmer = Prewarmer("off")
+        prewarmer.start()
+        await prewarmer.wait()
+        return prewarmer._tasks
+
+    assert asyncio.run(scenario()) == []
+    assert timings.STARTUP_TIMINGS == {}
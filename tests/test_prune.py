@@ -0,0 +1,74 @@
+import pytest
+
+from tab2md.prune import DATA_URI_LIMIT, PRUNABLE_TAGS, prune_chunks, prune_html
+
+
+def test_removes_prunable_elements():
+    html = "<p>a</p><script>var x = '<p>';</script><style>p{}</style><p>b</p>"
+    assert prune_html(html) == "<p>a</p><p>b</p>"
+
+
+def test_nested_svg_is_removed_as_a_whole():
+    html = "<p>a</p><svg><g><svg><path/></svg></g></svg><p>b</p>"
+    assert prune_html(html) == "<p>a</p><p>b</p>"
+
+
+def test_self_closing_svg():
+    assert prune_html('<p>a</p><svg class="i"/><p>b</p>') == "<p>a</p><p>b</p>"
+
+
+def test_custom_elements_with_prunable_prefix_are_kept():
+    html = "<p>a</p><style-card><p>KEEP ME</p></style-card><p>b</p>"
+    assert prune_html(html) == html
+    html = "<script-loader>x</script-loader><svg-icon>y</svg-icon>"
+    assert prune_html(html) == html
+
+
+def test_custom_element_inside_svg_does_not_affect_depth():
+    html = "<svg><svg-icon></svg-icon></svg><p>b</p>"
+    assert prune_html(html) == "<p>b</p>"
+
+
+def test_comments_and_cdata_are_not_tags():
+    html = "<p>a</p><!-- <iframe> placeholder --><p>b</p>"
+    assert prune_html(html) == html
+    html = "<p>a</p><![CDATA[ <svg> ]]><p>b</p>"
+    assert prune_html(html) == html
+
+
+def test_unclosed_element_is_left_alone():
+    html = "<p>a</p><iframe src='x'><p>b</p>"
+    assert prune_html(html) == html
+    html = "<p>a</p><svg><path/><p>b</p><script>x</script>"
+    assert prune_html(html) == "<p>a</p><svg><path/><p>b</p>"
+
+
+def test_attribute_values_may_contain_gt():
+    html = '<p>a</p><svg data-x="a>b"><path/></svg><p>b</p>'
+    assert prune_html(html) == "<p>a</p><p>b</p>"
+
+
+def test_only_requested_tags_are_pruned():
+    html = "<style>p{}</style><script>x</script>"
+    assert prune_html(html, ("script",)) == "<style>p{}</style>"
+
+
+def test_long_data_uris_are_shortened():
+    long_uri = "data:image/png;base64," + "A" * DATA_URI_LIMIT
+    short_uri = "data:image/png;base64,AAAA"
+    html = f'<img src="{long_uri}"><img src="{short_uri}">'
+    assert prune_html(html) == f'<img src="data:,"><img src="{short_uri}">'
+    assert prune_html(html, strip_data_uris=False) == html
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_chunked_pruning_matches_whole_document(size):
+    html = (
+        "<p>a</p><script>var s = '<svg>';</script><!-- <style> --><svg><svg/><g></g></svg>"
+        f'<img src="data:image/png;base64,{"A" * (DATA_URI_LIMIT + 10)}">'
+        f"<style>.x{{background:url(data:{'B' * (DATA_URI_LIMIT + 10)})}}</style>"
+        "<iframe src=x><p>b</p><style-card>c</style-card><![CDATA[ <script> ]]>"
+    )
+    chunks = [html[i:i + size] for i in range(0, len(html), size)]
+    for tags in (PRUNABLE_TAGS, ("script",)):
+        assert "".join(prune_chunks(chunks, tags)) == prune_html(html, tags)
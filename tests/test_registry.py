@@ -0,0 +1,65 @@
+from tab2md.strategies.basic import BasicStrategy
+from tab2md.strategies.geekbang import GeekbangColumnStrategy
+from tab2md.strategies.registry import StrategyRegistry, get_registry
+
+
+class ExampleStrategy(BasicStrategy):
+    domains = ("example.com",)
+
+
+class DocsStrategy(BasicStrategy):
+    domains = ("docs.example.com",)
+
+
+class PatternStrategy(BasicStrategy):
+    url_patterns = (r"/wiki/",)
+
+
+def registry():
+    reg = StrategyRegistry()
+    for cls in (ExampleStrategy, DocsStrategy, PatternStrategy):
+        reg.register(cls)
+    return reg
+
+
+def test_lookup_by_domain_suffix():
+    reg = registry()
+    assert type(reg.lookup("https://example.com/a")) is ExampleStrategy
+    assert type(reg.lookup("https://www.example.com/a")) is ExampleStrategy
+
+
+def test_most_specific_domain_wins():
+    assert type(registry().lookup("https://docs.example.com/a")) is DocsStrategy
+
+
+def test_lookalike_hosts_fall_back():
+    reg = registry()
+    assert type(reg.lookup("https://example.com.evil.net/")) is BasicStrategy
+    assert type(reg.lookup("https://notexample.com/")) is BasicStrategy
+
+
+def test_url_patterns():
+    assert type(registry().lookup("https://other.org/wiki/Page")) is PatternStrategy
+
+
+def test_instances_are_cached():
+    reg = registry()
+    assert reg.lookup("https://example.com/a") is reg.lookup("https://example.com/b")
+
+
+def test_lazy_string_registration_imports_on_first_hit():
+    reg = StrategyRegistry()
+    reg.register("tab2md.strategies.geekbang:GeekbangColumnStrategy", domains=["geekbang.org"])
+    assert type(reg.lookup("https://time.geekbang.org/column/article/1")) is GeekbangColumnStrategy
+
+
+def test_builtin_geekbang_strategy_relies_on_domains():
+    assert type(get_registry().lookup("https://time.geekbang.org/x")) is GeekbangColumnStrategy
+    assert type(get_registry().lookup("https://geekbang.org.evil.com/x")) is BasicStrategy
+    assert not GeekbangColumnStrategy.match("https://geekbang.org.evil.com/x")
+
+
+def test_match_defaults():
+    assert BasicStrategy.match("https://anything.example/")
+    assert ExampleStrategy.match("https://www.example.com/")
+    assert not ExampleStrategy.match("https://example.org/")
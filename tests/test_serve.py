@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+from tab2md.serve import ConversionServer
+
+
+class StubConverter:
+    """按 URL 返回固定结果；gate 未放行前转换一直挂起，用于制造排队。"""
+
+    def __init__(self, blocking: bool = False):
+        self.gate = asyncio.Event()
+        if not blocking:
+            self.gate.set()
+        self.calls = []
+
+    async def __call__(self, url, html):
+        self.calls.append(url)
+        await self.gate.wait()
+        if "fail" in url:
+            raise RuntimeError("boom")
+        return "StubStrategy", f"# {url}\n\n{len(html)}"
+
+
+async def request(port, method, path, body=b"", headers=()):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}", *headers]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, json.loads(payload)
+
+
+def post(port, payload):
+    return request(port, "POST", "/convert", json.dumps(payload).encode("utf-8"))
+
+
+async def started(server):
+    await server.start()
+    return server
+
+
+async def wait_until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("条件未在时限内满足")
+
+
+def test_convert_and_request_parsing():
+    async def scenario():
+        server = await started(ConversionServer(StubConverter(), port=0))
+        try:
+            ok = await post(server.port, {"url": "https://e.com/a", "html": "<p>x</p>"})
+            bad_json = await request(server.port, "POST", "/convert", b"{not json")
+            missing = await post(server.port, {"url": "https://e.com/a"})
+            wrong_method = await request(server.port, "GET", "/convert")
+            unknown = await request(server.port, "GET", "/nope")
+            too_large = await request(
+                server.port, "POST", "/convert?x=1", headers=["Content-Length: 999999999999"]
+            )
+            metrics = await request(server.port, "GET", "/metrics")
+        finally:
+            await server.close()
+        return ok, bad_json, missing, wrong_method, unknown, too_large, metrics
+
+    ok, bad_json, missing, wrong_method, unknown, too_large, metrics = asyncio.run(scenario())
+    assert ok[0] == 200
+    assert ok[2]["strategy"] == "StubStrategy" and ok[2]["markdown"] == "# https://e.com/a\n\n8"
+    assert [r[0] for r in (bad_json, missing, wrong_method, unknown)] == [400, 400, 405, 404]
+    assert too_large[0] == 413
+    assert metrics[2]["completed"] == 1 and metrics[2]["queue_depth"] == 0
+
+
+def test_saturated_queue_returns_429():
+    async def scenario():
+        converter = StubConverter(blocking=True)
+        server = await started(ConversionServer(converter, port=0, max_in_flight=1, max_queue=1))
+        try:
+            first = asyncio.ensure_future(post(server.port, {"url": "https://e.com/1", "html": ""}))
+            second = asyncio.ensure_future(post(server.port, {"url": "https://e.com/2", "html": ""}))
+            await wait_until(lambda: server.in_flight == 1 and server.queued == 1)
+            rejected = await post(server.port, {"url": "https://e.com/3", "html": ""})
+            converter.gate.set()
+            return rejected, await first, await second, server.metrics()
+        finally:
+            await server.close()
+
+    rejected, first, second, metrics = asyncio.run(scenario())
+    assert rejected[0] == 429 and rejected[1]["Retry-After"] == "1"
+    assert first[0] == second[0] == 200
+    assert metrics["rejected"] == 1 and metrics["completed"] == 2
+
+
+def test_batch_results_and_atomic_admission():
+    async def scenario():
+        server = await started(ConversionServer(StubConverter(), port=0, max_in_flight=1, max_queue=2))
+        try:
+            batch = await post(
+                server.port,
+                [
+                    {"url": "https://e.com/a", "html": "<p>a</p>"},
+                    {"url": "https://e.com/fail", "html": ""},
+                ],
+            )
+            too_big = await post(server.port, [{"url": f"https://e.com/{i}", "html": ""} for i in range(4)])
+            invalid = await post(server.port, [{"url": "https://e.com/a", "html": ""}, "x"])
+        finally:
+            await server.close()
+        return batch, too_big, invalid
+
+    batch, too_big, invalid = asyncio.run(scenario())
+    assert batch[0] == 200
+    first, failed = batch[2]["results"]
+    assert first["markdown"] == "# https://e.com/a\n\n8"
+    assert failed["status"] == 500 and "boom" in failed["error"]
+    assert too_big[0] == 429
+    assert invalid[0] == 400
+
+
+def test_close_rejects_queued_and_drains_in_flight():
+    async def scenario():
+        converter = StubConverter(blocking=True)
+        server = await started(ConversionServer(converter, port=0, max_in_flight=1, max_queue=4))
+        running = asyncio.ensure_future(post(server.port, {"url": "https://e.com/1", "html": ""}))
+        queued = asyncio.ensure_future(post(server.port, {"url": "https://e.com/2", "html": ""}))
+        await wait_until(lambda: server.in_flight == 1 and server.queued == 1)
+
+        closing = asyncio.ensure_future(server.close(grace=5))
+        queued_response = await queued
+        assert not closing.done()  # 仍在等待进行中的转换
+        converter.gate.set()
+        running_response = await running
+        await closing
+        try:
+            await asyncio.open_connection("127.0.0.1", server.port)
+            refused = False
+        except OSError:
+            refused = True
+        return queued_response, running_response, refused, converter.calls
+
+    queued, running, refused, calls = asyncio.run(scenario())
+    assert queued[0] == 503
+    assert running[0] == 200
+    assert refused
+    assert calls == ["https://e.com/1"]
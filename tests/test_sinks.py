@@ -0,0 +1,82 @@
+import sqlite3
+
+from tab2md.sinks import SQLiteSink, canonical_url, extract_title
+
+DOC = "# 事件循环\n\nPython 的事件循环是单线程的，asyncio 在其上调度协程。"
+
+
+def archive(tmp_path):
+    sink = SQLiteSink(tmp_path / "archive.sqlite3")
+    sink.write("https://example.com/a", DOC, title="asyncio 入门")
+    sink.write("https://example.com/b", "# Other\n\nNothing to see here.", title="other")
+    sink.flush()
+    return sink
+
+
+def ids(rows):
+    return [row[1] for row in rows]
+
+
+def test_chinese_query_matches_inside_unbroken_cjk_text(tmp_path):
+    sink = archive(tmp_path)
+    assert ids(sink.search("事件循环")) == ["https://example.com/a"]
+    assert ids(sink.search("asyncio AND 事件循环")) == ["https://example.com/a"]
+    assert ids(sink.search('"单线程"')) == ["https://example.com/a"]
+    assert "[事件循环]" in sink.search("事件循环")[0][3]
+    sink.close()
+
+
+def test_short_terms_fall_back_to_substring_scan(tmp_path):
+    sink = archive(tmp_path)
+    rows = sink.search("协程")
+    assert ids(rows) == ["https://example.com/a"]
+    assert "[协程]" in rows[0][3]
+    assert sink.search("无关") == []
+    sink.close()
+
+
+def test_rewrite_updates_the_index(tmp_path):
+    sink = archive(tmp_path)
+    sink.write("https://example.com/a", "# 已更新\n\n内容替换为垃圾回收。")
+    sink.flush()
+    assert sink.search("事件循环") == []
+    assert ids(sink.search("垃圾回收")) == ["https://example.com/a"]
+    sink.close()
+
+
+def test_unicode61_archives_are_rebuilt_with_trigram(tmp_path):
+    path = tmp_path / "archive.sqlite3"
+    SQLiteSink(path).close()
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        DROP TABLE exports_fts;
+        CREATE VIRTUAL TABLE exports_fts USING fts5(
+            title, url, markdown, content='exports', content_rowid='id'
+        );
+        """
+    )
+    conn.execute(
+        "INSERT INTO exports (url, canonical_url, title, strategy, content_hash, markdown, "
+        "created, updated) VALUES ('https://example.com/a', '', '', '', '', ?, 0, 0)",
+        (DOC,),
+    )
+    conn.commit()
+    conn.close()
+
+    sink = SQLiteSink(path)
+    assert ids(sink.search("事件循环")) == ["https://example.com/a"]
+    sink.close()
+
+
+def test_canonical_url_and_title():
+    html = (
+        "<html><head><title>A &amp; B</title>"
+        '<link rel="canonical" href="/post/1"></head></html>'
+    )
+    assert extract_title(html) == "A & B"
+    assert canonical_url("https://example.com/x?utm_source=1", html) == "https://example.com/post/1"
+    assert (
+        canonical_url("https://example.com/x?id=2&utm_source=1&spm=3#top")
+        == "https://example.com/x?id=2"
+    )